@@ -0,0 +1,89 @@
+"""
+Compare the JSON backends supported by Facepy on payloads that resemble the Graph API's::
+
+    $ PYTHONPATH=. python benchmarks/json_backends.py
+
+"""
+
+import timeit
+
+from facepy import json_codec
+
+
+def post(id):
+    return {
+        'id': '499729129_%d' % id,
+        'from': {'id': '499729129', 'name': 'Thomas \'Herc\' Hauk'},
+        'message': 'He\'s a complicated man. And the only one that understands him is his woman. ' * 3,
+        'picture': 'https://fbcdn-photos-a.akamaihd.net/photos-ak-snc7/%d_s.jpg' % id,
+        'type': 'status',
+        'created_time': '2012-05-12T10:%02d:00+0000' % (id % 60),
+        'updated_time': '2012-05-12T10:%02d:00+0000' % (id % 60),
+        'likes': {'data': [{'id': str(1000 + like), 'name': 'John Shaft'} for like in range(4)], 'count': 4},
+        'comments': {
+            'data': [
+                {
+                    'id': '499729129_%d_%d' % (id, comment),
+                    'from': {'id': '1', 'name': 'Jimmy McNulty'},
+                    'message': 'I don\'t like your chair.',
+                    'created_time': '2012-05-12T11:00:00+0000'
+                } for comment in range(3)
+            ],
+            'count': 3
+        }
+    }
+
+
+PAYLOADS = {
+    'feed page (100 posts)': {
+        'data': [post(id) for id in range(100)],
+        'paging': {
+            'previous': 'https://graph.facebook.com/499729129/feed?limit=100&since=1336816800',
+            'next': 'https://graph.facebook.com/499729129/feed?limit=100&until=1336816800'
+        }
+    },
+    'batch (50 responses)': [
+        {
+            'code': 200,
+            'headers': [{'name': 'Content-Type', 'value': 'text/javascript; charset=UTF-8'}],
+            'body': json_codec.dumps(post(id))
+        } for id in range(50)
+    ],
+    'signed request payload': {
+        'algorithm': 'HMAC-SHA256',
+        'expires': 0,
+        'issued_at': 1306179904,
+        'oauth_token': '181259711925270|1570a553ad6605705d1b7a5f.1-499729129|8XqMRhCWDKtpG-i_zRkHBDSsqqk',
+        'user': {'country': 'no', 'locale': 'en_US', 'age': {'min': 21}},
+        'user_id': '499729129'
+    }
+}
+
+
+def benchmark(codec, number):
+    results = {}
+
+    for name, payload in PAYLOADS.items():
+        encoded = codec.dumps(payload)
+
+        results[name] = (
+            min(timeit.repeat(lambda: codec.loads(encoded), number=number, repeat=3)) / number,
+            min(timeit.repeat(lambda: codec.dumps(payload), number=number, repeat=3)) / number,
+            len(encoded)
+        )
+
+    return results
+
+
+def main(number=200):
+    print '%-12s %-24s %10s %12s %12s' % ('backend', 'payload', 'bytes', 'loads (us)', 'dumps (us)')
+
+    for backend in json_codec.available_backends():
+        codec = json_codec.load_backend(backend)
+
+        for name, (loads, dumps, size) in sorted(benchmark(codec, number).items()):
+            print '%-12s %-24s %10d %12.1f %12.1f' % (backend, name, size, loads * 1e6, dumps * 1e6)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare ways of computing HMAC digests and of parsing and generating signed requests::
+
+    $ PYTHONPATH=. python benchmarks/signed_requests.py
+
+"""
+
+import hashlib
+import hmac
+import timeit
+
+from facepy.signed_request import HMACKey, LazySignedRequest, SignedRequest, SignedRequestFactory, SignedRequestVerifier
+
+
+SIGNED_REQUEST = u'' \
+    'mnrG8Wc9CH_rh-GCqq97GFAPOh6AY7cMO8IYVKb6Pa4.eyJhbGdvcml0aG0iOi' \
+    'JITUFDLVNIQTI1NiIsImV4cGlyZXMiOjAsImlzc3VlZF9hdCI6MTMwNjE3OTkw' \
+    'NCwib2F1dGhfdG9rZW4iOiIxODEyNTk3MTE5MjUyNzB8MTU3MGE1NTNhZDY2MD' \
+    'U3MDVkMWI3YTVmLjEtNDk5NzI5MTI5fDhYcU1SaENXREt0cEctaV96UmtIQkRT' \
+    'c3FxayIsInVzZXIiOnsiY291bnRyeSI6Im5vIiwibG9jYWxlIjoiZW5fVVMiLC' \
+    'JhZ2UiOnsibWluIjoyMX19LCJ1c2VyX2lkIjoiNDk5NzI5MTI5In0'
+
+APPLICATION_SECRET_KEY = '214e4cb484c28c35f18a70a3d735999b'
+
+
+def main(number=20000):
+    key = HMACKey(APPLICATION_SECRET_KEY)
+    message = str(SIGNED_REQUEST.split('.', 1)[1])
+
+    benchmarks = [
+        ('hmac.new', lambda: hmac.new(APPLICATION_SECRET_KEY, message, hashlib.sha256).digest()),
+        ('HMACKey#digest', lambda: key.digest(message))
+    ]
+
+    for name, function in benchmarks:
+        seconds = min(timeit.repeat(function, number=number, repeat=3))
+
+        print '%-36s %12.0f digests/s' % (name, number / seconds)
+
+    verifier = SignedRequestVerifier(APPLICATION_SECRET_KEY)
+
+    benchmarks = [
+        ('SignedRequest.parse', lambda: SignedRequest.parse(SIGNED_REQUEST, APPLICATION_SECRET_KEY)),
+        ('SignedRequestVerifier#parse', lambda: verifier.parse(SIGNED_REQUEST))
+    ]
+
+    for name, function in benchmarks:
+        seconds = min(timeit.repeat(function, number=number, repeat=3))
+
+        print '%-36s %12.0f verifications/s' % (name, number / seconds)
+
+    for processes in [None, 2, 4]:
+        verifier = SignedRequestVerifier(APPLICATION_SECRET_KEY)
+
+        for result in verifier.parse_many([SIGNED_REQUEST] * number * 5, processes=processes):
+            pass
+
+        print '%-36s %12.0f verifications/s' % ('parse_many (processes=%s)' % processes, verifier.rate)
+
+    verifier = SignedRequestVerifier(APPLICATION_SECRET_KEY)
+
+    benchmarks = [
+        ('SignedRequest#user.id', lambda: SignedRequest(SIGNED_REQUEST, APPLICATION_SECRET_KEY).user.id),
+        ('LazySignedRequest#user.id', lambda: LazySignedRequest(SIGNED_REQUEST, verifier=verifier).user.id),
+        ('LazySignedRequest#data', lambda: LazySignedRequest(SIGNED_REQUEST, verifier=verifier).data)
+    ]
+
+    for name, function in benchmarks:
+        seconds = min(timeit.repeat(function, number=number, repeat=3))
+
+        print '%-36s %12.0f requests/s' % (name, number / seconds)
+
+    signed_request = SignedRequest(SIGNED_REQUEST, APPLICATION_SECRET_KEY)
+    factory = SignedRequestFactory(APPLICATION_SECRET_KEY)
+
+    benchmarks = [
+        ('SignedRequest#generate', signed_request.generate),
+        ('SignedRequestFactory#generate', lambda: factory.generate(signed_request.raw))
+    ]
+
+    for name, function in benchmarks:
+        seconds = min(timeit.repeat(function, number=number, repeat=3))
+
+        print '%-36s %12.0f signed requests/s' % (name, number / seconds)
+
+    for processes in [None, 2, 4]:
+        factory = SignedRequestFactory(APPLICATION_SECRET_KEY)
+
+        for result in factory.generate_many(number * 5, signed_request.raw, {'user_id': xrange(10 ** 6)}, processes):
+            pass
+
+        print '%-36s %12.0f signed requests/s' % ('generate_many (processes=%s)' % processes, factory.rate)
+
+
+if __name__ == '__main__':
+    main()
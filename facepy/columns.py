@@ -0,0 +1,193 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from facepy.exceptions import FacepyError
+from facepy.ids import TYPECODE
+
+
+class Column(object):
+    """
+    A ``Column`` collects the values of a field one at a time, storing them in an ``array.array`` if they are
+    all booleans, integers or floats and in a list otherwise.
+    """
+
+    values = None
+    """An ``array.array`` or a list describing the values of the column, or ``None`` if all values are missing."""
+
+    mask = None
+    """A ``bytearray`` describing whether each value is present (1) or missing (0)."""
+
+    def __init__(self, type=None):
+        """
+        Initialize a column.
+
+        :param type: An optional type such as ``int``, ``float`` or ``bool`` to convert values to. If omitted,
+                     the type is inferred from the values.
+        """
+        self.type = type
+        self.values = None
+        self.mask = bytearray()
+
+        if type is not None:
+            self.values = self._container(type)
+
+    def append(self, value):
+        """
+        Add a value to the column.
+
+        :param value: The value, or ``None`` if it is missing.
+        """
+        if value is not None and self.type is not None and not isinstance(value, self.type):
+            try:
+                value = self.type(value)
+            except (TypeError, ValueError):
+                value = None
+
+        if self.values is None:
+            if value is None:
+                self.mask.append(0)
+                return
+
+            # Infer the type of the column from the first value and backfill missing values.
+            self.values = self._container(type(value))
+
+            for _ in range(len(self.mask)):
+                self._append(self._missing())
+        elif isinstance(self.values, array) and value is not None and not self._fits(value):
+            self._promote(value)
+
+        self.mask.append(0 if value is None else 1)
+        self._append(self._missing() if value is None else value)
+
+    def __len__(self):
+        return len(self.mask)
+
+    def to_list(self):
+        """Return a list of the values of the column, with ``None`` for missing values."""
+        values = self.values if self.values is not None else [None] * len(self.mask)
+
+        return [value if present else None for value, present in zip(values, self.mask)]
+
+    def _append(self, value):
+        self.values.append(value)
+
+    def _container(self, type):
+        if type is bool:
+            return array('b')
+
+        if issubclass(type, (int, long)):
+            return array(TYPECODE)
+
+        if issubclass(type, float):
+            return array('d')
+
+        return []
+
+    def _fits(self, value):
+        if self.values.typecode == 'b':
+            return isinstance(value, bool)
+
+        if self.values.typecode == 'd':
+            return isinstance(value, (int, long, float)) and not isinstance(value, bool)
+
+        return isinstance(value, (int, long)) and not isinstance(value, bool)
+
+    def _promote(self, value):
+        """Widen the column so that it can hold the given value, e.g. from integers to floats."""
+        numeric = isinstance(value, (int, long, float)) and not isinstance(value, bool)
+
+        if self.values.typecode == TYPECODE and numeric:
+            self.values = array('d', [item if present else float('nan') for item, present in zip(self.values, self.mask)])
+        else:
+            convert = bool if self.values.typecode == 'b' else lambda value: value
+            self.values = [convert(item) if present else None for item, present in zip(self.values, self.mask)]
+
+    def _missing(self):
+        if isinstance(self.values, array):
+            return float('nan') if self.values.typecode == 'd' else 0
+
+        return None
+
+
+def to_columns(results, fields, types=None, numpy=False):
+    """
+    Convert the results of ``GraphAPI#get``, ``GraphAPI#get(page=True)`` or ``GraphAPI#fql`` to columns,
+    one row at a time.
+
+    :param results: A response such as ``{'data': [...]}``, an iterable of such responses (e.g. a generator of
+                    pages) or an iterable of rows.
+    :param fields: A list of strings describing the fields to collect. Fields of nested objects are described
+                   with dots, e.g. ``from.id``, and items of lists with their index, e.g. ``tags.0.name``.
+    :param types: An optional dictionary describing the type to convert the values of each field to, e.g.
+                  ``{'likes.count': int}``.
+    :param numpy: A boolean describing whether to return NumPy arrays rather than ``array.array`` instances
+                  and lists. NumPy must be installed.
+
+    Returns a tuple of two dictionaries: the columns of each field, and masks describing which values of each
+    field are present. Missing values are ``NaN`` in float columns, ``0`` in integer and boolean columns and
+    ``None`` in other columns.
+    """
+    types = types or {}
+    columns = dict((field, Column(types.get(field))) for field in fields)
+    paths = dict((field, field.split('.')) for field in fields)
+
+    for row in _rows(results):
+        for field in fields:
+            columns[field].append(_lookup(row, paths[field]))
+
+    if numpy:
+        return _to_numpy(columns)
+
+    values = dict((field, column.values if column.values is not None else [None] * len(column)) for field, column in columns.items())
+    masks = dict((field, column.mask) for field, column in columns.items())
+
+    return values, masks
+
+
+def _rows(results):
+    """Yield each row of the given results, whether they are a response, pages of responses or rows."""
+    if isinstance(results, dict):
+        results = [results]
+
+    for result in results:
+        if isinstance(result, dict) and isinstance(result.get('data'), list):
+            for row in result['data']:
+                yield row
+        else:
+            yield result
+
+
+def _lookup(row, path):
+    """Return the value at the given path of a row, or ``None`` if there is none."""
+    value = row
+
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+
+    return value
+
+
+def _to_numpy(columns):
+    if np is None:
+        raise FacepyError('NumPy is not installed')
+
+    values, masks = {}, {}
+
+    for field, column in columns.items():
+        if isinstance(column.values, array):
+            values[field] = np.frombuffer(column.values, dtype={'b': np.bool_, 'd': np.float64}.get(column.values.typecode, np.int64)).copy()
+        else:
+            values[field] = np.array(column.to_list() if column.values is not None else [None] * len(column), dtype=object)
+
+        masks[field] = np.frombuffer(bytes(column.mask), dtype=np.bool_).copy() if len(column) else np.zeros(0, dtype=np.bool_)
+
+    return values, masks
@@ -0,0 +1,110 @@
+from multiprocessing.pool import ThreadPool
+
+from facepy.exceptions import FacepyError
+from facepy.ids import IdSet
+
+
+class Crawler(object):
+    """
+    A ``Crawler`` explores the Graph API breadth-first, starting from a number of objects and following
+    their connections, e.g. from users to their friends and from there to their friends' friends.
+    """
+
+    crawled = 0
+    """An integer describing how many objects have been crawled."""
+
+    errors = None
+    """A list of tuples describing each object that could not be crawled and the exception it failed with."""
+
+    def __init__(self, graph, connections=('friends',), workers=4, depth=2, budget=None, visited=None, **options):
+        """
+        Initialize a crawler.
+
+        :param graph: A ``GraphAPI`` instance to crawl with.
+        :param connections: A list of strings describing the connections to follow, e.g. ``['friends', 'likes']``.
+        :param workers: An integer describing how many objects may be crawled at once.
+        :param depth: An integer describing how many connections away from the seeds to crawl.
+        :param budget: An optional integer describing how many objects may be crawled at most.
+        :param visited: An optional set of IDs to treat as visited (defaults to an empty ``facepy.ids.IdSet``).
+                        Any object with ``add`` and ``__contains__`` will do.
+        :param options: Graph API parameters for connections, such as 'fields'.
+        """
+        self.graph = graph
+        self.connections = connections
+        self.workers = workers
+        self.depth = depth
+        self.budget = budget
+        self.visited = visited if visited is not None else IdSet()
+        self.options = options
+        self.crawled = 0
+        self.errors = []
+
+    def crawl(self, seeds, callback):
+        """
+        Crawl the Graph API, passing each object discovered to a callback.
+
+        :param seeds: A list of strings describing the IDs of the objects to start from.
+        :param callback: A function to call with each object discovered, the connection it was discovered
+                         through and its distance from the seeds.
+
+        Returns an integer describing how many objects were discovered.
+        """
+        discovered = 0
+        frontier = []
+
+        for id in seeds:
+            if id not in self.visited:
+                self.visited.add(id)
+                frontier.append(id)
+
+        pool = ThreadPool(self.workers)
+
+        try:
+            for depth in range(1, self.depth + 1):
+                if self.budget is not None:
+                    frontier = frontier[:max(self.budget - self.crawled, 0)]
+
+                if not frontier:
+                    break
+
+                following = []
+
+                for id, result in pool.imap_unordered(self._fetch, frontier):
+                    self.crawled += 1
+
+                    if isinstance(result, FacepyError):
+                        self.errors.append((id, result))
+                        continue
+
+                    for connection, item in result:
+                        if item['id'] in self.visited:
+                            continue
+
+                        self.visited.add(item['id'])
+                        discovered += 1
+                        following.append(item['id'])
+                        callback(item, connection, depth)
+
+                frontier = following
+        finally:
+            pool.close()
+            pool.join()
+
+        return discovered
+
+    def _fetch(self, id):
+        """Fetch the connections of an object, returning a list of tuples of the connection and the item."""
+        items = []
+
+        try:
+            for connection in self.connections:
+                pages = self.graph._get('%s/%s' % (id, connection), page=True, **self.options)
+
+                for page in pages:
+                    for item in page.get('data', []) if isinstance(page, dict) else []:
+                        if isinstance(item, dict) and 'id' in item:
+                            items.append((connection, item))
+        except FacepyError as exception:
+            return id, exception
+
+        return id, items
@@ -24,3 +24,7 @@ class HTTPError(FacepyError):
 
 class SignedRequestError(FacepyError):
     """Exception for invalid signed requests."""
+
+
+class SpoolFullError(FacepyError):
+    """Exception for write-behind spools that have no room for more items."""
@@ -0,0 +1,216 @@
+import csv
+import os
+import time
+
+from facepy import json_codec
+
+
+class Sink(object):
+    """
+    A ``Sink`` receives the items of an export one at a time. Sinks that write to files know how far they have
+    written, so that an interrupted export may be resumed without duplicating items.
+    """
+
+    def open(self, offset=None):
+        """
+        Prepare the sink for writing.
+
+        :param offset: An integer describing where to resume writing (as returned by ``tell``), or ``None``
+                       to start from scratch.
+        """
+
+    def write(self, item):
+        """
+        Write an item, returning an integer describing the number of bytes written.
+
+        :param item: A dictionary describing the item.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Make sure everything written so far is persisted."""
+
+    def tell(self):
+        """Return an integer describing how far the sink has written, or ``None`` if it can't tell."""
+
+    def close(self):
+        """Release any resources held by the sink."""
+
+
+class FileSink(Sink):
+    """A ``FileSink`` writes items to a file, given either as a path or as a file-like object."""
+
+    def __init__(self, file):
+        """
+        Initialize a sink.
+
+        :param file: A string describing a path or a file-like object opened for writing.
+        """
+        self.path = file if isinstance(file, basestring) else None
+        self.file = None if self.path else file
+
+    def open(self, offset=None):
+        if self.path:
+            self.file = open(self.path, 'r+b' if offset is not None and os.path.exists(self.path) else 'wb')
+
+        # Discard anything that was written after the checkpoint we're resuming from.
+        if offset is not None:
+            self.file.seek(offset)
+            self.file.truncate()
+
+    def flush(self):
+        self.file.flush()
+
+        try:
+            os.fsync(self.file.fileno())
+        except (AttributeError, ValueError, IOError, OSError):
+            pass
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        if self.path:
+            self.file.close()
+
+
+class NDJSONSink(FileSink):
+    """A ``NDJSONSink`` writes each item as a line of JSON."""
+
+    def write(self, item):
+        line = json_codec.dumps(item, compact=True) + '\n'
+
+        if isinstance(line, unicode):
+            line = line.encode('utf-8')
+
+        self.file.write(line)
+
+        return len(line)
+
+
+class CSVSink(FileSink):
+    """
+    A ``CSVSink`` writes each item as a row of comma-separated values. Fields of nested objects are described
+    with dots, e.g. ``from.name``.
+    """
+
+    def __init__(self, file, fields):
+        """
+        Initialize a sink.
+
+        :param file: A string describing a path or a file-like object opened for writing.
+        :param fields: A list of strings describing the fields to write.
+        """
+        super(CSVSink, self).__init__(file)
+        self.fields = fields
+
+    def open(self, offset=None):
+        super(CSVSink, self).open(offset)
+
+        self.writer = csv.writer(self.file)
+
+        if offset is None:
+            self.writer.writerow(self.fields)
+
+    def write(self, item):
+        row = []
+
+        for field in self.fields:
+            value = item
+
+            for key in field.split('.'):
+                value = value.get(key) if isinstance(value, dict) else None
+
+            if isinstance(value, unicode):
+                value = value.encode('utf-8')
+            elif isinstance(value, (dict, list)):
+                value = json_codec.dumps(value)
+
+            row.append('' if value is None else value)
+
+        position = self.file.tell()
+        self.writer.writerow(row)
+
+        return self.file.tell() - position
+
+
+class CallableSink(Sink):
+    """A ``CallableSink`` passes each item to a function."""
+
+    def __init__(self, function):
+        """
+        Initialize a sink.
+
+        :param function: A function to call with each item.
+        """
+        self.function = function
+
+    def write(self, item):
+        self.function(item)
+
+        return 0
+
+
+class ExportReport(object):
+    """An ``ExportReport`` instance describes the progress of an export."""
+
+    items = 0
+    """An integer describing how many items have been exported."""
+
+    bytes = 0
+    """An integer describing how many bytes have been written."""
+
+    pages = 0
+    """An integer describing how many pages have been exported."""
+
+    resumed = False
+    """A boolean describing whether the export was resumed from a checkpoint."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        """A float describing how many seconds the export has been running."""
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def items_per_second(self):
+        """A float describing how many items have been exported per second."""
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self):
+        """A float describing how many bytes have been written per second."""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+def load_checkpoint(path):
+    """
+    Load a checkpoint, returning a dictionary describing it or ``None`` if there is none.
+
+    :param path: A string describing the path to the checkpoint.
+    """
+    try:
+        with open(path) as file:
+            return json_codec.loads(file.read())
+    except (IOError, ValueError):
+        return None
+
+
+def save_checkpoint(path, checkpoint):
+    """
+    Save a checkpoint atomically.
+
+    :param path: A string describing the path to the checkpoint.
+    :param checkpoint: A dictionary describing the checkpoint.
+    """
+    temporary = path + '.tmp'
+
+    with open(temporary, 'w') as file:
+        file.write(json_codec.dumps(checkpoint))
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.rename(temporary, path)
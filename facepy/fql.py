@@ -0,0 +1,121 @@
+import re
+
+from multiprocessing.pool import ThreadPool
+
+from facepy import json_codec
+
+
+class FQLExecutor(object):
+    """
+    An ``FQLExecutor`` runs FQL queries whose ``IN`` lists are too long for a single request, such as
+    ``SELECT name FROM user WHERE uid IN (1, 2, ..., 10000)``, by splitting them into several queries that
+    are sent concurrently and whose rows are merged.
+
+    Since each query is run separately, the merged rows are only ordered and limited within each query,
+    and conditions that are ``OR``-ed with an ``IN`` condition match once per query.
+    """
+
+    def __init__(self, graph, chunk_size=500, workers=4, multiquery=None, retry=3):
+        """
+        Initialize an executor.
+
+        :param graph: A ``GraphAPI`` instance to run queries with.
+        :param chunk_size: An integer describing how many values of each ``IN`` list each request may carry.
+        :param workers: An integer describing how many requests may be in flight at once.
+        :param multiquery: An optional integer describing how many queries to pack into each request as an
+                           FQL multiquery, splitting each request's ``chunk_size`` values between them. By
+                           default, each query is sent in a request of its own.
+        :param retry: An integer describing how many times each request may be retried.
+        """
+        self.graph = graph
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.multiquery = multiquery
+        self.retry = retry
+
+    def execute(self, query):
+        """
+        Run a query.
+
+        :param query: A string describing the FQL query.
+
+        Returns a generator that yields a dictionary describing each row, in the order of the queries the
+        query was split into. Rows are yielded as soon as the queries they belong to have been run.
+        """
+        if self.multiquery:
+            # Multiqueries are sent in the URL as well, so their queries share the request's values.
+            queries = split(query, max(1, self.chunk_size // self.multiquery))
+            requests = [queries[i:i + self.multiquery] for i in range(0, len(queries), self.multiquery)]
+        else:
+            requests = [[part] for part in split(query, self.chunk_size)]
+
+        if len(requests) == 1 or self.workers <= 1:
+            for request in requests:
+                for rows in self._fetch(request):
+                    for row in rows:
+                        yield row
+
+            return
+
+        pool = ThreadPool(min(self.workers, len(requests)))
+
+        try:
+            for result in pool.imap(self._fetch, requests):
+                for rows in result:
+                    for row in rows:
+                        yield row
+        finally:
+            pool.terminate()
+
+    def _fetch(self, queries):
+        """
+        Run queries in a single request, returning a list of the rows of each query.
+
+        :param queries: A list of strings describing FQL queries.
+        """
+        if len(queries) == 1:
+            return [self.graph.fql(queries[0], retry=self.retry).get('data', [])]
+
+        response = self.graph.fql(
+            json_codec.dumps(dict(('q%d' % index, query) for index, query in enumerate(queries))),
+            retry=self.retry
+        )
+
+        results = dict((result['name'], result['fql_result_set']) for result in response.get('data', []))
+
+        return [results.get('q%d' % index, []) for index in range(len(queries))]
+
+
+def split(query, chunk_size=500):
+    """
+    Split an FQL query into queries whose ``IN`` lists have at most the given number of values each.
+
+    :param query: A string describing the FQL query.
+    :param chunk_size: An integer describing how many values each ``IN`` list may have.
+
+    Returns a list of strings describing the queries. If several lists are too long, there is a query for
+    each combination of their chunks. Only literal lists are split; subqueries such as
+    ``IN (SELECT uid2 FROM friend WHERE uid1 = me())`` are left alone.
+    """
+    lists = [(match, VALUE.findall(match.group(1))) for match in IN_LIST.finditer(query)]
+
+    if not lists:
+        return [query]
+
+    match, values = max(lists, key=lambda item: len(item[1]))
+
+    if len(values) <= chunk_size:
+        return [query]
+
+    chunks = [
+        '%s%s%s' % (query[:match.start(1)], ','.join(values[i:i + chunk_size]), query[match.end(1):])
+        for i in range(0, len(values), chunk_size)
+    ]
+
+    # Split whichever other lists are too long, too.
+    return [part for chunk in chunks for part in split(chunk, chunk_size)]
+
+
+IN_LIST = re.compile(r'\bIN\s*\((?!\s*SELECT\b)([^()]*)\)', re.IGNORECASE)
+
+VALUE = re.compile(r'\'(?:[^\'\\]|\\.)*\'|"(?:[^"\\]|\\.)*"|[^,\s]+')
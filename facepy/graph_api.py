@@ -1,26 +1,42 @@
-try:
-    import simplejson as json
-except ImportError:
-    import json  # flake8: noqa
+import os
+import re
+import threading
+import time
 import requests
 
+from datetime import datetime
+from itertools import islice
+from multiprocessing.pool import ThreadPool
+from Queue import Queue
+from StringIO import StringIO
 from urllib import urlencode
 
+from facepy import json_codec
 from facepy.exceptions import *
+from facepy.export import Sink, CallableSink, ExportReport, load_checkpoint, save_checkpoint
+from facepy.fql import FQLExecutor
+from facepy.ids import IdArray
+from facepy.objects import template, wrap
+from facepy.watch import Watcher
 
 
 class GraphAPI(object):
-    def __init__(self, oauth_token=False, url='https://graph.facebook.com'):
+    def __init__(self, oauth_token=False, url='https://graph.facebook.com', tracker=None, session=None):
         """
         Initialize GraphAPI with an OAuth access token.
 
         :param oauth_token: A string describing an OAuth access token.
+        :param tracker: An optional ``facepy.objects.FieldTracker`` instance. If given, ``get`` returns
+                        ``GraphObject`` instances that record which fields are read.
+        :param session: An optional ``requests`` session to make requests with, so that several ``GraphAPI``
+                        instances may share its connections (defaults to a new session).
         """
         self.oauth_token = oauth_token
-        self.session = requests.session()
+        self.session = session or requests.session()
         self.url = url.strip('/')
+        self.tracker = tracker
 
-    def get(self, path='', page=False, retry=3, **options):
+    def get(self, path='', page=False, retry=3, raw=False, **options):
         """
         Get an item from the Graph API.
 
@@ -28,17 +44,54 @@ class GraphAPI(object):
         :param page: A boolean describing whether to return a generator that
                      iterates over each page of results.
         :param retry: An integer describing how many times the request may be retried.
+        :param raw: A boolean describing whether to return the response as it was received, rather than
+                    parsed. Errors are raised regardless. Raw responses can't be paged.
         :param options: Graph API parameters such as 'limit', 'offset' or 'since'.
 
         See `Facebook's Graph API documentation <http://developers.facebook.com/docs/reference/api/>`_
         for an exhaustive list of parameters.
+
+        If this instance has a ``FieldTracker``, objects are returned as ``facepy.objects.GraphObject``
+        instances, and if the tracker is automatic, requests that don't specify 'fields' only ask for the
+        fields that have been read from earlier responses to the same kind of path.
+        """
+        if raw:
+            if page:
+                raise ValueError('Raw responses can\'t be paged')
+
+            return self._get(path, retry=retry, raw=True, **options)
+
+        if self.tracker is None:
+            return self._get(path, page, retry, **options)
+
+        path_template = template(path)
+
+        if self.tracker.auto and 'fields' not in options:
+            fields = self.tracker.fields(path_template)
+
+            if fields:
+                options['fields'] = ['id'] + [field for field in fields if field != 'id']
+
+        response = self._get(path, page, retry, **options)
+
+        if page:
+            return (wrap(result, path_template, self.tracker) for result in response)
+
+        return wrap(response, path_template, self.tracker)
+
+    def _get(self, path='', page=False, retry=3, raw=False, **options):
+        """
+        Get an item from the Graph API as it was parsed, regardless of any ``FieldTracker``.
+
+        See ``get`` for a description of the parameters.
         """
         response = self._query(
             method='GET',
             path=path,
             data=options,
             page=page,
-            retry=retry
+            retry=retry,
+            raw=raw
         )
 
         if response is False:
@@ -46,6 +99,212 @@ class GraphAPI(object):
 
         return response
 
+    def _get_if_changed(self, path, etag=None, retry=3, **options):
+        """
+        Get an item from the Graph API unless it is unchanged since it was last fetched, returning a tuple
+        where the first item is the parsed response, or ``None`` if it is unchanged, and the second is the
+        response's ETag, or ``None`` if the Graph API didn't give one.
+
+        :param path: A string describing the path to the item.
+        :param etag: A string describing the ETag of the item when it was last fetched.
+        :param retry: An integer describing how many times the request may be retried.
+        :param options: Graph API parameters such as 'fields' or 'limit'.
+        """
+        response, new_etag = self._query(
+            method='GET',
+            path=path,
+            data=options,
+            retry=retry,
+            headers={'If-None-Match': etag} if etag else {},
+            etag=True
+        )
+
+        if response is None:
+            return None, new_etag or etag
+
+        return response, new_etag
+
+    def get_parallel(self, path, limit=100, workers=4, total=None, retry=3, **options):
+        """
+        Get every item of a connection that supports 'limit' and 'offset' by fetching its pages concurrently.
+
+        :param path: A string describing the path to the connection.
+        :param limit: An integer describing how many items to request per page.
+        :param workers: An integer describing how many pages may be requested at once.
+        :param total: An optional integer describing how many items the connection holds, if known.
+        :param retry: An integer describing how many times each page may be retried.
+        :param options: Graph API parameters such as 'fields'.
+
+        Returns a generator that yields each item in order. Pages are requested ``workers`` at a time until
+        an empty page is found (or ``total`` items have been requested), and items that appear on both sides
+        of a page boundary are only yielded once. Pages with less than ``limit`` items don't end the
+        connection, since Facebook filters items out of pages after they've been paginated, such as for
+        privacy reasons.
+        """
+        def fetch(offset):
+            response = self._get(path, retry=retry, limit=limit, offset=offset, **options)
+
+            return response.get('data', [])
+
+        def offsets():
+            offset = 0
+
+            while total is None or offset < total:
+                yield offset
+                offset += limit
+
+        pool = ThreadPool(workers)
+        remaining = offsets()
+        previous = set()
+
+        try:
+            while True:
+                wave = list(islice(remaining, workers))
+
+                if not wave:
+                    return
+
+                for items in pool.map(fetch, wave):
+                    current = set()
+
+                    for item in items:
+                        id = item.get('id') if isinstance(item, dict) else None
+
+                        if id is not None:
+                            if id in previous:
+                                continue
+
+                            current.add(id)
+
+                        yield item
+
+                    if not items:
+                        return
+
+                    previous = current
+        finally:
+            pool.close()
+            pool.join()
+
+    def get_range(self, path, since, until, windows=8, workers=4, limit=100, min_window=60, **options):
+        """
+        Get every item of a connection between two points in time by splitting the time range into windows
+        and paging through the windows concurrently.
+
+        :param path: A string describing the path to a connection that supports 'since' and 'until'.
+        :param since: A ``datetime`` instance or an integer describing the start of the time range.
+        :param until: A ``datetime`` instance or an integer describing the end of the time range.
+        :param windows: An integer describing how many windows to split the time range into initially.
+        :param workers: An integer describing how many windows may be paged through at once.
+        :param limit: An integer describing how many items to request per page.
+        :param min_window: An integer describing the shortest window, in seconds, that may be split further.
+        :param options: Graph API parameters such as 'fields'.
+
+        Returns a generator that yields each item once, in no particular order. Windows that hold more than
+        one page of items are split in two until they are shorter than ``2 * min_window`` seconds, and items
+        that are found in more than one window are only yielded once.
+        """
+        def timestamp(value):
+            if isinstance(value, datetime):
+                return int(time.mktime(value.timetuple()))
+
+            return int(value)
+
+        def split(since, until, count):
+            step = max((until - since) // count, 1)
+            bounds = range(since, until, step)[:count] + [until]
+
+            return zip(bounds[:-1], bounds[1:])
+
+        def work():
+            while True:
+                window = tasks.get()
+
+                if window is None:
+                    return
+
+                since, until = window
+
+                try:
+                    pages = self._get(path, page=True, since=since, until=until, limit=limit, **options)
+
+                    for index, page in enumerate(pages):
+                        data = page.get('data', []) if isinstance(page, dict) else []
+                        results.put(('items', data))
+
+                        # Split windows that hold more than a page of items so they are paged through in parallel.
+                        if index == 0 and len(data) >= limit and until - since >= 2 * min_window:
+                            results.put(('split', split(since, until, 2)))
+                            break
+                except Exception as exception:
+                    results.put(('error', exception))
+                finally:
+                    # The consumer counts windows, so it must hear about every window however it ends.
+                    results.put(('done', window))
+
+        tasks, results = Queue(), Queue()
+        outstanding = 0
+
+        for window in split(timestamp(since), timestamp(until), windows):
+            tasks.put(window)
+            outstanding += 1
+
+        threads = [threading.Thread(target=work) for _ in range(workers)]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        seen = set()
+
+        try:
+            while outstanding:
+                kind, value = results.get()
+
+                if kind == 'items':
+                    for item in value:
+                        id = item.get('id') if isinstance(item, dict) else None
+
+                        if id is not None:
+                            if id in seen:
+                                continue
+
+                            seen.add(id)
+
+                        yield item
+                elif kind == 'split':
+                    for window in value:
+                        tasks.put(window)
+                        outstanding += 1
+                elif kind == 'error':
+                    raise value
+                elif kind == 'done':
+                    outstanding -= 1
+        finally:
+            for thread in threads:
+                tasks.put(None)
+
+    def get_ids(self, path, limit=500, retry=3, **options):
+        """
+        Get the IDs of every item of a connection, such as the IDs of a user's friends.
+
+        :param path: A string describing the path to the connection.
+        :param limit: An integer describing how many IDs to request per page.
+        :param retry: An integer describing how many times the request may be retried.
+        :param options: Graph API parameters such as 'since' or 'until'.
+
+        Returns a ``facepy.ids.IdArray`` instance, which holds the IDs as 64-bit integers rather than strings.
+        """
+        ids = IdArray()
+
+        pages = self._get(path, page=True, retry=retry, limit=limit, fields='id', **options)
+
+        for page in pages:
+            if isinstance(page, dict):
+                ids.extend(item['id'] for item in page.get('data', []))
+
+        return ids
+
     def post(self, path='', retry=0, **data):
         """
         Post an item to the Graph API.
@@ -117,11 +376,13 @@ class GraphAPI(object):
 
         return response
 
-    def batch(self, requests):
+    def batch(self, requests, raw=False):
         """
         Make a batch request.
 
         :param requests: A list of dictionaries with keys 'method', 'relative_url' and optionally 'body'.
+        :param raw: A boolean describing whether to yield the body of each response as it was received,
+                    rather than parsed.
 
         Yields a list of responses and/or exceptions.
         """
@@ -131,7 +392,7 @@ class GraphAPI(object):
                 request['body'] = urlencode(request['body'])
 
         responses = self.post(
-            batch=json.dumps(requests)
+            batch=json_codec.dumps(requests)
         )
 
         for response, request in zip(responses, requests):
@@ -144,17 +405,339 @@ class GraphAPI(object):
                 continue
 
             try:
-                yield self._parse(response['body'])
+                yield self._check(response['body']) if raw else self._parse(response['body'])
             except FacepyError as exception:
                 exception.request = request
                 yield exception
 
-    def fql(self, query, retry=3):
+    def post_many(self, operations, batch_size=50, workers=4, retry=3):
+        """
+        Post many items to the Graph API in concurrent batch requests.
+
+        :param operations: A list of tuples describing the path to post to and a dictionary of Graph API
+                           parameters, e.g. ``('me/feed', {'message': 'Hi me.'})``.
+        :param batch_size: An integer describing how many operations to pack into each batch request.
+        :param workers: An integer describing how many batch requests may be in flight at once.
+        :param retry: An integer describing how many times each operation may be retried if Facebook reports
+                      that it failed. Operations aren't retried when a batch request fails as a whole, such as
+                      when it times out, as Facebook may have posted them anyway.
+
+        Returns a ``BatchReport`` instance describing which operations succeeded, failed or were retried.
+        """
+        operations = list(operations)
+        requests = []
+
+        for path, data in operations:
+            request = {'method': 'POST', 'relative_url': path}
+
+            if data:
+                request['body'] = data
+
+            requests.append(request)
+
+        return self._batch_many(requests, operations, batch_size, workers, retry)
+
+    def delete_many(self, paths, batch_size=50, workers=4, retry=3):
+        """
+        Delete many items in the Graph API in concurrent batch requests.
+
+        :param paths: A list of strings describing the paths to the items.
+        :param batch_size: An integer describing how many deletions to pack into each batch request.
+        :param workers: An integer describing how many batch requests may be in flight at once.
+        :param retry: An integer describing how many times each deletion may be retried.
+
+        Returns a ``BatchReport`` instance describing which paths were deleted, which failed and which were retried.
+        """
+        paths = list(paths)
+
+        requests = [{'method': 'DELETE', 'relative_url': path} for path in paths]
+
+        return self._batch_many(requests, paths, batch_size, workers, retry)
+
+    def export(self, path, sink, checkpoint=None, interval=10, progress=None, retry=3, **options):
+        """
+        Export every item of a connection to a sink, one page at a time.
+
+        :param path: A string describing the path to the connection.
+        :param sink: A ``facepy.export.Sink`` instance such as ``NDJSONSink`` or ``CSVSink``, or a function
+                     to call with each item.
+        :param checkpoint: An optional string describing the path to a file in which to record the progress
+                           of the export. If the file exists, the export is resumed from it.
+        :param interval: An integer describing how many pages to export between checkpoints.
+        :param progress: An optional function that is called with an ``ExportReport`` after each page.
+        :param retry: An integer describing how many times each page may be retried.
+        :param options: Graph API parameters such as 'fields' or 'limit'.
+
+        Returns an ``ExportReport`` instance describing the export. The checkpoint is removed once the export
+        is complete.
+        """
+        if not isinstance(sink, Sink):
+            sink = CallableSink(sink)
+
+        report = ExportReport()
+        state = load_checkpoint(checkpoint) if checkpoint else None
+
+        if state:
+            report.resumed = True
+            sink.open(state['offset'])
+
+            if not state['next']:
+                sink.close()
+                os.remove(checkpoint)
+                report.finished_at = time.time()
+
+                return report
+
+            pages = self._query('GET', state['next'], page=True, retry=retry)
+        else:
+            sink.open()
+            pages = self._query('GET', path, options, page=True, retry=retry)
+
+        try:
+            for page in pages:
+                for item in page.get('data', []) if isinstance(page, dict) else []:
+                    report.bytes += sink.write(item)
+                    report.items += 1
+
+                report.pages += 1
+
+                if checkpoint and report.pages % interval == 0:
+                    try:
+                        next_url = page['paging']['next']
+                    except (KeyError, TypeError):
+                        next_url = None
+
+                    sink.flush()
+                    save_checkpoint(checkpoint, {'next': next_url, 'offset': sink.tell()})
+
+                if progress:
+                    progress(report)
+
+            sink.flush()
+        finally:
+            sink.close()
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        report.finished_at = time.time()
+
+        return report
+
+    def watch(self, paths, interval=60, rounds=None, key='id', **options):
+        """
+        Poll items or connections of the Graph API and yield what has changed.
+
+        :param paths: A string describing the path to poll, or a list of strings describing several paths.
+        :param interval: A number describing how many seconds to take to poll every path once. Polls are
+                         spread evenly over the interval.
+        :param rounds: An optional integer describing how many times to poll every path. By default, paths
+                       are polled until the generator is closed.
+        :param key: A string describing the field that identifies items.
+        :param options: Graph API parameters such as 'fields' or 'limit'.
+
+        Returns a generator that yields a ``facepy.watch.Changes`` instance describing the items that were
+        added, removed or changed each time a path changes, starting with every item of each path. See
+        ``facepy.watch.Watcher`` for details.
+        """
+        if isinstance(paths, basestring):
+            paths = [paths]
+
+        return Watcher(self, paths, interval, key, **options).watch(rounds)
+
+    def download(self, path, destination, chunk_size=64 * 1024, resume=False, retry=3, **options):
+        """
+        Download a file from the Graph API, such as a picture or a video, without holding it in memory.
+
+        :param path: A string describing the path to the file, e.g. ``me/picture``.
+        :param destination: A string describing the path to save the file to, or a file-like object opened
+                            for writing.
+        :param chunk_size: An integer describing how many bytes to read and write at a time.
+        :param resume: A boolean describing whether to resume an incomplete download to a path by requesting
+                       only the bytes that are missing. Only resume downloads of files that don't change, as
+                       there is no telling whether the bytes on disk are those of the same file.
+        :param retry: An integer describing how many times the download may be resumed after transport errors.
+        :param options: Graph API parameters such as 'type'.
+
+        Returns an integer describing the size of the file. Raises ``HTTPError`` if the server responds
+        with an error status.
+        """
+        if isinstance(destination, basestring):
+            offset = os.path.getsize(destination) if resume and os.path.exists(destination) else 0
+            file = open(destination, 'r+b' if offset else 'wb')
+            file.seek(offset)
+        else:
+            offset, file = 0, destination
+
+        if self.oauth_token:
+            options['access_token'] = self.oauth_token
+
+        etag = None
+
+        try:
+            while True:
+                headers = {}
+
+                if offset:
+                    headers['Range'] = 'bytes=%d-' % offset
+
+                    # Have the server send the whole file instead if it has changed since we started.
+                    if etag:
+                        headers['If-Range'] = etag
+
+                try:
+                    response = self.session.request(
+                        'GET',
+                        self._url(path),
+                        params=options,
+                        headers=headers,
+                        allow_redirects=True,
+                        **STREAM
+                    )
+
+                    content_range = response.headers.get('content-range')
+
+                    if offset and response.status_code == 416:
+                        # The file was complete already, unless the server says it has another size.
+                        if content_range in (None, 'bytes */%d' % offset):
+                            return offset
+
+                        offset = _rewind(file, offset)
+                        continue
+
+                    # Facebook responds with JSON rather than the file upon errors.
+                    content_type = response.headers.get('content-type', '')
+
+                    if 'json' in content_type or 'javascript' in content_type:
+                        self._parse(response.content)
+
+                    if response.status_code >= 400:
+                        raise HTTPError('Could not download %s: HTTP %d' % (path, response.status_code))
+
+                    if offset and response.status_code == 206:
+                        # Start over if the server sent another part of the file than the one we asked for.
+                        if not (content_range or '').startswith('bytes %d-' % offset):
+                            offset = _rewind(file, offset)
+                            continue
+                    elif offset:
+                        # The server sent the whole file, either because it doesn't support ranges or
+                        # because the file has changed.
+                        offset = _rewind(file, offset)
+
+                    etag = response.headers.get('etag')
+
+                    for chunk in response.iter_content(chunk_size):
+                        file.write(chunk)
+                        offset += len(chunk)
+
+                    # Drop whatever was left of a longer file from an earlier download.
+                    if file is not destination:
+                        file.truncate()
+
+                    return offset
+                except requests.RequestException as exception:
+                    if not retry:
+                        raise HTTPError(exception.message)
+
+                    retry -= 1
+        finally:
+            if file is not destination:
+                file.close()
+
+    def download_many(self, downloads, workers=4, **options):
+        """
+        Download many files from the Graph API concurrently.
+
+        :param downloads: A list of tuples describing the path to each file and its destination.
+        :param workers: An integer describing how many files may be downloaded at once.
+        :param options: Parameters for ``download``, such as 'chunk_size', and Graph API parameters.
+
+        Returns a list describing the size of each file, or the exception its download failed with.
+        """
+        def download(item):
+            path, destination = item
+
+            try:
+                return self.download(path, destination, **dict(options))
+            except FacepyError as exception:
+                return exception
+
+        return _map(download, downloads, workers)
+
+    def upload_video(self, path, source, session=None, retry=3, progress=None, **parameters):
+        """
+        Upload a video in chunks using Facebook's resumable upload protocol, reading one chunk at a time.
+
+        :param path: A string describing the path to upload the video to, e.g. ``me/videos``.
+        :param source: A string describing the path to the video, or a file-like object opened for reading.
+        :param session: An optional ``UploadSession`` instance describing an interrupted upload to resume.
+        :param retry: An integer describing how many times each chunk may be retried.
+        :param progress: An optional function that is called with the ``UploadSession`` after each chunk,
+                         e.g. to save it so that the upload may be resumed.
+        :param parameters: Graph API parameters such as 'title' or 'description'.
+
+        Returns the Graph API's response to the final request.
+        """
+        file = open(source, 'rb') if isinstance(source, basestring) else source
+
+        def upload(**data):
+            for attempt in range(retry + 1):
+                # File uploads are removed from the data as they are sent, so give each attempt a copy.
+                try:
+                    return self.post(path, **dict(data))
+                except FacepyError:
+                    if attempt == retry:
+                        raise
+
+                    if 'video_file_chunk' in data:
+                        data['video_file_chunk'].seek(0)
+
+        try:
+            if session is None:
+                file.seek(0, os.SEEK_END)
+
+                response = upload(upload_phase='start', file_size=file.tell())
+
+                session = UploadSession(
+                    id=response['upload_session_id'],
+                    video_id=response.get('video_id'),
+                    start_offset=int(response['start_offset']),
+                    end_offset=int(response['end_offset'])
+                )
+
+                if progress:
+                    progress(session)
+
+            while session.start_offset < session.end_offset:
+                file.seek(session.start_offset)
+
+                chunk = StringIO(file.read(session.end_offset - session.start_offset))
+
+                response = upload(
+                    upload_phase='transfer',
+                    upload_session_id=session.id,
+                    start_offset=session.start_offset,
+                    video_file_chunk=chunk
+                )
+
+                session.start_offset = int(response['start_offset'])
+                session.end_offset = int(response['end_offset'])
+
+                if progress:
+                    progress(session)
+        finally:
+            if file is not source:
+                file.close()
+
+        return upload(upload_phase='finish', upload_session_id=session.id, **parameters)
+
+    def fql(self, query, retry=3, raw=False):
         """
         Use FQL to powerfully extract data from Facebook.
 
         :param query: A FQL query or FQL multiquery ({'query_name': "query",...})
         :param retry: An integer describing how many times the request may be retried.
+        :param raw: A boolean describing whether to return the response as it was received, rather than parsed.
 
         See `Facebook's FQL documentation <http://developers.facebook.com/docs/reference/fql/>`_
         for an exhaustive list of details.
@@ -162,10 +745,28 @@ class GraphAPI(object):
         return self._query(
             method='GET',
             path='fql?%s' % urlencode({'q': query}),
-            retry=retry
+            retry=retry,
+            raw=raw
         )
 
-    def _query(self, method, path, data=None, page=False, retry=0):
+    def fql_chunked(self, query, chunk_size=500, workers=4, multiquery=None, retry=3):
+        """
+        Use FQL to extract data from Facebook with queries whose ``IN`` lists are too long for a single request.
+
+        :param query: A string describing the FQL query.
+        :param chunk_size: An integer describing how many values of each ``IN`` list to send in each request.
+        :param workers: An integer describing how many requests may be in flight at once.
+        :param multiquery: An optional integer describing how many queries to pack into each request as an
+                           FQL multiquery, splitting each request's ``chunk_size`` values between them. By
+                           default, each query is sent in a request of its own.
+        :param retry: An integer describing how many times each request may be retried.
+
+        Returns a generator that yields a dictionary describing each row. See ``facepy.fql.FQLExecutor``
+        for details.
+        """
+        return FQLExecutor(self, chunk_size, workers, multiquery, retry).execute(query)
+
+    def _query(self, method, path, data=None, page=False, retry=0, raw=False, headers=None, etag=False):
         """
         Fetch an object from the Graph API and parse the output, returning a tuple where the first item
         is the object yielded by the Graph API and the second is the URL for the next page of results, or
@@ -176,13 +777,24 @@ class GraphAPI(object):
         :param data: A dictionary of HTTP GET parameters (for GET requests) or POST data (for POST requests).
         :param page: A boolean describing whether to return an iterator that iterates over each page of results.
         :param retry: An integer describing how many times the request may be retried.
+        :param raw: A boolean describing whether to return the response as it was received, rather than parsed.
+        :param headers: An optional dictionary of HTTP headers to send with GET and DELETE requests, such as
+                        'If-None-Match'. If the Graph API responds that the object is not modified, the object
+                        is ``None``.
+        :param etag: A boolean describing whether to return a tuple of the object and the response's ETag,
+                     or ``None`` if the Graph API didn't give one, rather than just the object.
         """
         data = data or {}
 
         def load(method, url, data):
             try:
                 if method in ['GET', 'DELETE']:
-                    response = self.session.request(method, url, params=data, allow_redirects=True)
+                    if headers is None:
+                        response = self.session.request(method, url, params=data, allow_redirects=True)
+                    else:
+                        response = self.session.request(
+                            method, url, params=data, headers=headers, allow_redirects=True
+                        )
 
                 if method in ['POST', 'PUT']:
                     files = {}
@@ -198,12 +810,20 @@ class GraphAPI(object):
             except requests.RequestException as exception:
                 raise HTTPError(exception.message)
 
-            result = self._parse(response.content)
+            if headers and response.status_code == 304:
+                result, next_url = None, None
+            elif raw:
+                result, next_url = self._check(response.content), None
+            else:
+                result = self._parse(response.content)
 
-            try:
-                next_url = result['paging']['next']
-            except (KeyError, TypeError):
-                next_url = None
+                try:
+                    next_url = result['paging']['next']
+                except (KeyError, TypeError):
+                    next_url = None
+
+            if etag:
+                result = result, response.headers.get('etag')
 
             return result, next_url
 
@@ -223,11 +843,7 @@ class GraphAPI(object):
             if isinstance(data[key], (list, set, tuple)) and all([isinstance(item, basestring) for item in data[key]]):
                 data[key] = ','.join(data[key])
 
-        # Support absolute paths too
-        if not path.startswith('/'):
-            path = '/' + str(path)
-
-        url = '%s%s' % (self.url, path)
+        url = self._url(path)
 
         if self.oauth_token:
             data['access_token'] = self.oauth_token
@@ -239,10 +855,123 @@ class GraphAPI(object):
                 return load(method, url, data)[0]
         except FacepyError:
             if retry:
-                return self._query(method, path, data, page, retry - 1)
+                return self._query(method, path, data, page, retry - 1, raw, headers, etag)
             else:
                 raise
 
+    def _batch_many(self, requests, items, batch_size=50, workers=4, retry=3, progress=None):
+        """
+        Send any number of requests as batch requests of at most ``batch_size`` requests each, running up
+        to ``workers`` batch requests concurrently and retrying failed requests in subsequent batches.
+
+        :param requests: A list of dictionaries with keys 'method', 'relative_url' and optionally 'body'.
+        :param items: A list describing the caller's view of each request, used in the report.
+        :param batch_size: An integer describing the maximum number of requests per batch (Facebook allows 50).
+        :param workers: An integer describing how many batch requests may be in flight at once.
+        :param retry: An integer describing how many times each request may be retried. POST requests are
+                      only retried if Facebook reports that they failed or didn't complete, not if the batch
+                      request as a whole fails, as Facebook may have processed them anyway.
+        :param progress: An optional function that is called with the number of requests that are done and
+                         the total number of requests each time a batch request completes.
+        """
+        report = BatchReport()
+        attempts = [0] * len(requests)
+        results = [None] * len(requests)
+        pending = range(len(requests))
+        lock = threading.Lock()
+        done = [0]
+
+        def send(chunk):
+            try:
+                # Batch requests encode their bodies in place, so give them copies.
+                responses = list(self.batch([dict(requests[index]) for index in chunk]))
+            except FacepyError as exception:
+                responses = [exception] * len(chunk)
+
+                # Sending posts again could duplicate them.
+                for index in chunk:
+                    if requests[index]['method'] == 'POST':
+                        attempts[index] = retry
+
+            for position, (index, response) in enumerate(zip(chunk, responses)):
+                if response is False:
+                    responses[position] = FacebookError('Could not %s "%s"' % (
+                        requests[index]['method'].lower(), requests[index]['relative_url']
+                    ))
+
+                # Facebook responds with null for requests of a batch that didn't complete.
+                if response is None:
+                    responses[position] = FacebookError('Could not complete %s "%s"' % (
+                        requests[index]['method'].lower(), requests[index]['relative_url']
+                    ))
+
+            if progress:
+                with lock:
+                    # Requests that will be retried aren't done yet.
+                    done[0] += len([
+                        index for index, response in zip(chunk, responses)
+                        if not isinstance(response, FacepyError) or attempts[index] >= retry
+                    ])
+
+                    progress(done[0], len(requests))
+
+            return responses
+
+        while pending:
+            chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            pending = []
+
+            for chunk, responses in zip(chunks, _map(send, chunks, workers)):
+                for index, response in zip(chunk, responses):
+                    if isinstance(response, FacepyError) and attempts[index] < retry:
+                        if not attempts[index]:
+                            report.retried.append(items[index])
+
+                        attempts[index] += 1
+                        pending.append(index)
+                    else:
+                        results[index] = response
+
+        for item, result in zip(items, results):
+            if isinstance(result, FacepyError):
+                report.failed.append((item, result))
+            else:
+                report.succeeded.append((item, result))
+
+        return report
+
+    def _url(self, path):
+        """
+        Return a string describing the URL of a path in the Graph API.
+
+        :param path: A string describing the path, or an absolute URL such as those given for pagination.
+        """
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+
+        # Support absolute paths too
+        if not path.startswith('/'):
+            path = '/' + str(path)
+
+        return '%s%s' % (self.url, path)
+
+    def _check(self, data):
+        """
+        Check the response from Facebook's Graph API for errors without parsing it, returning the response
+        as it was received or ``False`` if Facebook responded with 'false'.
+
+        :param data: A string describing the Graph API's response.
+        """
+        # Errors are objects whose first (and only) key is 'error', or 'error_code' or 'error_msg' in
+        # Facebook's legacy error format, so we only need to look at the beginning of the response.
+        if ERROR.match(data):
+            self._parse(data)
+
+        if len(data) < 16 and data.strip() == 'false':
+            return False
+
+        return data
+
     def _parse(self, data):
         """
         Parse the response from Facebook's Graph API.
@@ -250,7 +979,7 @@ class GraphAPI(object):
         :param data: A string describing the Graph API's response.
         """
         try:
-            data = json.loads(data)
+            data = json_codec.loads(data)
         except ValueError:
             return data
 
@@ -292,3 +1021,92 @@ class GraphAPI(object):
 
     # Proxy exceptions for ease of use and backwards compatibility.
     FacebookError, OAuthError, HTTPError = FacebookError, OAuthError, HTTPError
+
+
+ERROR = re.compile(r'\s*\{\s*"error')
+
+# Requests streams responses with ``stream=True`` as of 1.0 and with ``prefetch=False`` before that.
+STREAM = {'stream': True} if int(requests.__version__.split('.')[0]) >= 1 else {'prefetch': False}
+
+
+class BatchReport(object):
+    """
+    A ``BatchReport`` instance describes the outcome of a bulk operation such as ``GraphAPI#post_many``
+    or ``GraphAPI#delete_many``.
+    """
+
+    succeeded = None
+    """A list of tuples describing each operation that succeeded and the Graph API's response."""
+
+    failed = None
+    """A list of tuples describing each operation that failed and the exception it failed with."""
+
+    retried = None
+    """A list describing each operation that was retried at least once."""
+
+    def __init__(self):
+        self.succeeded, self.failed, self.retried = [], [], []
+
+    def __len__(self):
+        return len(self.succeeded) + len(self.failed)
+
+
+class UploadSession(object):
+    """
+    An ``UploadSession`` instance describes the progress of a resumable video upload. Save its attributes
+    to resume an interrupted upload with ``GraphAPI#upload_video``.
+    """
+
+    id = None
+    """A string describing the ID of the upload session."""
+
+    video_id = None
+    """A string describing the ID of the video being uploaded."""
+
+    start_offset = None
+    """An integer describing the offset of the next chunk Facebook expects."""
+
+    end_offset = None
+    """An integer describing the offset at which the next chunk Facebook expects ends."""
+
+    def __init__(self, id, video_id, start_offset, end_offset):
+        self.id, self.video_id = id, video_id
+        self.start_offset, self.end_offset = start_offset, end_offset
+
+    def to_dict(self):
+        """Return a dictionary describing the session, suitable for ``UploadSession(**dictionary)``."""
+        return {
+            'id': self.id,
+            'video_id': self.video_id,
+            'start_offset': self.start_offset,
+            'end_offset': self.end_offset
+        }
+
+
+def _map(function, items, workers):
+    """
+    Apply ``function`` to each of ``items`` using up to ``workers`` threads, returning a list of the
+    results in order.
+    """
+    items = list(items)
+
+    if workers <= 1 or len(items) <= 1:
+        return map(function, items)
+
+    pool = ThreadPool(min(workers, len(items)))
+
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _rewind(file, offset):
+    """
+    Discard the given number of bytes that were last written to ``file``, returning the new offset.
+    """
+    file.seek(-offset, os.SEEK_CUR)
+    file.truncate()
+
+    return 0
@@ -0,0 +1,228 @@
+import hashlib
+import struct
+
+from array import array
+
+# Python 2 has no typecode for 64-bit integers, but C longs are 64 bits wide on 64-bit Unix platforms.
+try:
+    TYPECODE = 'q'
+    array(TYPECODE)
+except ValueError:
+    TYPECODE = 'l'
+
+
+def to_integer(id):
+    """
+    Convert a Facebook ID to an integer.
+
+    :param id: A string or integer describing a Facebook ID.
+
+    Numeric IDs are converted to positive integers as is. Other IDs, such as the IDs of posts
+    (``<user id>_<post id>``), are hashed to negative integers.
+    """
+    if isinstance(id, (int, long)):
+        return id
+
+    if isinstance(id, unicode):
+        id = id.encode('utf-8')
+
+    if id.isdigit():
+        return int(id)
+
+    return -(struct.unpack('<Q', hashlib.md5(id).digest()[:8])[0] >> 1) or -1
+
+
+class IdSet(object):
+    """
+    An ``IdSet`` is a set of Facebook IDs that stores each ID as a 64-bit integer in an open-addressed hash
+    table, using a fraction of the memory of a ``set`` of strings.
+
+    Numeric IDs are stored exactly. Other IDs are stored as 63-bit hashes, so two of them may collide,
+    albeit with negligible probability.
+    """
+
+    def __init__(self, ids=(), capacity=1024):
+        """
+        Initialize a set.
+
+        :param ids: An optional iterable of IDs to add to the set.
+        :param capacity: An integer describing how many IDs to make room for initially.
+        """
+        self._bits = 1
+
+        while 1 << self._bits < capacity * 2:
+            self._bits += 1
+
+        self._slots = array(TYPECODE, [0]) * (1 << self._bits)
+        self._size = 0
+
+        for id in ids:
+            self.add(id)
+
+    def add(self, id):
+        """
+        Add an ID to the set.
+
+        :param id: A string or integer describing a Facebook ID.
+
+        Returns a boolean describing whether the ID was added, i.e. whether it wasn't in the set already.
+        """
+        key = to_integer(id)
+        index = self._find(key)
+
+        if self._slots[index] == key:
+            return False
+
+        self._slots[index] = key
+        self._size += 1
+
+        # Keep the table at most half full, so that probe sequences stay short.
+        if self._size * 2 > len(self._slots):
+            self._grow()
+
+        return True
+
+    def __contains__(self, id):
+        key = to_integer(id)
+
+        return self._slots[self._find(key)] == key
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for key in self._slots:
+            if key:
+                yield key
+
+    def _find(self, key):
+        """Return the index of the slot that holds the given key, or the empty slot it belongs in."""
+        slots = self._slots
+        mask = len(slots) - 1
+
+        # Fibonacci hashing spreads sequential IDs across the table.
+        index = ((key & 0xFFFFFFFFFFFFFFFF) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+
+        while slots[index] and slots[index] != key:
+            index = (index + 1) & mask
+
+        return index
+
+    def _grow(self):
+        keys = [key for key in self._slots if key]
+
+        self._bits += 1
+        self._slots = array(TYPECODE, [0]) * (1 << self._bits)
+
+        for key in keys:
+            self._slots[self._find(key)] = key
+
+
+class IdArray(object):
+    """
+    An ``IdArray`` is a list of Facebook IDs that stores each ID as a 64-bit integer in an array, using
+    a fraction of the memory of a list of strings.
+
+    IDs are stored as described by ``to_integer`` and yielded as integers.
+    """
+
+    def __init__(self, ids=()):
+        """
+        Initialize an array.
+
+        :param ids: An optional iterable of IDs to add to the array.
+        """
+        self.array = array(TYPECODE)
+        self.extend(ids)
+
+    def append(self, id):
+        """
+        Add an ID to the end of the array.
+
+        :param id: A string or integer describing a Facebook ID.
+        """
+        self.array.append(to_integer(id))
+
+    def extend(self, ids):
+        """
+        Add IDs to the end of the array.
+
+        :param ids: An iterable of strings or integers describing Facebook IDs.
+        """
+        self.array.extend(to_integer(id) for id in ids)
+
+    def intersection(self, other):
+        """
+        Return a new ``IdArray`` with the IDs of this array that are also in ``other``, in order.
+
+        :param other: An ``IdArray`` or another iterable of IDs.
+        """
+        others = self._set(other)
+
+        return IdArray(id for id in self.array if id in others)
+
+    def difference(self, other):
+        """
+        Return a new ``IdArray`` with the IDs of this array that are not in ``other``, in order.
+
+        :param other: An ``IdArray`` or another iterable of IDs.
+        """
+        others = self._set(other)
+
+        return IdArray(id for id in self.array if id not in others)
+
+    def union(self, other):
+        """
+        Return a new ``IdArray`` with the IDs of this array followed by the IDs of ``other`` that are not
+        in this array.
+
+        :param other: An ``IdArray`` or another iterable of IDs.
+        """
+        union = IdArray()
+        union.array.extend(self.array)
+        union.extend(IdArray(other).difference(self))
+
+        return union
+
+    def unique(self):
+        """Return a new ``IdArray`` without duplicate IDs, in order."""
+        seen = IdSet(capacity=len(self.array))
+
+        return IdArray(id for id in self.array if seen.add(id))
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __contains__(self, id):
+        return to_integer(id) in self.array
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __eq__(self, other):
+        return isinstance(other, IdArray) and self.array == other.array
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'IdArray(%r)' % self.array.tolist()
+
+    def _set(self, ids):
+        """Return an ``IdSet`` of the given IDs for fast lookups that stay as compact as the array."""
+        if isinstance(ids, IdArray):
+            return IdSet(ids.array, capacity=len(ids.array))
+
+        return IdSet(ids)
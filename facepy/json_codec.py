@@ -0,0 +1,140 @@
+"""
+The ``json_codec`` module decides how Facepy parses and serializes JSON. By default, Facepy uses ``simplejson``
+if it is installed and the ``json`` module of the standard library otherwise, but you may choose any of the
+supported backends (or provide your own) with ``set_backend``::
+
+    from facepy import json_codec
+
+    json_codec.set_backend('ujson')
+"""
+
+from facepy.exceptions import FacepyError
+
+
+BACKENDS = ['ujson', 'simplejson', 'json']
+"""A list of strings describing the supported backends, fastest first."""
+
+
+class JSONCodec(object):
+    """A ``JSONCodec`` parses and serializes JSON with a particular backend."""
+
+    name = None
+    """A string describing the backend."""
+
+    def __init__(self, module, name=None):
+        """
+        Initialize a codec.
+
+        :param module: A module (or any object) with ``loads`` and ``dumps`` functions that behave like
+                       those of the ``json`` module.
+        :param name: An optional string describing the backend (defaults to the name of the module).
+        """
+        self.module = module
+        self.name = name or getattr(module, '__name__', repr(module))
+
+    def loads(self, data):
+        """
+        Parse JSON.
+
+        :param data: A byte string or a unicode string describing JSON.
+
+        Raises ``ValueError`` if the data isn't valid JSON.
+        """
+        return self.module.loads(data)
+
+    def dumps(self, obj, compact=False, sort_keys=False):
+        """
+        Serialize an object to JSON, returning a string.
+
+        :param obj: The object to serialize.
+        :param compact: A boolean describing whether to leave out whitespace after separators.
+        :param sort_keys: A boolean describing whether to sort the keys of objects.
+        """
+        if compact:
+            return self.module.dumps(obj, separators=(',', ':'), sort_keys=sort_keys)
+
+        return self.module.dumps(obj, sort_keys=sort_keys)
+
+
+class UltraJSONCodec(JSONCodec):
+    """A ``UltraJSONCodec`` parses and serializes JSON with ``ujson``, which always serializes compactly."""
+
+    def dumps(self, obj, compact=False, sort_keys=False):
+        return self.module.dumps(obj, sort_keys=sort_keys, escape_forward_slashes=False)
+
+
+CODECS = {
+    'ujson': UltraJSONCodec
+}
+
+
+def load_backend(name):
+    """
+    Get a codec for a backend.
+
+    :param name: A string describing the backend, e.g. ``ujson``.
+
+    Raises ``FacepyError`` if the backend is not supported or not installed.
+    """
+    if name not in BACKENDS:
+        raise FacepyError('Unsupported JSON backend "%s". Supported backends are %s' % (name, ', '.join(BACKENDS)))
+
+    try:
+        module = __import__(name)
+    except ImportError:
+        raise FacepyError('JSON backend "%s" is not installed' % name)
+
+    return CODECS.get(name, JSONCodec)(module, name)
+
+
+def available_backends():
+    """Return a list of strings describing the supported backends that are installed."""
+    backends = []
+
+    for name in BACKENDS:
+        try:
+            load_backend(name)
+        except FacepyError:
+            continue
+
+        backends.append(name)
+
+    return backends
+
+
+def set_backend(backend):
+    """
+    Set the backend Facepy uses to parse and serialize JSON.
+
+    :param backend: A string describing a supported backend (e.g. ``ujson``), a ``JSONCodec`` instance
+                    or a module with ``loads`` and ``dumps`` functions.
+    """
+    global codec
+
+    if isinstance(backend, basestring):
+        codec = load_backend(backend)
+    elif isinstance(backend, JSONCodec):
+        codec = backend
+    else:
+        codec = JSONCodec(backend)
+
+
+def get_backend():
+    """Return the ``JSONCodec`` instance Facepy uses to parse and serialize JSON."""
+    return codec
+
+
+def loads(data):
+    """Parse JSON with the current backend. See ``JSONCodec#loads``."""
+    return codec.loads(data)
+
+
+def dumps(obj, compact=False, sort_keys=False):
+    """Serialize an object to JSON with the current backend. See ``JSONCodec#dumps``."""
+    return codec.dumps(obj, compact, sort_keys)
+
+
+try:
+    codec = load_backend('simplejson')
+except FacepyError:
+    codec = load_backend('json')
@@ -0,0 +1,215 @@
+import copy
+import re
+import threading
+
+
+ID = re.compile(r'^\d+(_\d+)?$')
+
+
+class FieldTracker(object):
+    """
+    A ``FieldTracker`` records which fields of Graph API responses are read, grouped by path template
+    (e.g. ``{id}/posts``), so that future requests may ask for those fields only.
+    """
+
+    def __init__(self, auto=False):
+        """
+        Initialize a tracker.
+
+        :param auto: A boolean describing whether ``GraphAPI`` should limit requests to the fields that
+                     have been read from earlier responses to the same path template.
+        """
+        self.auto = auto
+        self._fields = {}
+        self._lock = threading.Lock()
+
+    def record(self, template, field):
+        """
+        Record that a field was read.
+
+        :param template: A string describing the path template of the response the field was read from.
+        :param field: A string describing the field, with dots for fields of nested objects.
+        """
+        fields = self._fields.get(template)
+
+        if fields is None or field not in fields:
+            with self._lock:
+                self._fields.setdefault(template, set()).add(field)
+
+    def fields(self, template):
+        """
+        Get the top-level fields that were read from responses to a path template, suitable for the
+        'fields' parameter.
+
+        :param template: A string describing the path template.
+
+        Returns a sorted list of strings.
+        """
+        with self._lock:
+            return sorted(set(field.split('.')[0] for field in self._fields.get(template, ())))
+
+    def report(self):
+        """
+        Get every field that was read.
+
+        Returns a dictionary of path templates and sorted lists of the fields that were read from responses
+        to them, with dots for fields of nested objects.
+        """
+        with self._lock:
+            return dict((template, sorted(fields)) for template, fields in self._fields.items())
+
+
+def template(path):
+    """
+    Return a string describing the template of a path, replacing IDs with ``{id}``.
+
+    :param path: A string describing a path such as ``/499729129/posts?limit=25``.
+    """
+    path = path.split('?')[0].strip('/')
+
+    return '/'.join('{id}' if ID.match(segment) else segment for segment in path.split('/'))
+
+
+def wrap(value, template, tracker, prefix=''):
+    """
+    Wrap a dictionary or list from a Graph API response in a ``GraphObject`` or ``GraphList``. Other
+    values are returned as is.
+    """
+    if isinstance(value, dict):
+        return GraphObject(value, template, tracker, prefix)
+
+    if isinstance(value, list):
+        return GraphList(value, template, tracker, prefix)
+
+    return value
+
+
+class GraphObject(object):
+    """
+    A ``GraphObject`` is a read-only view of an object in a Graph API response that behaves like a dictionary
+    but only wraps nested objects when they are read, and records the fields that are read.
+    """
+
+    __slots__ = ('_data', '_template', '_tracker', '_prefix')
+
+    def __init__(self, data, template, tracker, prefix=''):
+        self._data = data
+        self._template = template
+        self._tracker = tracker
+        self._prefix = prefix
+
+    def __getitem__(self, key):
+        # Record the field even if it's missing, so that it is requested next time.
+        if not (self._prefix == '' and key in ('data', 'paging')):
+            self._tracker.record(self._template, self._prefix + key)
+
+        value = self._data[key]
+
+        # The items of a connection are the objects that the 'fields' parameter applies to.
+        if self._prefix == '' and key == 'data':
+            return wrap(value, self._template, self._tracker, '')
+
+        return wrap(value, self._template, self._tracker, self._prefix + key + '.')
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getattr__(self, key):
+        # Don't mistake probes for special or private attributes, such as those of ``copy`` and templates,
+        # for fields.
+        if key.startswith('_'):
+            raise AttributeError(key)
+
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        return self._data == (other._data if isinstance(other, GraphObject) else other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'GraphObject(%r)' % self._data
+
+    def __deepcopy__(self, memo):
+        # Copies keep recording fields with the same tracker.
+        return GraphObject(copy.deepcopy(self._data, memo), self._template, self._tracker, self._prefix)
+
+    def keys(self):
+        return self._data.keys()
+
+    def values(self):
+        return [self[key] for key in self._data]
+
+    def items(self):
+        return [(key, self[key]) for key in self._data]
+
+    def iteritems(self):
+        for key in self._data:
+            yield key, self[key]
+
+    def has_key(self, key):
+        return key in self
+
+    def to_dict(self):
+        """Return the underlying dictionary without recording any fields."""
+        return self._data
+
+
+class GraphList(object):
+    """
+    A ``GraphList`` is a read-only view of a list in a Graph API response that wraps its items when they
+    are read.
+    """
+
+    __slots__ = ('_data', '_template', '_tracker', '_prefix')
+
+    def __init__(self, data, template, tracker, prefix=''):
+        self._data = data
+        self._template = template
+        self._tracker = tracker
+        self._prefix = prefix
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return GraphList(self._data[index], self._template, self._tracker, self._prefix)
+
+        return wrap(self._data[index], self._template, self._tracker, self._prefix)
+
+    def __iter__(self):
+        for item in self._data:
+            yield wrap(item, self._template, self._tracker, self._prefix)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        return self._data == (other._data if isinstance(other, GraphList) else other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'GraphList(%r)' % self._data
+
+    def __deepcopy__(self, memo):
+        return GraphList(copy.deepcopy(self._data, memo), self._template, self._tracker, self._prefix)
+
+    def to_list(self):
+        """Return the underlying list without recording any fields."""
+        return self._data
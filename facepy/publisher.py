@@ -0,0 +1,340 @@
+import os
+import threading
+import time
+
+from facepy import json_codec
+from facepy.exceptions import *
+
+
+class Publisher(object):
+    """
+    A ``Publisher`` posts items to the Graph API in the background, so that callers don't have to wait for
+    Facebook to respond.
+
+    Items are appended to a spool file before ``publish`` returns and are only removed from it once Facebook
+    has accepted them, so items that have not been published yet survive a crash and are published the next
+    time a ``Publisher`` is started with the same spool file.
+    """
+
+    errors = 0
+    """An integer describing how many unexpected errors the publisher has recovered from."""
+
+    error = None
+    """The last unexpected exception the publisher recovered from, or ``None``."""
+
+    def __init__(self, graph, spool, batch_size=50, interval=1, retry=3, max_pending=10000, fsync=False,
+                 on_failure=None, max_bytes=None, compact=1000):
+        """
+        Initialize a publisher and start publishing items that remain in the spool file.
+
+        :param graph: A ``GraphAPI`` instance to publish items with.
+        :param spool: A string describing the path to the spool file.
+        :param batch_size: An integer describing how many items to publish in each batch request.
+        :param interval: A number describing how many seconds to wait before retrying failed items.
+        :param retry: An integer describing how many times each item may be retried.
+        :param max_pending: An integer describing how many unpublished items may be spooled before
+                            ``publish`` blocks.
+        :param fsync: A boolean describing whether to sync the spool file to disk after every item.
+        :param on_failure: An optional function that is called with the path, the data and the exception of
+                           each item that could not be published.
+        :param max_bytes: An optional integer describing how many bytes of unpublished items may be spooled
+                          before ``publish`` blocks.
+        :param compact: An integer describing how many published items to let accumulate in the spool file
+                        before rewriting it with only the items that remain to be published.
+        """
+        self.graph = graph
+        self.spool = spool
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry = retry
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.on_failure = on_failure
+        self.max_bytes = max_bytes
+        self.compact = compact
+
+        self._condition = threading.Condition()
+        self._pending = self._load()
+        self._sequence = max([record['seq'] for record in self._pending] or [0])
+        self._closing = False
+        self._stopped = False
+        self._sizes = {}
+        self._bytes = 0
+        self._acknowledged = 0
+        self._file = None
+
+        # Rewrite the spool file with the items that remain to be published.
+        self._compact()
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def publish(self, path, block=True, timeout=None, **data):
+        """
+        Spool an item to be posted to the Graph API and return immediately.
+
+        :param path: A string describing the path to post the item to.
+        :param block: A boolean describing whether to wait for room in the spool if it is full.
+        :param timeout: A number describing how many seconds to wait for room in the spool, or ``None``
+                        to wait indefinitely.
+        :param data: Graph API parameters such as 'message' or 'link'.
+
+        Raises ``SpoolFullError`` if the spool has no room for the item, and ``FacepyError`` if the
+        publisher has stopped publishing.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+
+        with self._condition:
+            if self._closing:
+                raise FacepyError('Publisher is closed')
+
+            self._check()
+
+            while self._full():
+                self._check()
+
+                remaining = deadline - time.time() if deadline is not None else None
+
+                if not block or (remaining is not None and remaining <= 0):
+                    raise SpoolFullError('Spool has %s unpublished items (%s bytes)' % (
+                        len(self._pending), self._bytes
+                    ))
+
+                self._condition.wait(remaining)
+
+            self._sequence += 1
+
+            record = {
+                'seq': self._sequence,
+                'path': path,
+                'data': data,
+                'attempts': 0
+            }
+
+            self._write(record)
+            self._pending.append(record)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait for all spooled items to be published or given up on.
+
+        :param timeout: A number describing how many seconds to wait, or ``None`` to wait indefinitely.
+
+        Returns a boolean describing whether the spool was emptied. Raises ``FacepyError`` if the publisher
+        has stopped publishing.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+
+        with self._condition:
+            while self._pending:
+                self._check()
+
+                remaining = deadline - time.time() if deadline is not None else None
+
+                if remaining is not None and remaining <= 0:
+                    return False
+
+                self._condition.wait(remaining)
+
+        return True
+
+    def close(self, timeout=None):
+        """
+        Stop accepting items, wait for spooled items to be published and stop publishing.
+
+        :param timeout: A number describing how many seconds to wait, or ``None`` to wait indefinitely.
+                        Items that remain unpublished stay in the spool file.
+        """
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+
+        self._thread.join(timeout)
+
+        if not self._thread.is_alive():
+            self._file.close()
+
+    @property
+    def pending(self):
+        """An integer describing how many items remain to be published."""
+        return len(self._pending)
+
+    def _load(self):
+        """Read the spool file, returning a list of the items that remain to be published."""
+        if not os.path.exists(self.spool):
+            return []
+
+        records, acknowledged = [], set()
+
+        for line in open(self.spool):
+            try:
+                record = json_codec.loads(line)
+            except ValueError:
+                # The last line may be incomplete if we crashed while writing it.
+                continue
+
+            if 'ack' in record:
+                acknowledged.add(record['ack'])
+            else:
+                records.append(record)
+
+        return [item for item in records if item['seq'] not in acknowledged]
+
+    def _write(self, record):
+        """Append a record to the spool file."""
+        line = json_codec.dumps(record) + '\n'
+
+        self._file.write(line)
+        self._file.flush()
+
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+        if 'seq' in record:
+            self._sizes[record['seq']] = len(line)
+            self._bytes += len(line)
+
+    def _acknowledge(self, record):
+        """Record that an item has been published or given up on."""
+        self._write({'ack': record['seq']})
+        self._pending.remove(record)
+        self._bytes -= self._sizes.pop(record['seq'], 0)
+        self._acknowledged += 1
+
+    def _compact(self):
+        """Replace the spool file with one that only holds the items that remain to be published."""
+        temporary = '%s.%s.tmp' % (self.spool, os.getpid())
+
+        with open(temporary, 'w') as file:
+            for record in self._pending:
+                file.write(json_codec.dumps(record) + '\n')
+
+            file.flush()
+
+            if self.fsync:
+                os.fsync(file.fileno())
+
+        try:
+            os.rename(temporary, self.spool)
+        except EnvironmentError:
+            os.remove(temporary)
+            raise
+
+        # Keep writing to the old spool file, which still has every item, unless the new one can be opened.
+        file = open(self.spool, 'a')
+
+        if self._file:
+            self._file.close()
+
+        self._file = file
+        self._sizes = dict((record['seq'], len(json_codec.dumps(record)) + 1) for record in self._pending)
+        self._bytes = sum(self._sizes.values())
+        self._acknowledged = 0
+
+    def _full(self):
+        if len(self._pending) >= self.max_pending:
+            return True
+
+        return self.max_bytes is not None and self._pending and self._bytes >= self.max_bytes
+
+    def _check(self):
+        """Raise ``FacepyError`` if the publishing thread has stopped."""
+        if self._stopped and not self._closing:
+            raise FacepyError('Publisher stopped publishing: %r' % (self.error,))
+
+    def _recover(self, exception):
+        self.errors += 1
+        self.error = exception
+
+    def _next_batch(self):
+        """
+        Return the next items to publish, taking at most one item per path so that items posted to the
+        same path are published in the order they were spooled.
+        """
+        batch, paths = [], set()
+
+        for record in self._pending:
+            if record['path'] in paths:
+                continue
+
+            paths.add(record['path'])
+            batch.append(record)
+
+            if len(batch) == self.batch_size:
+                break
+
+        return batch
+
+    def _run(self):
+        try:
+            while self._publish():
+                pass
+        except Exception as exception:
+            self._recover(exception)
+        finally:
+            # Wake up callers waiting on us, so that they don't wait for a thread that is gone.
+            with self._condition:
+                self._stopped = True
+                self._condition.notify_all()
+
+    def _publish(self):
+        """Publish the next batch of items, returning a boolean describing whether to carry on."""
+        with self._condition:
+            while not self._pending and not self._closing:
+                self._condition.wait()
+
+            if not self._pending:
+                return False
+
+            batch = self._next_batch()
+
+        requests = [{'method': 'POST', 'relative_url': record['path'], 'body': record['data']} for record in batch]
+
+        try:
+            responses = list(self.graph.batch(requests))
+        except FacepyError as exception:
+            responses = [exception] * len(batch)
+        except Exception as exception:
+            self._recover(exception)
+            responses = [exception] * len(batch)
+
+        failed = False
+
+        with self._condition:
+            try:
+                for record, response in zip(batch, responses):
+                    if response is False:
+                        response = FacebookError('Could not post to "%s"' % record['path'])
+
+                    if isinstance(response, Exception):
+                        record['attempts'] += 1
+
+                        if record['attempts'] <= self.retry:
+                            failed = True
+                            continue
+
+                        if self.on_failure:
+                            try:
+                                self.on_failure(record['path'], record['data'], response)
+                            except Exception as exception:
+                                self._recover(exception)
+
+                    self._acknowledge(record)
+
+                # Keep the spool file from growing with acknowledgements of items that have been published.
+                if not self._pending or self._acknowledged >= self.compact:
+                    self._compact()
+            except EnvironmentError as exception:
+                # The spool file could not be written, such as because the disk is full; items that
+                # weren't acknowledged stay pending and are tried again.
+                self._recover(exception)
+                failed = True
+
+            self._condition.notify_all()
+
+        if failed:
+            time.sleep(self.interval)
+
+        return True
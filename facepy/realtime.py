@@ -0,0 +1,211 @@
+import hashlib
+import threading
+
+from Queue import Queue, Full
+from urlparse import parse_qs
+
+from facepy import json_codec
+from facepy.signed_request import HMACKey
+
+
+class Receiver(object):
+    """
+    A ``Receiver`` is a WSGI application that receives Facebook's real-time updates. See `Facebook's
+    documentation on real-time updates <https://developers.facebook.com/docs/reference/api/realtime/>`_
+    for more information.
+
+    Facebook verifies the subscription by requesting the callback URL with a challenge, which the receiver
+    echoes if the verify token matches. Updates are posted to the callback URL with an ``X-Hub-Signature``
+    header, which the receiver checks against the application's secret key before dispatching the entries of
+    the update to the handlers registered for its object type.
+    """
+
+    received = 0
+    """An integer describing how many updates the receiver has accepted."""
+
+    rejected = 0
+    """An integer describing how many updates the receiver has rejected."""
+
+    errors = 0
+    """An integer describing how many times handlers have raised exceptions."""
+
+    def __init__(self, application_secret_key, verify_token, workers=None, max_pending=10000, on_error=None):
+        """
+        Initialize a receiver.
+
+        :param application_secret_key: A string describing the Facebook application's secret key.
+        :param verify_token: A string describing the verify token given when subscribing to real-time updates.
+        :param workers: An optional integer describing how many threads to run handlers in. By default, handlers
+                        are run before Facebook is responded to, so that Facebook retries updates that fail.
+        :param max_pending: An integer describing how many updates may wait for a worker before the receiver
+                            asks Facebook to retry them later.
+        :param on_error: An optional function that is called with the object type, the entry and the exception
+                         of each entry that a handler raised an exception for, when handlers are run in workers.
+        """
+        self.verify_token = verify_token
+        self.key = HMACKey(application_secret_key, hashlib.sha1)
+        self.on_error = on_error
+        self.handlers = {}
+
+        self._lock = threading.Lock()
+        self._queue = None
+
+        if workers:
+            self._queue = Queue(max_pending)
+            self._threads = []
+
+            for i in range(workers):
+                thread = threading.Thread(target=self._run)
+                thread.daemon = True
+                thread.start()
+
+                self._threads.append(thread)
+
+    def register(self, object, handler):
+        """
+        Register a handler for updates to objects of the given type.
+
+        :param object: A string describing the type of object, such as 'user', 'page' or 'permissions',
+                       or '*' for updates to any type of object.
+        :param handler: A function that is called with the object type and each entry of an update, such as
+                        ``{'uid': '1', 'id': '1', 'time': 1306179904, 'changed_fields': ['feed']}``.
+        """
+        self.handlers.setdefault(object, []).append(handler)
+
+    def handler(self, object):
+        """
+        Return a decorator that registers a handler for updates to objects of the given type (see ``register``).
+        """
+        def decorator(function):
+            self.register(object, function)
+            return function
+
+        return decorator
+
+    def verify(self, body, signature):
+        """
+        Return a boolean describing whether an ``X-Hub-Signature`` header matches the body of an update.
+
+        :param body: A string describing the body of the update.
+        :param signature: A string describing the header, such as 'sha1=0a1b...'.
+        """
+        if not signature or not signature.startswith('sha1='):
+            return False
+
+        try:
+            signature = signature[5:].decode('hex')
+        except TypeError:
+            return False
+
+        return self.key.verify(body, signature)
+
+    def dispatch(self, update):
+        """
+        Call the handlers registered for the object type of an update with each of its entries.
+
+        :param update: A dictionary describing the update.
+        """
+        object = update.get('object')
+        handlers = self.handlers.get(object, []) + self.handlers.get('*', [])
+
+        for entry in update.get('entry', []):
+            for handler in handlers:
+                handler(object, entry)
+
+    def close(self, timeout=None):
+        """
+        Wait for the workers to finish the updates they have been given.
+
+        :param timeout: A number describing how many seconds to wait, or ``None`` to wait indefinitely.
+        """
+        if self._queue is None:
+            return
+
+        for thread in self._threads:
+            self._queue.put(None)
+
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def __call__(self, environ, start_response):
+        method = environ.get('REQUEST_METHOD', 'GET')
+
+        if method == 'GET':
+            return self._challenge(environ, start_response)
+
+        if method == 'POST':
+            return self._receive(environ, start_response)
+
+        return self._respond(start_response, '405 Method Not Allowed', headers=[('Allow', 'GET, POST')])
+
+    def _challenge(self, environ, start_response):
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+
+        if query.get('hub.mode') != ['subscribe'] or query.get('hub.verify_token') != [self.verify_token]:
+            return self._respond(start_response, '403 Forbidden')
+
+        return self._respond(start_response, '200 OK', query.get('hub.challenge', [''])[0])
+
+    def _receive(self, environ, start_response):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+
+        body = environ['wsgi.input'].read(length)
+
+        if not self.verify(body, environ.get('HTTP_X_HUB_SIGNATURE')):
+            self._count('rejected')
+            return self._respond(start_response, '403 Forbidden')
+
+        try:
+            update = json_codec.loads(body)
+        except ValueError:
+            self._count('rejected')
+            return self._respond(start_response, '400 Bad Request')
+
+        if self._queue is None:
+            self.dispatch(update)
+        else:
+            try:
+                self._queue.put_nowait(update)
+            except Full:
+                # Facebook retries updates that aren't accepted, so ask it to come back later.
+                return self._respond(start_response, '503 Service Unavailable')
+
+        self._count('received')
+
+        return self._respond(start_response, '200 OK')
+
+    def _respond(self, start_response, status, body='', headers=[]):
+        body = str(body)
+
+        start_response(status, [
+            ('Content-Type', 'text/plain'),
+            ('Content-Length', str(len(body)))
+        ] + headers)
+
+        return [body]
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _run(self):
+        while True:
+            update = self._queue.get()
+
+            if update is None:
+                return
+
+            object = update.get('object')
+
+            for entry in update.get('entry', []):
+                for handler in self.handlers.get(object, []) + self.handlers.get('*', []):
+                    try:
+                        handler(object, entry)
+                    except Exception as exception:
+                        self._count('errors')
+
+                        if self.on_error:
+                            self.on_error(object, entry, exception)
@@ -1,17 +1,60 @@
 import base64
 import hashlib
 import hmac
-try:
-    import simplejson as json
-except ImportError:
-    import json  # flake8: noqa
+import threading
 import time
 
+from collections import deque
 from datetime import datetime
+from itertools import islice
+from multiprocessing import Pool
 
+from facepy import json_codec
 from facepy.exceptions import *
 
 
+class Slotted(object):
+    """
+    Base class for the small objects that make up a signed request, which use ``__slots__`` to keep them
+    small but should nevertheless be picklable with any protocol.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self):
+        state = {}
+
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                # Skip slots that subclasses have replaced with properties.
+                if getattr(type(self), slot) is cls.__dict__[slot] and hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def __reduce_ex__(self, protocol):
+        # Nested classes can't be found by name when unpickling, so refer to them by their path instead.
+        return _unpickle, (type(self).__dict__.get('_path', type(self).__name__), self.__getstate__())
+
+
+def _unpickle(path, state):
+    names = path.split('.')
+
+    cls = globals()[names[0]]
+
+    for name in names[1:]:
+        cls = getattr(cls, name)
+
+    instance = cls.__new__(cls)
+    instance.__setstate__(state)
+
+    return instance
+
+
 class SignedRequest(object):
     """
     Facebook uses "signed requests" to communicate with applications on the Facebook platform. See `Facebook's
@@ -68,25 +111,7 @@ class SignedRequest(object):
 
     def parse(cls, signed_request, application_secret_key):
         """Parse a signed request, returning a dictionary describing its payload."""
-        def decode(encoded):
-            padding = '=' * (len(encoded) % 4)
-            return base64.urlsafe_b64decode(encoded + padding)
-
-        try:
-            encoded_signature, encoded_payload = (str(string) for string in signed_request.split('.', 2))
-            signature = decode(encoded_signature)
-            signed_request_data = json.loads(decode(encoded_payload))
-        except (TypeError, ValueError):
-            raise SignedRequestError("Signed request had a corrupt payload")
-
-        if signed_request_data.get('algorithm', '').upper() != 'HMAC-SHA256':
-            raise SignedRequestError("Signed request is using an unknown algorithm")
-
-        expected_signature = hmac.new(application_secret_key, msg=encoded_payload, digestmod=hashlib.sha256).digest()
-        if signature != expected_signature:
-            raise SignedRequestError("Signed request signature mismatch")
-
-        return signed_request_data
+        return SignedRequestVerifier(application_secret_key).parse(signed_request)
 
     parse = classmethod(parse)
 
@@ -143,7 +168,7 @@ class SignedRequest(object):
             payload['user_id'] = self.user.id
 
         encoded_payload = base64.urlsafe_b64encode(
-            json.dumps(payload, separators=(',', ':'))
+            json_codec.dumps(payload, compact=True)
         )
 
         encoded_signature = base64.urlsafe_b64encode(hmac.new(
@@ -157,49 +182,41 @@ class SignedRequest(object):
             'payload': encoded_payload
         }
 
-    class Page(object):
+    class Page(Slotted):
         """
         A ``Page`` instance represents a Facebook page.
         """
 
-        id = None
-        """An integer describing the page's Facebook ID."""
+        _path = 'SignedRequest.Page'
 
-        is_liked = None
-        """A boolean describing whether or not the user likes the page."""
-
-        is_admin = None
-        """A bolean describing whether or nor the user is an administrator of the page."""
-
-        url = None
-        """A string describing the URL to the page."""
+        __slots__ = {
+            'id': 'An integer describing the page\'s Facebook ID.',
+            'is_liked': 'A boolean describing whether or not the user likes the page.',
+            'is_admin': 'A bolean describing whether or nor the user is an administrator of the page.'
+        }
 
         def __init__(self, id, is_liked=False, is_admin=False):
             self.id, self.is_liked, self.is_admin = id, is_liked, is_admin
 
         @property
         def url(self):
+            """A string describing the URL to the page."""
             return 'http://facebook.com/%s' % self.id
 
-    class User(object):
+    class User(Slotted):
         """
         A ``User`` instance represents a Facebook user.
         """
 
-        id = None
-        """An integer describing the user's Facebook ID."""
-
-        age = None
-        """A range describing the user's age."""
+        _path = 'SignedRequest.User'
 
-        locale = None
-        """A string describing the user's locale."""
-
-        country = None
-        """A string describing the user's country."""
-
-        oauth_token = None
-        """A ``SignedRequest.User.OAuthToken`` instance describing an OAuth access token."""
+        __slots__ = {
+            'id': 'An integer describing the user\'s Facebook ID.',
+            'age': 'A range describing the user\'s age.',
+            'locale': 'A string describing the user\'s locale.',
+            'country': 'A string describing the user\'s country.',
+            'oauth_token': 'A ``SignedRequest.User.OAuthToken`` instance describing an OAuth access token.'
+        }
 
         def __init__(self, id, age=None, locale=None, country=None, oauth_token=None):
             self.id = id
@@ -218,20 +235,19 @@ class SignedRequest(object):
             """A boolean describing whether the user has authorized the application."""
             return bool(self.oauth_token)
 
-        class OAuthToken(object):
+        class OAuthToken(Slotted):
             """
             An OAuth token represents an access token that may be used to query
             Facebook's Graph API on behalf of the user that issued it.
             """
 
-            token = None
-            """A string describing the access token."""
+            _path = 'SignedRequest.User.OAuthToken'
 
-            issued_at = None
-            """A ``datetime`` instance describing when the access token was issued."""
-
-            expires_at = None
-            """A ``datetime`` instance describing when the access token will expire, or ``None`` if it won't."""
+            __slots__ = {
+                'token': 'A string describing the access token.',
+                'issued_at': 'A ``datetime`` instance describing when the access token was issued.',
+                'expires_at': 'A ``datetime`` instance describing when the access token will expire, or ``None`` if it won\'t.'
+            }
 
             def __init__(self, token, issued_at, expires_at):
                 self.token, self.issued_at, self.expires_at = token, issued_at, expires_at
@@ -246,3 +262,607 @@ class SignedRequest(object):
 
     # Proxy exceptions for ease of use and backwards compatibility.
     Error = SignedRequestError
+
+
+class lazy(object):
+    """
+    A decorator for properties that are computed when they are first accessed and stored on the instance
+    from then on.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = instance.__dict__[self.function.__name__] = self.function(instance)
+
+        return value
+
+
+class LazySignedRequest(SignedRequest):
+    """
+    A ``LazySignedRequest`` is a ``SignedRequest`` that only builds its user, page and OAuth access token (and
+    their dates and ages) when they are first accessed, which makes it cheaper for handlers that only need a few
+    of them.
+    """
+
+    def __init__(self, signed_request=None, application_secret_key=None, verifier=None):
+        """
+        Initialize a signed request.
+
+        :param signed_request: A string describing a signed request.
+        :param application_secret_key: A string describing a Facebook application's secret key.
+        :param verifier: An optional ``SignedRequestVerifier`` instance to parse the signed request with, such
+                         as one with a cache. If given, ``application_secret_key`` may be omitted.
+        """
+        if verifier is None:
+            verifier = SignedRequestVerifier(application_secret_key)
+
+        self.signed_request = signed_request
+        self.application_secret_key = application_secret_key or verifier.application_secret_key
+
+        self.raw = verifier.parse(signed_request)
+
+    @lazy
+    def data(self):
+        """A string describing the contents of the ``app_data`` query string parameter."""
+        return self.raw.get('app_data', None)
+
+    @lazy
+    def page(self):
+        """A ``SignedRequest.Page`` instance describing the Facebook page that the signed request was generated from."""
+        if 'page' not in self.raw:
+            return None
+
+        return self.Page(
+            id=self.raw['page']['id'],
+            is_liked=self.raw['page']['liked'],
+            is_admin=self.raw['page']['admin']
+        )
+
+    @lazy
+    def user(self):
+        """A ``SignedRequest.User`` instance describing the user that generated the signed request."""
+        user = self.raw.get('user', {})
+        age = user.get('age')
+
+        return self.User(
+            id=self.raw.get('user_id'),
+            locale=user.get('locale', None),
+            country=user.get('country', None),
+            age=xrange(age['min'], age['max'] + 1 if 'max' in age else 100) if age else None,
+            oauth_token=LazyOAuthToken(
+                token=self.raw['oauth_token'],
+                issued_at=self.raw['issued_at'],
+                expires=self.raw['expires']
+            ) if 'oauth_token' in self.raw else None
+        )
+
+
+class LazyOAuthToken(SignedRequest.User.OAuthToken):
+    """
+    A ``LazyOAuthToken`` is a ``SignedRequest.User.OAuthToken`` that keeps the timestamps of the signed request
+    and only converts them to ``datetime`` instances when they are accessed.
+    """
+
+    __slots__ = ('_issued_at', '_expires')
+
+    def __init__(self, token, issued_at, expires):
+        """
+        Initialize an OAuth access token.
+
+        :param token: A string describing the access token.
+        :param issued_at: An integer describing when the access token was issued, in seconds since the epoch.
+        :param expires: An integer describing when the access token expires, in seconds since the epoch, or 0 if it won't.
+        """
+        self.token, self._issued_at, self._expires = token, issued_at, expires
+
+    @property
+    def issued_at(self):
+        """A ``datetime`` instance describing when the access token was issued."""
+        return datetime.fromtimestamp(self._issued_at)
+
+    @property
+    def expires_at(self):
+        """A ``datetime`` instance describing when the access token will expire, or ``None`` if it won't."""
+        return datetime.fromtimestamp(self._expires) if self._expires > 0 else None
+
+
+class HMACKey(object):
+    """
+    A ``HMACKey`` computes HMAC digests with a secret key. The key is padded and hashed once, when the
+    ``HMACKey`` is created, rather than for every message.
+    """
+
+    def __init__(self, key, digestmod=hashlib.sha256):
+        """
+        Initialize a key.
+
+        :param key: A string describing the secret key.
+        :param digestmod: The hash function to use (defaults to SHA-256).
+        """
+        # Derive the inner and outer hash states once, as described in RFC 2104, so that each message
+        # only costs two copies of them.
+        key = str(key)
+        block_size = digestmod().block_size
+
+        if len(key) > block_size:
+            key = digestmod(key).digest()
+
+        key = key.ljust(block_size, chr(0))
+
+        self._inner = digestmod(key.translate(TRANSLATE_INNER))
+        self._outer = digestmod(key.translate(TRANSLATE_OUTER))
+
+    def digest(self, message):
+        """Return a string describing the digest of a message."""
+        inner = self._inner.copy()
+        inner.update(message)
+
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+
+        return outer.digest()
+
+    def hexdigest(self, message):
+        """Return a string describing the digest of a message in hexadecimal."""
+        return self.digest(message).encode('hex')
+
+    def verify(self, message, signature):
+        """
+        Return a boolean describing whether a signature matches a message, taking the same time
+        regardless of where they differ.
+
+        :param message: A string describing the message.
+        :param signature: A string describing the (binary) signature.
+        """
+        return compare_digest(self.digest(message), signature)
+
+
+class SignedRequestVerifier(object):
+    """
+    A ``SignedRequestVerifier`` parses and verifies signed requests for one application. Verifiers are
+    faster than ``SignedRequest.parse`` for many signed requests, as they only prepare the application's
+    secret key once.
+    """
+
+    verified = 0
+    """An integer describing how many signed requests ``parse_many`` has verified."""
+
+    elapsed = 0.0
+    """A float describing how many seconds ``parse_many`` has spent verifying signed requests."""
+
+    cache = None
+    """A ``SignedRequestCache`` instance describing signed requests that have been verified, or ``None``."""
+
+    def __init__(self, application_secret_key, cache=None):
+        """
+        Initialize a verifier.
+
+        :param application_secret_key: A string describing the Facebook application's secret key.
+        :param cache: An optional ``SignedRequestCache`` instance in which to remember signed requests that have
+                      been verified, so that they needn't be verified again. Since signed requests are only
+                      valid for one application, a cache must not be shared between verifiers.
+        """
+        self.application_secret_key = application_secret_key
+        self.key = HMACKey(application_secret_key)
+        self.cache = cache
+
+    def parse(self, signed_request):
+        """
+        Parse a signed request, returning a dictionary describing its payload.
+
+        :param signed_request: A string describing the signed request.
+
+        Raises ``SignedRequestError`` if the signed request is corrupt or its signature doesn't match.
+        If the verifier has a cache, payloads of signed requests that have been verified before are
+        returned from it; they are shared, so don't modify them.
+        """
+        if self.cache is not None:
+            signed_request_data = self.cache.get(signed_request)
+
+            if signed_request_data is not None:
+                return signed_request_data
+
+        signed_request_data = self._parse(signed_request)
+
+        if self.cache is not None:
+            self.cache.set(signed_request, signed_request_data)
+
+        return signed_request_data
+
+    def _parse(self, signed_request):
+        try:
+            encoded_signature, encoded_payload = (str(string) for string in signed_request.split('.', 2))
+            signature = decode(encoded_signature)
+            signed_request_data = json_codec.loads(decode(encoded_payload))
+        except (TypeError, ValueError):
+            raise SignedRequestError("Signed request had a corrupt payload")
+
+        if signed_request_data.get('algorithm', '').upper() != 'HMAC-SHA256':
+            raise SignedRequestError("Signed request is using an unknown algorithm")
+
+        if not self.key.verify(encoded_payload, signature):
+            raise SignedRequestError("Signed request signature mismatch")
+
+        return signed_request_data
+
+    def parse_many(self, signed_requests, processes=None, chunksize=1000):
+        """
+        Parse many signed requests, such as a backlog of signed requests from logs.
+
+        :param signed_requests: An iterable of strings describing signed requests.
+        :param processes: An optional integer describing how many processes to verify signed requests in.
+                          By default, signed requests are verified in this process.
+        :param chunksize: An integer describing how many signed requests to send to a process at a time.
+
+        Returns a generator that yields a dictionary describing the payload of each signed request, or the
+        ``SignedRequestError`` it failed with, in order. Throughput is recorded in ``verified``, ``elapsed``
+        and ``rate``.
+        """
+        started_at = time.time()
+
+        if processes:
+            pool = Pool(processes, _initialize_worker, (self.application_secret_key,))
+            chunks = _imap(pool, _parse_in_worker, _chunks(signed_requests, chunksize), processes * 2)
+            results = (result for chunk in chunks for result in chunk)
+        else:
+            pool = None
+            results = (_parse_or_error(self, signed_request) for signed_request in signed_requests)
+
+        try:
+            for result in results:
+                self.verified += 1
+
+                # Looking at the clock for every signed request would slow us down noticeably.
+                if not self.verified % chunksize:
+                    now = time.time()
+                    self.elapsed, started_at = self.elapsed + now - started_at, now
+
+                yield result
+        finally:
+            self.elapsed += time.time() - started_at
+
+            if pool:
+                pool.terminate()
+
+    @property
+    def rate(self):
+        """A float describing how many signed requests ``parse_many`` has verified per second."""
+        return self.verified / self.elapsed if self.elapsed else 0.0
+
+
+class SignedRequestCache(object):
+    """
+    A ``SignedRequestCache`` remembers the payloads of signed requests that have been verified, discarding
+    the least recently used signed requests when it is full and signed requests that have expired.
+    Caches may be used by several threads at once.
+    """
+
+    hits = 0
+    """An integer describing how many signed requests were found in the cache."""
+
+    misses = 0
+    """An integer describing how many signed requests were not found in the cache."""
+
+    def __init__(self, size=1024, max_age=None):
+        """
+        Initialize a cache.
+
+        :param size: An integer describing how many signed requests to remember at most.
+        :param max_age: An optional integer describing how many seconds after it was issued to remember a
+                        signed request at most. Signed requests with an OAuth access token are never remembered
+                        past its expiry.
+        """
+        self.size = size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = {}
+
+        # The entries form a circular doubly linked list of [previous, next, key, value, expires_at],
+        # from the least to the most recently used.
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None, None]
+
+    def get(self, signed_request):
+        """
+        Get the payload of a signed request, or ``None`` if it isn't in the cache.
+
+        :param signed_request: A string describing the signed request.
+        """
+        with self._lock:
+            entry = self._entries.get(signed_request)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry[4] is not None and entry[4] <= time.time():
+                self._remove(entry)
+                self.misses += 1
+                return None
+
+            # Move the entry to the most recently used end of the list.
+            self._unlink(entry)
+            self._link(entry)
+            self.hits += 1
+
+            return entry[3]
+
+    def set(self, signed_request, payload):
+        """
+        Remember the payload of a signed request that has been verified.
+
+        :param signed_request: A string describing the signed request.
+        :param payload: A dictionary describing its payload.
+        """
+        expires_at = self._expires_at(payload)
+
+        if expires_at is not None and expires_at <= time.time():
+            return
+
+        with self._lock:
+            entry = self._entries.get(signed_request)
+
+            if entry is not None:
+                self._remove(entry)
+
+            entry = [None, None, signed_request, payload, expires_at]
+
+            self._link(entry)
+            self._entries[signed_request] = entry
+
+            while len(self._entries) > self.size:
+                self._remove(self._root[1])
+
+    def clear(self):
+        """Forget every signed request."""
+        with self._lock:
+            self._entries.clear()
+            self._root[:] = [self._root, self._root, None, None, None]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expires_at(self, payload):
+        expiries = []
+
+        if payload.get('expires'):
+            expiries.append(payload['expires'])
+
+        if self.max_age is not None:
+            expiries.append(payload.get('issued_at', time.time()) + self.max_age)
+
+        return min(expiries) if expiries else None
+
+    def _link(self, entry):
+        last = self._root[0]
+        entry[0], entry[1] = last, self._root
+        last[1] = self._root[0] = entry
+
+    def _unlink(self, entry):
+        entry[0][1], entry[1][0] = entry[1], entry[0]
+
+    def _remove(self, entry):
+        self._unlink(entry)
+        del self._entries[entry[2]]
+
+
+class SignedRequestFactory(object):
+    """
+    A ``SignedRequestFactory`` generates signed requests for one application in bulk, such as to load test a
+    canvas application. Like verifiers, factories only prepare the application's secret key once.
+    """
+
+    generated = 0
+    """An integer describing how many signed requests ``generate_many`` has generated."""
+
+    elapsed = 0.0
+    """A float describing how many seconds ``generate_many`` has spent generating signed requests."""
+
+    def __init__(self, application_secret_key):
+        """
+        Initialize a factory.
+
+        :param application_secret_key: A string describing the Facebook application's secret key.
+        """
+        self.application_secret_key = application_secret_key
+        self.key = HMACKey(application_secret_key)
+
+    def generate(self, payload):
+        """
+        Generate a signed request.
+
+        :param payload: A dictionary describing the payload of the signed request. Its algorithm defaults
+                        to ``HMAC-SHA256``.
+        """
+        if 'algorithm' not in payload:
+            payload = dict(payload, algorithm='HMAC-SHA256')
+
+        encoded_payload = encode(json_codec.dumps(payload, compact=True))
+
+        return '%s.%s' % (encode(self.key.digest(encoded_payload)), encoded_payload)
+
+    def payloads(self, count, template=None, parameters=None, start=0):
+        """
+        Generate payloads for signed requests.
+
+        :param count: An integer describing how many payloads to generate.
+        :param template: An optional dictionary describing the fields that all payloads share.
+        :param parameters: An optional dictionary mapping fields to the values they should take, such as
+                           ``{'user_id': xrange(1, 1000000), 'user.locale': ['en_US', 'nb_NO']}``. Nested
+                           fields are separated by dots. Values are either sequences, which the n-th payload
+                           takes the (n modulo its length)-th item of, or functions of n.
+        :param start: An integer describing the n of the first payload.
+
+        Returns a generator that yields a dictionary describing each payload.
+        """
+        template = template or {}
+        parameters = [(field.split('.'), values) for field, values in (parameters or {}).items()]
+
+        for n in xrange(start, start + count):
+            payload = dict(template)
+
+            for path, values in parameters:
+                value = values(n) if callable(values) else values[n % len(values)]
+
+                # Copy nested dictionaries rather than modify the template's.
+                target = payload
+
+                for key in path[:-1]:
+                    target[key] = target = dict(target.get(key, {}))
+
+                target[path[-1]] = value
+
+            yield payload
+
+    def generate_many(self, count, template=None, parameters=None, processes=None, chunksize=1000):
+        """
+        Generate many signed requests.
+
+        :param count: An integer describing how many signed requests to generate.
+        :param template: An optional dictionary describing the fields that all payloads share.
+        :param parameters: An optional dictionary mapping fields to the values they should take
+                           (see ``payloads``).
+        :param processes: An optional integer describing how many processes to generate signed requests in.
+                          By default, signed requests are generated in this process.
+        :param chunksize: An integer describing how many signed requests to generate in a process at a time.
+
+        Returns a generator that yields a string describing each signed request, in order. Throughput is
+        recorded in ``generated``, ``elapsed`` and ``rate``.
+        """
+        started_at = time.time()
+
+        if processes:
+            pool = Pool(processes, _initialize_factory, (self.application_secret_key, template, parameters))
+            chunks = _imap(
+                pool,
+                _generate_in_worker,
+                ((start, min(chunksize, count - start)) for start in xrange(0, count, chunksize)),
+                processes * 2
+            )
+            results = (signed_request for chunk in chunks for signed_request in chunk)
+        else:
+            pool = None
+            results = (self.generate(payload) for payload in self.payloads(count, template, parameters))
+
+        try:
+            for result in results:
+                self.generated += 1
+
+                if not self.generated % chunksize:
+                    now = time.time()
+                    self.elapsed, started_at = self.elapsed + now - started_at, now
+
+                yield result
+        finally:
+            self.elapsed += time.time() - started_at
+
+            if pool:
+                pool.terminate()
+
+    @property
+    def rate(self):
+        """A float describing how many signed requests ``generate_many`` has generated per second."""
+        return self.generated / self.elapsed if self.elapsed else 0.0
+
+
+def encode(string):
+    """Encode a string with URL-safe base64 without padding, like Facebook does."""
+    return base64.urlsafe_b64encode(string).rstrip('=')
+
+
+def decode(encoded):
+    """Decode a string encoded with URL-safe base64, with or without padding."""
+    padding = '=' * (len(encoded) % 4)
+    return base64.urlsafe_b64decode(encoded + padding)
+
+
+def _compare_digest(a, b):
+    """Return a boolean describing whether two strings are equal, in constant time."""
+    if len(a) != len(b):
+        return False
+
+    result = 0
+
+    for x, y in zip(a, b):
+        result |= ord(x) ^ ord(y)
+
+    return result == 0
+
+
+compare_digest = getattr(hmac, 'compare_digest', _compare_digest)
+
+TRANSLATE_INNER = ''.join(chr(x ^ 0x36) for x in range(256))
+TRANSLATE_OUTER = ''.join(chr(x ^ 0x5C) for x in range(256))
+
+
+def _imap(pool, function, arguments, window):
+    """
+    Apply ``function`` to each of ``arguments`` in ``pool``, yielding the results in order. Unlike
+    ``Pool.imap``, at most ``window`` calls are in flight at once, so that neither arguments nor results
+    pile up in memory when the caller consumes results more slowly than the pool produces them.
+    """
+    pending = deque()
+
+    for argument in arguments:
+        pending.append(pool.apply_async(function, (argument,)))
+
+        if len(pending) >= window:
+            yield pending.popleft().get()
+
+    while pending:
+        yield pending.popleft().get()
+
+
+def _chunks(iterable, size):
+    """Yield lists of at most ``size`` consecutive items of ``iterable``, reading it as they are needed."""
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _parse_or_error(verifier, signed_request):
+    try:
+        return verifier.parse(signed_request)
+    except SignedRequestError as exception:
+        return exception
+
+
+def _initialize_worker(application_secret_key):
+    global _worker_verifier
+
+    _worker_verifier = SignedRequestVerifier(application_secret_key)
+
+
+def _parse_in_worker(signed_requests):
+    return [_parse_or_error(_worker_verifier, signed_request) for signed_request in signed_requests]
+
+
+def _initialize_factory(application_secret_key, template, parameters):
+    global _worker_factory, _worker_template, _worker_parameters
+
+    _worker_factory = SignedRequestFactory(application_secret_key)
+    _worker_template, _worker_parameters = template, parameters
+
+
+def _generate_in_worker(chunk):
+    start, count = chunk
+
+    return [
+        _worker_factory.generate(payload)
+        for payload in _worker_factory.payloads(count, _worker_template, _worker_parameters, start)
+    ]
@@ -0,0 +1,108 @@
+import os
+import threading
+
+from facepy import json_codec
+
+
+class Store(object):
+    """
+    A ``Store`` persists values by key for components such as ``facepy.sync.Sync``. Values must be
+    serializable as JSON.
+    """
+
+    def get(self, key, default=None):
+        """
+        Get a value.
+
+        :param key: A string describing the key of the value.
+        :param default: The value to return if there is no value for the given key.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """
+        Set a value atomically.
+
+        :param key: A string describing the key of the value.
+        :param value: The value.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Delete a value, if there is one.
+
+        :param key: A string describing the key of the value.
+        """
+        raise NotImplementedError
+
+
+class MemoryStore(Store):
+    """A ``MemoryStore`` keeps values in memory for the lifetime of the process."""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.values.get(key, default)
+
+    def set(self, key, value):
+        with self.lock:
+            self.values[key] = value
+
+    def delete(self, key):
+        with self.lock:
+            self.values.pop(key, None)
+
+
+class FileStore(Store):
+    """
+    A ``FileStore`` keeps values in a JSON file. Every change replaces the file atomically, so the file
+    never holds a partially written change.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a store.
+
+        :param path: A string describing the path to the file.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self._load().get(key, default)
+
+    def set(self, key, value):
+        with self.lock:
+            values = self._load()
+            values[key] = value
+            self._save(values)
+
+    def delete(self, key):
+        with self.lock:
+            values = self._load()
+
+            if key in values:
+                del values[key]
+                self._save(values)
+
+    def _load(self):
+        try:
+            with open(self.path) as file:
+                return json_codec.loads(file.read())
+        except IOError:
+            return {}
+
+    def _save(self, values):
+        temporary = '%s.%s.tmp' % (self.path, os.getpid())
+
+        with open(temporary, 'w') as file:
+            file.write(json_codec.dumps(values))
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.rename(temporary, self.path)
@@ -0,0 +1,155 @@
+import calendar
+import time
+
+from datetime import datetime
+
+from facepy.stores import MemoryStore
+
+
+class Sync(object):
+    """
+    A ``Sync`` instance fetches the items of connections that are newer than the newest item it has seen
+    before, so that routine syncs only cost as much as there are new items.
+
+    The timestamp of the newest item seen for each connection (its "watermark") is kept in a
+    ``facepy.stores.Store`` along with the IDs of the items that share it, and only advanced once every new
+    item has been handled. Since timestamps only have a resolution of a second, items created in the same
+    second as the watermark are fetched again on the next sync but only handled if their IDs are new.
+    """
+
+    def __init__(self, graph, store=None, field='created_time', limit=100):
+        """
+        Initialize a sync.
+
+        :param graph: A ``GraphAPI`` instance to fetch items with.
+        :param store: An optional ``facepy.stores.Store`` instance to keep watermarks in (defaults to
+                      a ``MemoryStore``).
+        :param field: A string describing the field that holds the time each item was created or updated.
+        :param limit: An integer describing how many items to request per page.
+        """
+        self.graph = graph
+        self.store = store if store is not None else MemoryStore()
+        self.field = field
+        self.limit = limit
+
+    def sync(self, object, connection, handler, **options):
+        """
+        Fetch the items of a connection that are newer than its watermark, pass them to a handler and
+        advance the watermark.
+
+        :param object: A string describing the ID of the object, e.g. ``me``.
+        :param connection: A string describing the connection, e.g. ``feed``.
+        :param handler: A function to call with each new item, newest first.
+        :param options: Graph API parameters such as 'fields'.
+
+        Returns an integer describing how many new items were handled. If the handler raises an
+        exception, the watermark is left as it was and the same items are fetched again on the next sync.
+        """
+        key = self.key(object, connection)
+        watermark, boundary = self._load(key)
+        newest, newest_ids = watermark, set(boundary)
+        count = 0
+
+        if watermark is not None:
+            options['since'] = watermark
+
+        pages = self.graph._get('%s/%s' % (object, connection), page=True, limit=self.limit, **options)
+
+        for page in pages:
+            done = False
+
+            for item in page.get('data', []) if isinstance(page, dict) else []:
+                timestamp = parse_timestamp(item.get(self.field))
+                id = item.get('id')
+
+                if timestamp is not None and watermark is not None:
+                    # Connections are ordered newest first, so we're done once we're past the watermark.
+                    if timestamp < watermark:
+                        done = True
+                        break
+
+                    if timestamp == watermark and id in boundary:
+                        continue
+
+                handler(item)
+                count += 1
+
+                if timestamp is not None:
+                    if newest is None or timestamp > newest:
+                        newest, newest_ids = timestamp, set()
+
+                    if timestamp == newest and id is not None:
+                        newest_ids.add(id)
+
+            if done:
+                break
+
+        if newest != watermark or newest_ids != set(boundary):
+            self.store.set(key, {'watermark': newest, 'ids': sorted(newest_ids)})
+
+        return count
+
+    def watermark(self, object, connection):
+        """
+        Get the watermark of a connection.
+
+        :param object: A string describing the ID of the object.
+        :param connection: A string describing the connection.
+
+        Returns an integer describing the timestamp of the newest item seen, or ``None`` if the
+        connection has not been synced before.
+        """
+        return self._load(self.key(object, connection))[0]
+
+    def reset(self, object, connection):
+        """
+        Forget the watermark of a connection, so that the next sync fetches every item.
+
+        :param object: A string describing the ID of the object.
+        :param connection: A string describing the connection.
+        """
+        self.store.delete(self.key(object, connection))
+
+    def key(self, object, connection):
+        """Return a string describing the key of the watermark of a connection."""
+        return 'sync:%s/%s' % (object, connection)
+
+    def _load(self, key):
+        """Return a tuple describing the watermark of a connection and the IDs of the items that share it."""
+        value = self.store.get(key)
+
+        # Watermarks used to be stored without IDs.
+        if not isinstance(value, dict):
+            return value, []
+
+        return value['watermark'], value['ids']
+
+
+def parse_timestamp(value):
+    """
+    Parse a Graph API timestamp, returning an integer describing seconds since the epoch or ``None``.
+
+    :param value: A string in ISO 8601 format (e.g. ``2012-05-12T10:00:00+0000``), an integer or a
+                  ``datetime`` instance.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, (int, long)):
+        return value
+
+    if isinstance(value, datetime):
+        return int(time.mktime(value.timetuple()))
+
+    try:
+        timestamp = calendar.timegm(time.strptime(value[:19], '%Y-%m-%dT%H:%M:%S'))
+    except (TypeError, ValueError):
+        return None
+
+    offset = value[19:]
+
+    if len(offset) == 5 and offset[0] in '+-' and offset[1:].isdigit():
+        sign = 1 if offset[0] == '+' else -1
+        timestamp -= sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+
+    return timestamp
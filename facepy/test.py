@@ -1,18 +1,26 @@
+import random
+import threading
+
+from contextlib import contextmanager
+
 from facepy import GraphAPI
+from facepy.exceptions import FacepyError
+from facepy.graph_api import BatchReport
 
 
 class User(object):
     """Instances of the User class represent Facebook test users."""
 
-    def __init__(self, id, access_token, login_url, email, password):
+    def __init__(self, id, access_token, login_url, email=None, password=None, session=None):
         """
         Initialize a Facebook test user.
 
         :param id: A string describing the user's Facebook ID.
         :param access_token: A string describing the user's access token.
         :param login_url: A string describing the user's login URL.
-        :param email: A string describing the user's email.
-        :param password: A string describing the user's password.
+        :param email: A string describing the user's email, if known.
+        :param password: A string describing the user's password, if known.
+        :param session: An optional ``requests`` session for the user's ``GraphAPI`` instance to share.
         """
         self.id = id
         self.access_token = access_token
@@ -20,7 +28,7 @@ class User(object):
         self.email = email
         self.password = password
 
-        self.graph = GraphAPI(access_token)
+        self.graph = GraphAPI(access_token, session=session)
 
     @classmethod
     def create(self, application_id, access_token, **parameters):
@@ -47,3 +55,259 @@ class User(object):
 
     def __exit__(self, *args, **kwargs):
         self.delete()
+
+
+class TestUserPool(object):
+    """
+    A ``TestUserPool`` creates Facebook test users in batch requests and lends them to tests, so that
+    tests don't have to wait for users to be created and deleted one at a time.
+
+    Facebook keeps test users until they are deleted, so pools reuse the application's existing test users
+    before creating new ones, and test users may be reused from one test run to the next. All users of a pool
+    share the pool's connections to Facebook.
+    """
+
+    # Keep test runners from mistaking the pool for a test case.
+    __test__ = False
+
+    def __init__(self, application_id, access_token, reuse=True, reset=None, batch_size=50, workers=4, **parameters):
+        """
+        Initialize a pool of test users.
+
+        :param application_id: A string describing the Facebook application ID.
+        :param access_token: A string describing the application's access token.
+        :param reuse: A boolean describing whether to lend the application's existing test users before creating
+                      new ones. Existing test users have whatever name and permissions they were created with.
+        :param reset: An optional function that is called with each user that is returned to the pool, such as
+                      to remove what a test posted.
+        :param batch_size: An integer describing how many users to create or delete in each batch request.
+        :param workers: An integer describing how many batch requests may be in flight at once.
+        :param parameters: Parameters for new test users, such as 'permissions', 'locale' or 'installed'
+                           (see ``User.create``).
+        """
+        self.application_id = application_id
+        self.graph = GraphAPI(access_token)
+        self.reuse = reuse
+        self.reset = reset
+        self.batch_size = batch_size
+        self.workers = workers
+        self.parameters = parameters
+
+        self.users = []
+        self.available = []
+
+        self._lock = threading.Lock()
+        self._loaded = not reuse
+
+    def fill(self, count):
+        """
+        Make sure the pool has at least the given number of available users, creating any that are missing.
+
+        :param count: An integer describing how many users should be available.
+
+        Raises ``FacepyError`` if users could not be created.
+        """
+        with self._lock:
+            self._fill(count)
+
+    def lease(self):
+        """
+        Lend a user, creating one if none are available. Return the user with ``release`` when it is no
+        longer needed.
+        """
+        with self._lock:
+            if not self.available:
+                self._fill(1)
+
+            return self.available.pop()
+
+    def release(self, user):
+        """
+        Return a user to the pool, resetting it if the pool has a ``reset`` function.
+
+        :param user: A ``User`` instance that was lent by the pool.
+        """
+        if self.reset:
+            self.reset(user)
+
+        with self._lock:
+            self.available.append(user)
+
+    @contextmanager
+    def leased(self):
+        """
+        Return a context manager that lends a user and returns it to the pool when the context exits::
+
+            with pool.leased() as user:
+                user.graph.post('me/feed', message='Hi me.')
+        """
+        user = self.lease()
+
+        try:
+            yield user
+        finally:
+            self.release(user)
+
+    def delete(self):
+        """
+        Delete every user of the pool in batch requests.
+
+        Returns a ``facepy.graph_api.BatchReport`` instance describing which users were deleted.
+        """
+        with self._lock:
+            report = self.graph.delete_many(
+                [user.id for user in self.users], batch_size=self.batch_size, workers=self.workers
+            )
+
+            deleted = set(id for id, response in report.succeeded)
+
+            self.users = [user for user in self.users if user.id not in deleted]
+            self.available = [user for user in self.available if user.id not in deleted]
+
+            return report
+
+    def _fill(self, count):
+        if not self._loaded:
+            for page in self.graph.get('%s/accounts/test-users' % self.application_id, page=True):
+                for data in page.get('data', []):
+                    self._add(data)
+
+            self._loaded = True
+
+        missing = count - len(self.available)
+
+        if missing <= 0:
+            return
+
+        parameters = {}
+
+        for key, value in self.parameters.items():
+            if isinstance(value, (list, set, tuple)):
+                value = ','.join(value)
+
+            parameters[key] = value
+
+        report = self.graph.post_many(
+            [('%s/accounts/test-users' % self.application_id, parameters)] * missing,
+            batch_size=self.batch_size,
+            workers=self.workers
+        )
+
+        for operation, data in report.succeeded:
+            self._add(data)
+
+        if report.failed:
+            raise FacepyError('Could not create %d of %d test users: %s' % (
+                len(report.failed), missing, report.failed[0][1]
+            ))
+
+    def _add(self, data):
+        user = User(
+            id=data['id'],
+            access_token=data.get('access_token'),
+            login_url=data.get('login_url'),
+            email=data.get('email'),
+            password=data.get('password'),
+            session=self.graph.session
+        )
+
+        self.users.append(user)
+        self.available.append(user)
+
+
+def make_friends(users, edges=None, graph=None, batch_size=50, workers=4, retry=3, progress=None):
+    """
+    Make test users friends with one another in concurrent batch requests.
+
+    :param users: A list of ``User`` instances.
+    :param edges: A list of tuples describing which users to make friends, either as ``User`` instances or as
+                  indexes into ``users``, or a function that returns such a list given ``users``, such as
+                  ``complete_graph``, ``star_graph`` or ``random_graph`` (defaults to ``complete_graph``).
+    :param graph: An optional ``GraphAPI`` instance to send the batch requests with (defaults to that of the
+                  first user). Each friend request is made with the access token of the user making it.
+    :param batch_size: An integer describing how many friend requests to pack into each batch request.
+    :param workers: An integer describing how many batch requests may be in flight at once.
+    :param retry: An integer describing how many times each friend request may be retried.
+    :param progress: An optional function that is called with the number of friend requests that are done
+                     and the total number of friend requests each time a batch request completes.
+
+    Returns a ``facepy.graph_api.BatchReport`` instance describing which edges succeeded, failed or were retried.
+    """
+    users = list(users)
+    if edges is None:
+        edges = complete_graph
+
+    if callable(edges):
+        edges = edges(users)
+
+    edges = [
+        tuple(users[user] if isinstance(user, (int, long)) else user for user in edge)
+        for edge in edges
+    ]
+
+    report = BatchReport()
+
+    if not edges:
+        return report
+
+    graph = graph or edges[0][0].graph
+
+    # Each friendship takes a friend request from one user and a friend request back from the other
+    # to confirm it, so the second phase can't start before the first is done.
+    def phase(pairs, offset, total):
+        requests = [
+            {
+                'method': 'POST',
+                'relative_url': '%s/friends/%s' % (user.id, friend.id),
+                'body': {'access_token': user.access_token}
+            } for user, friend in pairs
+        ]
+
+        return graph._batch_many(
+            requests, pairs, batch_size, workers, retry,
+            progress and (lambda done, count: progress(offset + done, total))
+        )
+
+    requested = phase(edges, 0, len(edges) * 2)
+
+    # Only the friend requests that were sent need to be confirmed.
+    pairs = [(friend, user) for (user, friend), response in requested.succeeded]
+
+    if progress and not pairs:
+        progress(len(edges), len(edges))
+
+    confirmed = phase(pairs, len(edges), len(edges) + len(pairs))
+
+    report.failed.extend(requested.failed)
+    report.failed.extend(((user, friend), exception) for (friend, user), exception in confirmed.failed)
+    report.succeeded.extend(((user, friend), response) for (friend, user), response in confirmed.succeeded)
+    report.retried.extend(requested.retried)
+    report.retried.extend((user, friend) for friend, user in confirmed.retried)
+
+    return report
+
+
+def complete_graph(users):
+    """Return a list of tuples describing edges that make every user friends with every other user."""
+    return [(users[i], users[j]) for i in range(len(users)) for j in range(i + 1, len(users))]
+
+
+def star_graph(users):
+    """Return a list of tuples describing edges that make the first user friends with every other user."""
+    return [(users[0], user) for user in users[1:]]
+
+
+def random_graph(probability=0.1, seed=None):
+    """
+    Return a function that returns a list of tuples describing edges that make each pair of users friends
+    with the given probability.
+
+    :param probability: A float describing the probability that two users are friends.
+    :param seed: An optional value to seed the random number generator with, so that graphs may be repeated.
+    """
+    def edges(users):
+        generator = random.Random(seed)
+
+        return [edge for edge in complete_graph(users) if generator.random() < probability]
+
+    return edges
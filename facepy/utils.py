@@ -1,21 +1,29 @@
+import hashlib
+import threading
+import time
+
 from datetime import datetime, timedelta
+from urllib import urlencode
 from urlparse import parse_qs
 
+from facepy.exceptions import FacebookError, FacepyError
 from facepy.graph_api import GraphAPI
+from facepy.stores import MemoryStore
 
 
-def get_extended_access_token(access_token, application_id, application_secret_key):
+def get_extended_access_token(access_token, application_id, application_secret_key, graph=None):
     """
     Get an extended OAuth access token.
 
     :param access_token: A string describing an OAuth access token.
     :param application_id: An integer describing the Facebook application's ID.
     :param application_secret_key: A string describing the Facebook application's secret key.
+    :param graph: An optional ``GraphAPI`` instance to make the request with, so that its session is reused.
 
     Returns a tuple with a string describing the extended access token and a datetime instance
     describing when it expires.
     """
-    graph = GraphAPI()
+    graph = graph or GraphAPI()
 
     response = graph.get(
         path='oauth/access_token',
@@ -33,14 +41,15 @@ def get_extended_access_token(access_token, application_id, application_secret_k
     return token, expires_at
 
 
-def get_application_access_token(application_id, application_secret_key):
+def get_application_access_token(application_id, application_secret_key, graph=None):
     """
     Get an OAuth access token for the given application.
 
     :param application_id: An integer describing a Facebook application's ID.
     :param application_secret_key: A string describing a Facebook application's secret key.
+    :param graph: An optional ``GraphAPI`` instance to make the request with, so that its session is reused.
     """
-    graph = GraphAPI()
+    graph = graph or GraphAPI()
 
     response = graph.get(
         path='oauth/access_token',
@@ -55,3 +64,354 @@ def get_application_access_token(application_id, application_secret_key):
         return data['access_token'][0]
     except KeyError:
         raise GraphAPI.FacebookError('No access token given')
+
+
+class AccessTokenManager(object):
+    """
+    An ``AccessTokenManager`` gets application access tokens and extended access tokens for one application
+    and reuses them until they are about to expire.
+
+    Tokens are kept in a ``facepy.stores.Store``, so that they may be shared between processes and survive
+    restarts. If several threads need the same token at once, only one of them gets it from Facebook while
+    the others wait for it. Managers may also refresh tokens in the background before they expire, so that
+    callers never have to wait for them.
+    """
+
+    def __init__(self, application_id, application_secret_key, store=None, margin=600, graph=None, idle=86400):
+        """
+        Initialize an access token manager.
+
+        :param application_id: An integer describing the Facebook application's ID.
+        :param application_secret_key: A string describing the Facebook application's secret key.
+        :param store: An optional ``facepy.stores.Store`` instance to keep tokens in (defaults to a
+                      ``MemoryStore``).
+        :param margin: An integer describing how many seconds before a token expires to get a new one.
+        :param graph: An optional ``GraphAPI`` instance to make requests with (defaults to a new one).
+        :param idle: An integer describing how many seconds a token may go unused before the manager stops
+                     refreshing it.
+        """
+        self.application_id = application_id
+        self.application_secret_key = application_secret_key
+        self.store = store if store is not None else MemoryStore()
+        self.margin = margin
+        self.graph = graph or GraphAPI()
+        self.idle = idle
+
+        self.exchanges = 0
+        self.errors = 0
+
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._exchanges = {}
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def get_application_access_token(self):
+        """
+        Get an OAuth access token for the application. Application access tokens don't expire, so it is
+        only requested from Facebook once.
+        """
+        def exchange(current):
+            return get_application_access_token(self.application_id, self.application_secret_key, self.graph), None
+
+        return self._get('application:%s' % self.application_id, exchange)[0]
+
+    def get_extended_access_token(self, access_token):
+        """
+        Get an extended OAuth access token.
+
+        :param access_token: A string describing an OAuth access token.
+
+        Returns a tuple with a string describing the extended access token and a datetime instance
+        describing when it expires.
+        """
+        def exchange(current):
+            # Once we have an extended access token, extend it rather than the original access token,
+            # which may well have expired by then.
+            return get_extended_access_token(
+                current or access_token,
+                self.application_id,
+                self.application_secret_key,
+                self.graph
+            )
+
+        return self._get(self._key(access_token), exchange)
+
+    def invalidate(self, access_token=None):
+        """
+        Forget an extended access token, such as one that has been revoked, so that a new one is gotten
+        the next time it is needed.
+
+        :param access_token: A string describing the access token that was extended, or ``None`` to forget
+                             the application access token.
+        """
+        if access_token is None:
+            key = 'application:%s' % self.application_id
+        else:
+            key = self._key(access_token)
+
+        with self._lock_for(key):
+            self.store.delete(key)
+
+            with self._lock:
+                self._exchanges.pop(key, None)
+
+    def start(self, interval=60):
+        """
+        Start refreshing the tokens this manager has gotten in the background before they expire.
+
+        :param interval: A number describing how many seconds to wait between looking for tokens to refresh.
+        """
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+
+        self._thread = threading.Thread(target=self._run, args=(interval,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop refreshing tokens in the background.
+
+        :param timeout: A number describing how many seconds to wait for the background thread to stop.
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def refresh(self, margin=None):
+        """
+        Refresh the tokens this manager has gotten that expire within the given number of seconds. Tokens
+        that haven't been gotten for longer than the manager's ``idle`` seconds are no longer refreshed.
+
+        :param margin: An integer describing how many seconds (defaults to the manager's margin).
+
+        Returns an integer describing how many tokens were refreshed.
+        """
+        margin = self.margin if margin is None else margin
+        count = 0
+
+        with self._lock:
+            idle_since = time.time() - self.idle
+
+            for key, (exchange, used_at) in self._exchanges.items():
+                if used_at < idle_since:
+                    del self._exchanges[key]
+                    self._locks.pop(key, None)
+
+            exchanges = [(key, exchange) for key, (exchange, used_at) in self._exchanges.items()]
+
+        for key, exchange in exchanges:
+            if self._cached(key, margin) is not None:
+                continue
+
+            with self._lock_for(key):
+                if self._cached(key, margin) is not None:
+                    continue
+
+                try:
+                    self._exchange(key, exchange)
+                    count += 1
+                except FacepyError:
+                    with self._lock:
+                        self.errors += 1
+
+        return count
+
+    def _get(self, key, exchange):
+        with self._lock:
+            self._exchanges[key] = exchange, time.time()
+
+        token = self._cached(key, self.margin)
+
+        if token is not None:
+            return token
+
+        # Only one thread gets a given token from Facebook; the others wait for it and use it.
+        with self._lock_for(key):
+            token = self._cached(key, self.margin)
+
+            if token is not None:
+                return token
+
+            return self._exchange(key, exchange)
+
+    def _exchange(self, key, exchange):
+        value = self.store.get(key)
+
+        token, expires_at = exchange(value['token'] if value else None)
+
+        with self._lock:
+            self.exchanges += 1
+
+        self.store.set(key, {
+            'token': token,
+            'expires_at': time.mktime(expires_at.timetuple()) if expires_at else None
+        })
+
+        return token, expires_at
+
+    def _cached(self, key, margin):
+        value = self.store.get(key)
+
+        if value is None:
+            return None
+
+        if value['expires_at'] is None:
+            return value['token'], None
+
+        if value['expires_at'] - margin <= time.time():
+            return None
+
+        return value['token'], datetime.fromtimestamp(value['expires_at'])
+
+    def _lock_for(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _key(self, access_token):
+        # Keys are more likely to be listed or logged than values, so don't use access tokens as they are.
+        return 'extended:%s' % hashlib.sha1(access_token).hexdigest()
+
+    def _run(self, interval):
+        while True:
+            self._stopped.wait(interval)
+
+            if self._stopped.is_set():
+                return
+
+            # Refresh tokens that would expire before we look again.
+            self.refresh(self.margin + interval)
+
+
+class AccessTokenDebugger(object):
+    """
+    An ``AccessTokenDebugger`` inspects many access tokens at once with Facebook's ``debug_token`` endpoint,
+    sending the inspections in concurrent batch requests and remembering the results until each access
+    token expires.
+    """
+
+    def __init__(self, graph, store=None, max_age=3600):
+        """
+        Initialize an access token debugger.
+
+        :param graph: A ``GraphAPI`` instance with an application access token (or an access token of one of
+                      the application's developers) to inspect access tokens with.
+        :param store: An optional ``facepy.stores.Store`` instance to remember results in (defaults to a
+                      ``MemoryStore``).
+        :param max_age: An integer describing how many seconds to remember results for access tokens that
+                        don't expire.
+        """
+        self.graph = graph
+        self.store = store if store is not None else MemoryStore()
+        self.max_age = max_age
+
+    def debug(self, access_tokens, batch_size=50, workers=4, retry=3):
+        """
+        Inspect access tokens.
+
+        :param access_tokens: A list of strings describing access tokens.
+        :param batch_size: An integer describing how many access tokens to inspect in each batch request.
+        :param workers: An integer describing how many batch requests may be in flight at once.
+        :param retry: An integer describing how many times each inspection may be retried.
+
+        Returns a dictionary mapping each access token to an ``AccessTokenInfo`` instance, or to the
+        exception its inspection failed with. Access tokens that have been inspected before and haven't
+        expired since are not inspected again.
+        """
+        results = {}
+        uncached = []
+
+        for access_token in set(access_tokens):
+            value = self.store.get(self._key(access_token))
+
+            if value is not None and value['cached_until'] > time.time():
+                results[access_token] = AccessTokenInfo(access_token, value['data'])
+            else:
+                uncached.append(access_token)
+
+        requests = [
+            {'method': 'GET', 'relative_url': 'debug_token?%s' % urlencode({'input_token': access_token})}
+            for access_token in uncached
+        ]
+
+        report = self.graph._batch_many(requests, uncached, batch_size, workers, retry)
+
+        for access_token, response in report.succeeded:
+            data = response.get('data') if isinstance(response, dict) else None
+
+            # Don't remember responses that don't describe the access token as if it were invalid.
+            if not isinstance(data, dict) or 'is_valid' not in data:
+                results[access_token] = FacebookError('Could not inspect access token')
+                continue
+
+            info = results[access_token] = AccessTokenInfo(access_token, data)
+
+            if info.expires_at:
+                cached_until = time.mktime(info.expires_at.timetuple())
+            else:
+                cached_until = time.time() + self.max_age
+
+            self.store.set(self._key(access_token), {'data': data, 'cached_until': cached_until})
+
+        for access_token, exception in report.failed:
+            results[access_token] = exception
+
+        return results
+
+    def _key(self, access_token):
+        return 'debug:%s' % hashlib.sha1(access_token).hexdigest()
+
+
+class AccessTokenInfo(object):
+    """
+    An ``AccessTokenInfo`` instance describes an access token as inspected by Facebook's ``debug_token``
+    endpoint.
+    """
+
+    token = None
+    """A string describing the access token."""
+
+    is_valid = None
+    """A boolean describing whether the access token is valid."""
+
+    application_id = None
+    """A string describing the ID of the application that the access token was issued for."""
+
+    user_id = None
+    """A string describing the ID of the user that the access token was issued by, if any."""
+
+    scopes = None
+    """A list of strings describing the permissions that the access token grants."""
+
+    expires_at = None
+    """A ``datetime`` instance describing when the access token expires, or ``None`` if it doesn't."""
+
+    error = None
+    """A dictionary describing why the access token is invalid, if it is."""
+
+    data = None
+    """A dictionary describing the inspection as it was given by Facebook."""
+
+    def __init__(self, token, data):
+        self.token = token
+        self.data = data
+        self.is_valid = bool(data.get('is_valid'))
+        self.application_id = data.get('app_id')
+        self.user_id = data.get('user_id')
+        self.scopes = data.get('scopes', [])
+        self.expires_at = datetime.fromtimestamp(data['expires_at']) if data.get('expires_at') else None
+        self.error = data.get('error')
+
+    @property
+    def has_expired(self):
+        """A boolean describing whether the access token has expired."""
+        return self.expires_at is not None and self.expires_at < datetime.now()
+
+    def __repr__(self):
+        return '<AccessTokenInfo %s valid=%s>' % (self.user_id or self.application_id, self.is_valid)
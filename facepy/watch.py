@@ -0,0 +1,166 @@
+import hashlib
+import time
+
+from facepy import json_codec
+
+
+class Watcher(object):
+    """
+    A ``Watcher`` polls paths of the Graph API and reports which of their items have been added, removed or
+    changed since they were last polled.
+
+    Paths are requested with the ETag of their previous response, so that the Graph API may answer that
+    they are unchanged without sending them again. Responses that are sent again are hashed once normalized,
+    and only diffed item by item if the hash differs from that of the previous response.
+    """
+
+    def __init__(self, graph, paths, interval=60, key='id', **options):
+        """
+        Initialize a watcher.
+
+        :param graph: A ``GraphAPI`` instance to poll with.
+        :param paths: A list of strings describing the paths to poll, such as ``me/feed`` or ``me``.
+        :param interval: A number describing how many seconds to take to poll every path once.
+        :param key: A string describing the field that identifies items.
+        :param options: Graph API parameters such as 'fields' or 'limit'.
+        """
+        self.graph = graph
+        self.paths = list(paths)
+        self.interval = interval
+        self.key = key
+        self.options = options
+
+        self.polls = 0
+        self.unmodified = 0
+        self.unchanged = 0
+
+        self._state = {}
+
+    def poll(self, path):
+        """
+        Poll a path.
+
+        :param path: A string describing the path.
+
+        Returns a ``Changes`` instance describing how the path's items have changed since it was last polled.
+        The first time a path is polled, every item is reported as added.
+        """
+        etag, digest, items = self._state.get(path, (None, None, {}))
+
+        response, etag = self.graph._get_if_changed(path, etag, **dict(self.options))
+
+        self.polls += 1
+
+        if response is None:
+            self.unmodified += 1
+            return Changes(path)
+
+        response = normalize(response)
+        new_digest = hashlib.md5(json_codec.dumps(response, sort_keys=True)).digest()
+
+        if new_digest == digest:
+            self._state[path] = (etag, digest, items)
+            self.unchanged += 1
+            return Changes(path)
+
+        new_items = {}
+
+        for index, item in enumerate(response['data'] if 'data' in response else [response]):
+            id = item.get(self.key, index) if isinstance(item, dict) else index
+            new_items[id] = (hashlib.md5(json_codec.dumps(item, sort_keys=True)).digest(), item)
+
+        changes = Changes(path)
+
+        for id, (item_digest, item) in new_items.items():
+            if id not in items:
+                changes.added.append(item)
+            elif items[id][0] != item_digest:
+                changes.changed.append((items[id][1], item))
+
+        for id, (item_digest, item) in items.items():
+            if id not in new_items:
+                changes.removed.append(item)
+
+        self._state[path] = (etag, new_digest, new_items)
+
+        return changes
+
+    def watch(self, rounds=None):
+        """
+        Poll every path once per interval, spreading the polls evenly over the interval.
+
+        :param rounds: An optional integer describing how many times to poll every path. By default, paths
+                       are polled until the generator is closed.
+
+        Returns a generator that yields a ``Changes`` instance each time a path changes.
+        """
+        if not self.paths:
+            return
+
+        spacing = float(self.interval) / len(self.paths)
+        started_at = time.time()
+        round = 0
+
+        while rounds is None or round < rounds:
+            for index, path in enumerate(self.paths):
+                delay = started_at + (round * len(self.paths) + index) * spacing - time.time()
+
+                # If polls take longer than their share of the interval, catch up rather than wait.
+                if delay > 0:
+                    time.sleep(delay)
+
+                changes = self.poll(path)
+
+                if changes:
+                    yield changes
+
+            round += 1
+
+
+class Changes(object):
+    """
+    A ``Changes`` instance describes how the items of a path have changed between two polls.
+    """
+
+    path = None
+    """A string describing the path."""
+
+    added = None
+    """A list of dictionaries describing items that have been added."""
+
+    removed = None
+    """A list of dictionaries describing items that have been removed, as they were last seen."""
+
+    changed = None
+    """A list of tuples describing items that have changed, as they were and as they are."""
+
+    def __init__(self, path):
+        self.path = path
+        self.added = []
+        self.removed = []
+        self.changed = []
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __repr__(self):
+        return '<Changes %s: %d added, %d removed, %d changed>' % (
+            self.path, len(self.added), len(self.removed), len(self.changed)
+        )
+
+
+def normalize(response):
+    """
+    Return a response without the parts that change from one request to the next regardless of whether its
+    items have changed, such as pagination cursors.
+
+    :param response: The parsed response.
+    """
+    if isinstance(response, dict) and 'paging' in response:
+        response = dict(response)
+        del response['paging']
+
+    if not isinstance(response, dict):
+        response = {'data': [response]}
+
+    return response
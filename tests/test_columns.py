@@ -0,0 +1,65 @@
+"""Tests for the ``columns`` module."""
+
+import math
+
+from nose.plugins.skip import SkipTest
+from nose.tools import *
+
+from facepy.columns import to_columns
+
+
+PAGES = [
+    {
+        'data': [
+            {'id': '1', 'from': {'name': 'Herc'}, 'likes': {'count': 3}, 'is_published': True},
+            {'id': '2', 'from': {'name': 'McNulty'}, 'tags': [{'name': 'Bunk'}]}
+        ]
+    },
+    {
+        'data': [
+            {'id': '3', 'likes': {'count': 1.5}}
+        ]
+    }
+]
+
+
+def test_to_columns():
+    columns, masks = to_columns(iter(PAGES), ['id', 'from.name', 'likes.count', 'tags.0.name', 'is_published', 'message'])
+
+    assert_equal(columns['id'], ['1', '2', '3'])
+    assert_equal(columns['from.name'], ['Herc', 'McNulty', None])
+    assert_equal(columns['tags.0.name'], [None, 'Bunk', None])
+    assert_equal(columns['message'], [None, None, None])
+
+    assert_equal(columns['likes.count'].typecode, 'd')
+    assert_equal(columns['likes.count'][0], 3.0)
+    assert math.isnan(columns['likes.count'][1])
+    assert_equal(columns['likes.count'][2], 1.5)
+
+    assert_equal(columns['is_published'].typecode, 'b')
+    assert_equal(list(columns['is_published']), [1, 0, 0])
+
+    assert_equal(list(masks['likes.count']), [1, 0, 1])
+    assert_equal(list(masks['message']), [0, 0, 0])
+
+
+def test_to_columns_with_types():
+    rows = [{'uid': '499729129', 'name': 'Herc'}, {'uid': '1'}]
+
+    columns, masks = to_columns(rows, ['uid'], types={'uid': int})
+
+    assert_equal(list(columns['uid']), [499729129, 1])
+    assert_equal(list(masks['uid']), [1, 1])
+
+
+def test_to_columns_with_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SkipTest('NumPy is not installed')
+
+    columns, masks = to_columns(PAGES, ['id', 'likes.count'], numpy=True)
+
+    assert_equal(columns['likes.count'].dtype, numpy.float64)
+    assert_equal(columns['id'].tolist(), ['1', '2', '3'])
+    assert_equal(masks['likes.count'].tolist(), [True, False, True])
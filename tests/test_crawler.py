@@ -0,0 +1,70 @@
+"""Tests for the ``crawler`` module."""
+
+import json
+
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import GraphAPI
+from facepy.crawler import Crawler
+
+
+patch = patch('requests.session')
+
+FRIENDS = {
+    '1': ['2', '3'],
+    '2': ['1', '4'],
+    '3': ['1', '4', '5'],
+    '4': ['2', '3', '6'],
+    '5': ['3'],
+    '6': ['4']
+}
+
+
+def mock():
+    global mock_request
+
+    mock_request = patch.start()().request
+
+    def side_effect(method, url, params, allow_redirects):
+        id = url.split('/')[-2]
+
+        if id == '5':
+            return MagicMock(content=json.dumps({'error': {'code': 1, 'message': 'An unknown error occurred'}}))
+
+        return MagicMock(content=json.dumps({
+            'data': [{'id': friend} for friend in FRIENDS[id]]
+        }))
+
+    mock_request.side_effect = side_effect
+
+
+def unmock():
+    patch.stop()
+
+
+@with_setup(mock, unmock)
+def test_crawl():
+    crawler = Crawler(GraphAPI('<access token>'), connections=['friends'], depth=2)
+    discovered = []
+
+    count = crawler.crawl(['1'], lambda item, connection, depth: discovered.append((item['id'], connection, depth)))
+
+    assert_equal(count, 4)
+    assert_equal(sorted(discovered), [('2', 'friends', 1), ('3', 'friends', 1), ('4', 'friends', 2), ('5', 'friends', 2)])
+
+    # Object 5 is discovered at depth 1 but may not be crawled.
+    crawler = Crawler(GraphAPI('<access token>'), depth=3)
+
+    assert_equal(crawler.crawl(['3'], lambda *args: None), 5)
+    assert_equal([id for id, exception in crawler.errors], ['5'])
+
+
+@with_setup(mock, unmock)
+def test_crawl_with_budget():
+    crawler = Crawler(GraphAPI('<access token>'), depth=10, budget=2)
+
+    crawler.crawl(['1'], lambda *args: None)
+
+    assert_equal(crawler.crawled, 2)
+    assert_equal(len(mock_request.call_args_list), 2)
@@ -0,0 +1,105 @@
+"""Tests for the ``export`` module."""
+
+import json
+import os
+import tempfile
+
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import GraphAPI
+from facepy.export import NDJSONSink, CSVSink, load_checkpoint
+
+
+patch = patch('requests.session')
+
+PAGES = {
+    'https://graph.facebook.com/herc/posts': {
+        'data': [{'id': '1', 'from': {'name': 'Herc'}}, {'id': '2', 'from': {'name': 'Herc'}}],
+        'paging': {'next': 'https://graph.facebook.com/herc/posts?offset=2'}
+    },
+    'https://graph.facebook.com/herc/posts?offset=2': {
+        'data': [{'id': '3', 'from': {'name': 'McNulty'}}],
+        'paging': {'next': 'https://graph.facebook.com/herc/posts?offset=3'}
+    },
+    'https://graph.facebook.com/herc/posts?offset=3': {
+        'data': []
+    }
+}
+
+
+def mock():
+    global mock_request, output, checkpoint
+
+    mock_request = patch.start()().request
+    mock_request.side_effect = lambda method, url, params, allow_redirects: MagicMock(content=json.dumps(PAGES[url]))
+
+    output = tempfile.mktemp()
+    checkpoint = tempfile.mktemp()
+
+
+def unmock():
+    patch.stop()
+
+    for path in [output, checkpoint]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@with_setup(mock, unmock)
+def test_export_to_ndjson():
+    graph = GraphAPI('<access token>')
+
+    report = graph.export('herc/posts', NDJSONSink(output), checkpoint=checkpoint, interval=1)
+
+    assert_equal([json.loads(line)['id'] for line in open(output)], ['1', '2', '3'])
+    assert_equal(report.items, 3)
+    assert_equal(report.pages, 3)
+    assert_equal(report.bytes, os.path.getsize(output))
+    assert report.items_per_second > 0
+    assert not os.path.exists(checkpoint)
+
+
+@with_setup(mock, unmock)
+def test_export_to_csv():
+    graph = GraphAPI('<access token>')
+
+    graph.export('herc/posts', CSVSink(output, fields=['id', 'from.name']))
+
+    assert_equal(open(output).read().splitlines(), ['id,from.name', '1,Herc', '2,Herc', '3,McNulty'])
+
+
+@with_setup(mock, unmock)
+def test_export_to_function():
+    graph = GraphAPI('<access token>')
+    items = []
+
+    graph.export('herc/posts', items.append)
+
+    assert_equal([item['id'] for item in items], ['1', '2', '3'])
+
+
+@with_setup(mock, unmock)
+def test_export_checkpoints_and_resumes():
+    graph = GraphAPI('<access token>')
+
+    def interrupt(report):
+        if report.pages == 2:
+            raise KeyboardInterrupt
+
+    assert_raises(KeyboardInterrupt, graph.export, 'herc/posts', NDJSONSink(output), checkpoint=checkpoint, interval=1, progress=interrupt)
+
+    assert_equal(load_checkpoint(checkpoint)['next'], 'https://graph.facebook.com/herc/posts?offset=3')
+
+    # Pretend we crashed halfway through writing an item after the checkpoint.
+    with open(output, 'a') as file:
+        file.write('{"id": "4"')
+
+    mock_request.reset_mock()
+
+    report = graph.export('herc/posts', NDJSONSink(output), checkpoint=checkpoint, interval=1)
+
+    assert report.resumed
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal([json.loads(line)['id'] for line in open(output)], ['1', '2', '3'])
+    assert not os.path.exists(checkpoint)
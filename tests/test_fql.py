@@ -0,0 +1,147 @@
+"""Tests for the ``fql`` module."""
+
+import json
+import threading
+
+from urlparse import parse_qs, urlparse
+
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import GraphAPI
+from facepy.fql import split
+
+
+patch = patch('requests.session')
+
+
+def mock():
+    global mock_request
+
+    mock_request = patch.start()().request
+
+
+def unmock():
+    patch.stop()
+
+
+def query_of(url):
+    return parse_qs(urlparse(url).query)['q'][0]
+
+
+def uids_of(query):
+    return [int(uid) for uid in query.split('IN (')[1].split(')')[0].split(',')]
+
+
+def test_split():
+    query = 'SELECT name FROM user WHERE uid IN (%s) AND sex = \'male\'' % ', '.join(str(uid) for uid in range(10))
+
+    queries = split(query, 4)
+
+    assert_equal(queries, [
+        'SELECT name FROM user WHERE uid IN (0,1,2,3) AND sex = \'male\'',
+        'SELECT name FROM user WHERE uid IN (4,5,6,7) AND sex = \'male\'',
+        'SELECT name FROM user WHERE uid IN (8,9) AND sex = \'male\''
+    ])
+
+    assert_equal(split(query, 10), [query])
+
+
+def test_split_splits_the_longest_list():
+    query = "SELECT pid FROM photo WHERE owner IN ('a,b', \"c\") AND aid IN (1, 2, 3)"
+
+    assert_equal(split(query, 2), [
+        "SELECT pid FROM photo WHERE owner IN ('a,b', \"c\") AND aid IN (1,2)",
+        "SELECT pid FROM photo WHERE owner IN ('a,b', \"c\") AND aid IN (3)"
+    ])
+
+
+def test_split_splits_every_list_that_is_too_long():
+    query = 'SELECT uid1, uid2 FROM friend WHERE uid1 IN (1, 2, 3) AND uid2 IN (4, 5, 6, 7, 8)'
+
+    assert_equal(split(query, 3), [
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (1, 2, 3) AND uid2 IN (4,5,6)',
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (1, 2, 3) AND uid2 IN (7,8)'
+    ])
+
+    assert_equal(split(query, 2), [
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (1,2) AND uid2 IN (4,5)',
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (3) AND uid2 IN (4,5)',
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (1,2) AND uid2 IN (6,7)',
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (3) AND uid2 IN (6,7)',
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (1,2) AND uid2 IN (8)',
+        'SELECT uid1, uid2 FROM friend WHERE uid1 IN (3) AND uid2 IN (8)'
+    ])
+
+
+def test_split_leaves_subqueries_alone():
+    query = 'SELECT name FROM user WHERE uid IN (SELECT uid2 FROM friend WHERE uid1 = 1)'
+
+    assert_equal(split(query, 1), [query])
+
+
+@with_setup(mock, unmock)
+def test_fql_chunked():
+    graph = GraphAPI('<access token>')
+    lock = threading.Lock()
+    queries = []
+
+    def side_effect(method, url, params, allow_redirects):
+        query = query_of(url)
+
+        with lock:
+            queries.append(query)
+
+        return MagicMock(content=json.dumps({
+            'data': [{'uid': uid} for uid in uids_of(query)]
+        }))
+
+    mock_request.side_effect = side_effect
+
+    rows = graph.fql_chunked(
+        'SELECT uid FROM user WHERE uid IN (%s)' % ','.join(str(uid) for uid in range(1000)),
+        chunk_size=100,
+        workers=4
+    )
+
+    assert_equal([row['uid'] for row in rows], range(1000))
+    assert_equal(len(queries), 10)
+
+
+@with_setup(mock, unmock)
+def test_fql_chunked_with_multiquery():
+    graph = GraphAPI('<access token>')
+
+    def side_effect(method, url, params, allow_redirects):
+        multiquery = json.loads(query_of(url))
+
+        # Requests carry no more values than the chunk size, however many queries they pack.
+        assert sum(len(uids_of(query)) for query in multiquery.values()) <= 100
+
+        return MagicMock(content=json.dumps({
+            'data': [
+                {'name': name, 'fql_result_set': [{'uid': uid} for uid in uids_of(query)]}
+                for name, query in multiquery.items()
+            ]
+        }))
+
+    mock_request.side_effect = side_effect
+
+    rows = graph.fql_chunked(
+        'SELECT uid FROM user WHERE uid IN (%s)' % ','.join(str(uid) for uid in range(1000)),
+        chunk_size=100,
+        multiquery=4
+    )
+
+    assert_equal([row['uid'] for row in rows], range(1000))
+    assert_equal(mock_request.call_count, 10)
+
+
+@with_setup(mock, unmock)
+def test_fql_chunked_with_short_list():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps({'data': [{'uid': 1}]})
+
+    assert_equal(list(graph.fql_chunked('SELECT uid FROM user WHERE uid IN (1, 2)')), [{'uid': 1}])
+    assert_equal(query_of(mock_request.call_args[0][1]), 'SELECT uid FROM user WHERE uid IN (1, 2)')
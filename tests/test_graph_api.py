@@ -1,12 +1,16 @@
 """Tests for the ``graph_api`` module."""
 
 import json
+import os
+import tempfile
 
+from StringIO import StringIO
 from nose.tools import *
 from mock import patch, MagicMock
 from requests.exceptions import ConnectionError
 
 from facepy import GraphAPI
+from facepy.graph_api import STREAM, UploadSession
 
 
 patch = patch('requests.session')
@@ -503,3 +507,551 @@ def test_retry():
 
     assert_raises(GraphAPI.FacebookError, graph.get, 'me', retry=3)
     assert_equal(len(mock_request.call_args_list), 4)
+
+
+@with_setup(mock, unmock)
+def test_delete_many():
+    graph = GraphAPI('<access token>')
+
+    def side_effect(method, url, data, files):
+        requests = json.loads(data['batch'])
+
+        return MagicMock(content=json.dumps([
+            {'code': 200, 'headers': [], 'body': 'true'} for request in requests
+        ]))
+
+    mock_request.side_effect = side_effect
+
+    report = graph.delete_many([str(id) for id in range(120)], batch_size=50, workers=3)
+
+    assert_equal(len(mock_request.call_args_list), 3)
+    assert_equal(len(report.succeeded), 120)
+    assert_equal(report.failed, [])
+    assert_equal(report.retried, [])
+    assert_equal(report.succeeded[0], ('0', True))
+
+
+@with_setup(mock, unmock)
+def test_post_many_with_partial_failures():
+    graph = GraphAPI('<access token>')
+
+    attempts = {}
+
+    def side_effect(method, url, data, files):
+        responses = []
+
+        for request in json.loads(data['batch']):
+            path = request['relative_url']
+            attempts[path] = attempts.get(path, 0) + 1
+
+            if path == 'broken/feed' or (path == 'flaky/feed' and attempts[path] == 1):
+                responses.append({'code': 500, 'headers': [], 'body': '{"error_code": 1, "error_msg": "An unknown error occurred"}'})
+            else:
+                responses.append({'code': 200, 'headers': [], 'body': '{"id": "1"}'})
+
+        return MagicMock(content=json.dumps(responses))
+
+    mock_request.side_effect = side_effect
+
+    operations = [
+        ('me/feed', {'message': 'Hi me.'}),
+        ('flaky/feed', {'message': 'Hi flaky.'}),
+        ('broken/feed', {'message': 'Hi broken.'})
+    ]
+
+    report = graph.post_many(operations, retry=2)
+
+    assert_equal(attempts, {'me/feed': 1, 'flaky/feed': 2, 'broken/feed': 3})
+    assert_equal([operation for operation, response in report.succeeded], operations[:2])
+    assert_equal([operation for operation, exception in report.failed], operations[2:])
+    assert isinstance(report.failed[0][1], GraphAPI.FacebookError)
+    assert_equal(report.retried, operations[1:])
+    assert_equal(operations[0][1], {'message': 'Hi me.'})
+
+
+@with_setup(mock, unmock)
+def test_delete_many_retries_requests_that_did_not_complete():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        [None, {'code': 200, 'headers': [], 'body': 'true'}],
+        [{'code': 200, 'headers': [], 'body': 'true'}]
+    ]
+
+    mock_request.side_effect = lambda method, url, data, files: MagicMock(content=json.dumps(responses.pop(0)))
+
+    report = graph.delete_many(['1', '2'], retry=1)
+
+    assert_equal(report.succeeded, [('1', True), ('2', True)])
+    assert_equal(report.retried, ['1'])
+
+    mock_request.side_effect = lambda method, url, data, files: MagicMock(content=json.dumps([None]))
+
+    report = graph.delete_many(['1'], retry=0)
+
+    assert_equal(report.succeeded, [])
+    assert isinstance(report.failed[0][1], GraphAPI.FacebookError)
+
+
+@with_setup(mock, unmock)
+def test_post_many_does_not_resend_batch_requests_that_fail():
+    graph = GraphAPI('<access token>')
+
+    mock_request.side_effect = ConnectionError('Read timed out')
+
+    report = graph.post_many([('me/feed', {'message': 'Hi me.'})], retry=3)
+
+    assert_equal(len(mock_request.call_args_list), 1)
+    assert_equal(report.retried, [])
+    assert isinstance(report.failed[0][1], GraphAPI.HTTPError)
+
+    # Deletions may be sent again.
+    mock_request.reset_mock()
+
+    report = graph.delete_many(['1'], retry=3)
+
+    assert_equal(len(mock_request.call_args_list), 4)
+    assert_equal(report.retried, ['1'])
+
+
+@with_setup(mock, unmock)
+def test_get_parallel():
+    graph = GraphAPI('<access token>')
+
+    # The connection shifts by one item between pages, so the item at each boundary appears twice.
+    items = [{'id': str(id)} for id in range(10)]
+
+    def side_effect(method, url, params, allow_redirects):
+        offset, limit = params['offset'], params['limit']
+
+        return MagicMock(content=json.dumps({
+            'data': items[max(offset - 1, 0):offset - 1 + limit] if offset else items[:limit]
+        }))
+
+    mock_request.side_effect = side_effect
+
+    results = list(graph.get_parallel('herc/posts', limit=4, workers=2, fields='id'))
+
+    assert_equal(results, items)
+
+    offsets = sorted(call[1]['params']['offset'] for call in mock_request.call_args_list)
+
+    assert_equal(offsets, [0, 4, 8, 12])
+    assert_equal(mock_request.call_args_list[0][1]['params']['fields'], 'id')
+
+
+@with_setup(mock, unmock)
+def test_get_parallel_with_short_pages():
+    graph = GraphAPI('<access token>')
+
+    # Facebook filters items out of pages, such as those the user may not see, after paginating.
+    hidden = set(['2', '3', '5'])
+
+    def side_effect(method, url, params, allow_redirects):
+        ids = [str(id) for id in range(params['offset'], min(params['offset'] + params['limit'], 12))]
+
+        return MagicMock(content=json.dumps({
+            'data': [{'id': id} for id in ids if id not in hidden]
+        }))
+
+    mock_request.side_effect = side_effect
+
+    results = list(graph.get_parallel('herc/posts', limit=4, workers=2))
+
+    assert_equal(results, [{'id': str(id)} for id in range(12) if str(id) not in hidden])
+
+
+@with_setup(mock, unmock)
+def test_get_parallel_with_total():
+    graph = GraphAPI('<access token>')
+
+    def side_effect(method, url, params, allow_redirects):
+        return MagicMock(content=json.dumps({
+            'data': [{'id': str(id)} for id in range(params['offset'], params['offset'] + params['limit'])]
+        }))
+
+    mock_request.side_effect = side_effect
+
+    results = list(graph.get_parallel('herc/posts', limit=5, workers=3, total=20))
+
+    assert_equal(results, [{'id': str(id)} for id in range(20)])
+    assert_equal(len(mock_request.call_args_list), 4)
+
+
+@with_setup(mock, unmock)
+def test_get_range():
+    graph = GraphAPI('<access token>')
+
+    items = [{'id': str(timestamp), 'created_time': timestamp} for timestamp in range(1000, 1300, 10)]
+
+    def side_effect(method, url, params, allow_redirects):
+        window = [item for item in items if params['since'] <= item['created_time'] <= params['until']]
+
+        return MagicMock(content=json.dumps({
+            'data': window[:params['limit']]
+        }))
+
+    mock_request.side_effect = side_effect
+
+    results = list(graph.get_range('herc/feed', since=1000, until=1300, windows=2, workers=3, limit=5, min_window=1))
+
+    assert_equal(sorted(results), sorted(items))
+    assert len(mock_request.call_args_list) > 2
+
+
+@with_setup(mock, unmock)
+def test_get_range_with_errors():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps({
+        'error': {
+            'code': 1,
+            'message': 'An unknown error occurred'
+        }
+    })
+
+    assert_raises(GraphAPI.FacebookError, list, graph.get_range('herc/feed', since=1000, until=1300))
+
+
+@with_setup(mock, unmock)
+def test_get_range_with_unexpected_errors():
+    graph = GraphAPI('<access token>')
+
+    mock_request.side_effect = KeyError('Boom')
+
+    assert_raises(KeyError, list, graph.get_range('herc/feed', since=1000, until=1300, workers=2))
+
+
+@with_setup(mock, unmock)
+def test_get_ids():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        {
+            'data': [{'id': '1'}, {'id': '2'}],
+            'paging': {'next': 'https://graph.facebook.com/herc/friends?limit=2&offset=2'}
+        },
+        {
+            'data': [{'id': '3'}]
+        }
+    ]
+
+    mock_request.side_effect = lambda *args, **kwargs: MagicMock(content=json.dumps(responses.pop(0)))
+
+    ids = graph.get_ids('herc/friends', limit=2)
+
+    assert_equal(list(ids), [1, 2, 3])
+    assert_equal(mock_request.call_args_list[0][1]['params']['fields'], 'id')
+
+
+@with_setup(mock, unmock)
+def test_get_ids_without_access():
+    graph = GraphAPI('<access token>')
+
+    # Facebook responds with 'false' to connections the user may not see.
+    mock_request.return_value.content = 'false'
+
+    assert_equal(len(graph.get_ids('herc/friends')), 0)
+
+
+@with_setup(mock, unmock)
+def test_raw_get():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = '{"id": 1, "name": "Thomas \'Herc\' Hauk", "bio": "\\"error\\""}'
+
+    assert_equal(graph.get('me', raw=True), mock_request.return_value.content)
+
+    mock_request.return_value.content = ' {"error": {"code": 1, "message": "An unknown error occurred"}}'
+
+    assert_raises(GraphAPI.FacebookError, graph.get, 'me', raw=True)
+
+    mock_request.return_value.content = '{"error_code": 1, "error_msg": "An unknown error occurred"}'
+
+    assert_raises(GraphAPI.FacebookError, graph.get, 'me', raw=True)
+
+    mock_request.return_value.content = 'false'
+
+    assert_raises(GraphAPI.FacebookError, graph.get, 'me', raw=True)
+
+    assert_raises(ValueError, graph.get, 'me', page=True, raw=True)
+
+
+@with_setup(mock, unmock)
+def test_raw_fql():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = '{"data": [{"name": "Thomas \'Herc\' Hauk"}]}'
+
+    assert_equal(graph.fql('SELECT name FROM user WHERE uid=me()', raw=True), mock_request.return_value.content)
+
+
+@with_setup(mock, unmock)
+def test_raw_batch():
+    graph = GraphAPI('<access token>')
+
+    mock_request.return_value.content = json.dumps([
+        {'code': 200, 'headers': [], 'body': '{"foo": "bar"}'},
+        {'code': 500, 'headers': [], 'body': '{"error_code": 1, "error_msg": "An unknown error occurred"}'}
+    ])
+
+    responses = list(graph.batch([{'method': 'GET', 'relative_url': 'me'}, {'method': 'GET', 'relative_url': 'you'}], raw=True))
+
+    assert_equal(responses[0], '{"foo": "bar"}')
+    assert isinstance(responses[1], GraphAPI.FacebookError)
+
+
+@with_setup(mock, unmock)
+def test_download():
+    graph = GraphAPI('<access token>')
+    destination = StringIO()
+
+    mock_request.return_value = MagicMock(
+        status_code=200,
+        headers={'content-type': 'image/jpeg'},
+        iter_content=MagicMock(return_value=iter(['<', 'parrot', '>']))
+    )
+
+    assert_equal(graph.download('herc/picture', destination, chunk_size=1024, type='large'), 8)
+    assert_equal(destination.getvalue(), '<parrot>')
+
+    mock_request.assert_called_with(
+        'GET',
+        'https://graph.facebook.com/herc/picture',
+        params={'type': 'large', 'access_token': '<access token>'},
+        headers={},
+        allow_redirects=True,
+        **STREAM
+    )
+
+
+@with_setup(mock, unmock)
+def test_download_with_error_status():
+    graph = GraphAPI('<access token>')
+    destination = StringIO()
+
+    mock_request.return_value = MagicMock(
+        status_code=500,
+        headers={'content-type': 'text/html'},
+        iter_content=MagicMock(return_value=iter(['<html>Internal Server Error</html>']))
+    )
+
+    assert_raises(GraphAPI.HTTPError, graph.download, 'herc/picture', destination)
+    assert_equal(destination.getvalue(), '')
+
+
+@with_setup(mock, unmock)
+def test_download_resumes():
+    graph = GraphAPI('<access token>')
+    destination = tempfile.mktemp()
+
+    with open(destination, 'wb') as file:
+        file.write('<par')
+
+    try:
+        mock_request.return_value = MagicMock(
+            status_code=206,
+            headers={'content-type': 'image/jpeg', 'content-range': 'bytes 4-7/8'},
+            iter_content=MagicMock(return_value=iter(['rot>']))
+        )
+
+        assert_equal(graph.download('herc/picture', destination, resume=True), 8)
+        assert_equal(mock_request.call_args[1]['headers'], {'Range': 'bytes=4-'})
+        assert_equal(open(destination, 'rb').read(), '<parrot>')
+
+        # Files are complete when the server has no more bytes to send.
+        mock_request.return_value = MagicMock(status_code=416, headers={'content-range': 'bytes */8'})
+
+        assert_equal(graph.download('herc/picture', destination, resume=True), 8)
+        assert_equal(open(destination, 'rb').read(), '<parrot>')
+
+        # Servers that don't support ranges, or whose file has changed, send the whole file.
+        mock_request.return_value = MagicMock(
+            status_code=200,
+            headers={'content-type': 'image/jpeg'},
+            iter_content=MagicMock(return_value=iter(['<ha', 'wk>']))
+        )
+
+        assert_equal(graph.download('herc/picture', destination, resume=True), 6)
+        assert_equal(open(destination, 'rb').read(), '<hawk>')
+
+        # Downloads start over when the server sends another part of the file than the one asked for...
+        def side_effect(method, url, params, headers, allow_redirects, **kwargs):
+            if 'Range' in headers:
+                return MagicMock(
+                    status_code=206,
+                    headers={'content-type': 'image/jpeg', 'content-range': 'bytes 0-7/8'},
+                    iter_content=MagicMock(return_value=iter(['<parrot>']))
+                )
+
+            return MagicMock(
+                status_code=200,
+                headers={'content-type': 'image/jpeg'},
+                iter_content=MagicMock(return_value=iter(['<parrot>']))
+            )
+
+        mock_request.side_effect = side_effect
+
+        assert_equal(graph.download('herc/picture', destination, resume=True), 8)
+        assert_equal(open(destination, 'rb').read(), '<parrot>')
+
+        # ... or when the file has another size than the one on disk.
+        with open(destination, 'wb') as file:
+            file.write('<parrot><parrot>')
+
+        def side_effect(method, url, params, headers, allow_redirects, **kwargs):
+            if 'Range' in headers:
+                return MagicMock(status_code=416, headers={'content-range': 'bytes */8'})
+
+            return MagicMock(
+                status_code=200,
+                headers={'content-type': 'image/jpeg'},
+                iter_content=MagicMock(return_value=iter(['<parrot>']))
+            )
+
+        mock_request.side_effect = side_effect
+
+        assert_equal(graph.download('herc/picture', destination, resume=True), 8)
+        assert_equal(open(destination, 'rb').read(), '<parrot>')
+
+        # Downloads aren't resumed unless asked to.
+        mock_request.side_effect = None
+        mock_request.return_value = MagicMock(
+            status_code=200,
+            headers={'content-type': 'image/jpeg'},
+            iter_content=MagicMock(return_value=iter(['<hawk>']))
+        )
+
+        assert_equal(graph.download('herc/picture', destination), 6)
+        assert_equal(mock_request.call_args[1]['headers'], {})
+        assert_equal(open(destination, 'rb').read(), '<hawk>')
+    finally:
+        os.remove(destination)
+
+
+@with_setup(mock, unmock)
+def test_download_resumes_after_transport_errors_only_if_unchanged():
+    graph = GraphAPI('<access token>')
+    destination = StringIO()
+    requests = []
+
+    def interrupted():
+        yield '<par'
+        raise ConnectionError('Connection reset by peer')
+
+    def side_effect(method, url, params, headers, allow_redirects, **kwargs):
+        requests.append(dict(headers))
+
+        if not headers:
+            return MagicMock(
+                status_code=200,
+                headers={'content-type': 'image/jpeg', 'etag': '"1"'},
+                iter_content=MagicMock(return_value=interrupted())
+            )
+
+        # The file has changed since the download started.
+        return MagicMock(
+            status_code=200,
+            headers={'content-type': 'image/jpeg', 'etag': '"2"'},
+            iter_content=MagicMock(return_value=iter(['<hawk>']))
+        )
+
+    mock_request.side_effect = side_effect
+
+    assert_equal(graph.download('herc/picture', destination), 6)
+    assert_equal(requests, [{}, {'Range': 'bytes=4-', 'If-Range': '"1"'}])
+    assert_equal(destination.getvalue(), '<hawk>')
+
+
+@with_setup(mock, unmock)
+def test_download_many():
+    graph = GraphAPI('<access token>')
+
+    def side_effect(method, url, **kwargs):
+        if url.endswith('/2/picture'):
+            return MagicMock(
+                status_code=400,
+                headers={'content-type': 'text/javascript; charset=UTF-8'},
+                content='{"error": {"code": 1, "message": "An unknown error occurred"}}'
+            )
+
+        return MagicMock(
+            status_code=200,
+            headers={'content-type': 'image/jpeg'},
+            iter_content=MagicMock(return_value=iter(['<parrot>']))
+        )
+
+    mock_request.side_effect = side_effect
+
+    destinations = [StringIO(), StringIO()]
+
+    results = graph.download_many([('1/picture', destinations[0]), ('2/picture', destinations[1])], workers=2)
+
+    assert_equal(results[0], 8)
+    assert isinstance(results[1], GraphAPI.FacebookError)
+    assert_equal(destinations[0].getvalue(), '<parrot>')
+
+
+@with_setup(mock, unmock)
+def test_upload_video():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        {'upload_session_id': '<session>', 'video_id': '<video>', 'start_offset': '0', 'end_offset': '4'},
+        {'error': {'code': 1, 'message': 'An unknown error occurred'}},
+        {'start_offset': '4', 'end_offset': '8'},
+        {'start_offset': '8', 'end_offset': '8'},
+        {'success': True}
+    ]
+
+    requests = []
+
+    def side_effect(method, url, data, files):
+        requests.append((dict(data), dict((key, file.read()) for key, file in files.items())))
+
+        return MagicMock(content=json.dumps(responses.pop(0)))
+
+    mock_request.side_effect = side_effect
+
+    sessions = []
+
+    response = graph.upload_video(
+        'me/videos',
+        StringIO('<parrot>'),
+        progress=lambda session: sessions.append(session.to_dict()),
+        title='Parrot'
+    )
+
+    assert_equal(response, {'success': True})
+    assert_equal([data['upload_phase'] for data, files in requests], ['start', 'transfer', 'transfer', 'transfer', 'finish'])
+    assert_equal(requests[0][0]['file_size'], 8)
+    assert_equal([files['video_file_chunk'] for data, files in requests[1:4]], ['<par', '<par', 'rot>'])
+    assert_equal(requests[4][0]['title'], 'Parrot')
+    assert_equal([session['start_offset'] for session in sessions], [0, 4, 8])
+
+
+@with_setup(mock, unmock)
+def test_resume_video_upload():
+    graph = GraphAPI('<access token>')
+
+    responses = [
+        {'start_offset': '8', 'end_offset': '8'},
+        {'success': True}
+    ]
+
+    requests = []
+
+    def side_effect(method, url, data, files):
+        requests.append((dict(data), dict((key, file.read()) for key, file in files.items())))
+
+        return MagicMock(content=json.dumps(responses.pop(0)))
+
+    mock_request.side_effect = side_effect
+
+    session = UploadSession(id='<session>', video_id='<video>', start_offset=4, end_offset=8)
+
+    graph.upload_video('me/videos', StringIO('<parrot>'), session=session)
+
+    assert_equal(requests[0][0]['start_offset'], 4)
+    assert_equal(requests[0][1]['video_file_chunk'], 'rot>')
+    assert_equal(requests[1][0]['upload_phase'], 'finish')
@@ -0,0 +1,50 @@
+"""Tests for the ``ids`` module."""
+
+from nose.tools import *
+
+from facepy.ids import IdArray, IdSet, to_integer
+
+
+def test_id_set():
+    ids = IdSet(capacity=1)
+
+    for id in range(1, 1000):
+        assert ids.add(str(id))
+
+    assert not ids.add('1')
+    assert ids.add('1_2')
+
+    assert_equal(len(ids), 1000)
+    assert '999' in ids
+    assert '1_2' in ids
+    assert '1000' not in ids
+    assert '1_3' not in ids
+
+
+def test_to_integer():
+    assert_equal(to_integer('499729129'), 499729129)
+    assert_equal(to_integer(499729129), 499729129)
+    assert to_integer('499729129_1234') < 0
+
+
+def test_id_array():
+    ids = IdArray(['1', '2', '3', '2'])
+    others = IdArray(['2', '4'])
+
+    assert_equal(list(ids & others), [2, 2])
+    assert_equal(list(ids - others), [1, 3])
+    assert_equal(list(ids | others), [1, 2, 3, 2, 4])
+    assert_equal(list(ids.unique()), [1, 2, 3])
+    assert_equal(list(ids.intersection(['3'])), [3])
+    assert '3' in ids
+    assert '4' not in ids
+
+
+def test_id_array_set_operations_with_large_arrays():
+    ids = IdArray(xrange(0, 20000, 2))
+    others = IdArray(xrange(0, 20000, 3))
+
+    assert_equal(list(ids & others), range(0, 20000, 6))
+    assert_equal(len(ids - others), len(ids) - len(range(0, 20000, 6)))
+    assert_equal(len(ids | others), len(set(range(0, 20000, 2)) | set(range(0, 20000, 3))))
+    assert_equal(list(ids.difference(['0', '2_3'])), range(2, 20000, 2))
@@ -0,0 +1,73 @@
+"""Tests for the ``json_codec`` module."""
+
+import json
+
+from nose.plugins.skip import SkipTest
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import FacepyError, GraphAPI, json_codec
+
+
+patch = patch('requests.session')
+
+
+def mock():
+    global mock_request, backend
+
+    mock_request = patch.start()().request
+    backend = json_codec.get_backend()
+
+
+def unmock():
+    patch.stop()
+    json_codec.set_backend(backend)
+
+
+@with_setup(mock, unmock)
+def test_set_backend():
+    json_codec.set_backend('json')
+
+    assert_equal(json_codec.get_backend().name, 'json')
+    assert_equal(json_codec.loads('{"foo": ["bar"]}'), {'foo': ['bar']})
+    assert_equal(json_codec.dumps({'foo': ['bar']}), '{"foo": ["bar"]}')
+    assert_equal(json_codec.dumps({'foo': ['bar']}, compact=True), '{"foo":["bar"]}')
+    assert_equal(json_codec.dumps({'b': 1, 'a': 2}, compact=True, sort_keys=True), '{"a":2,"b":1}')
+
+
+@with_setup(mock, unmock)
+def test_set_unsupported_backend():
+    assert_raises(FacepyError, json_codec.set_backend, 'yaml')
+
+
+@with_setup(mock, unmock)
+def test_custom_backend_is_used_by_graph_api():
+    module = MagicMock(loads=MagicMock(side_effect=json.loads), dumps=MagicMock(side_effect=json.dumps))
+
+    json_codec.set_backend(module)
+
+    mock_request.return_value.content = '{"id": 1}'
+
+    assert_equal(GraphAPI('<access token>').get('me'), {'id': 1})
+    module.loads.assert_called_with('{"id": 1}')
+
+
+def test_available_backends():
+    assert 'json' in json_codec.available_backends()
+
+
+@with_setup(mock, unmock)
+def test_ujson_backend():
+    if 'ujson' not in json_codec.available_backends():
+        raise SkipTest('ujson is not installed')
+
+    json_codec.set_backend('ujson')
+
+    obj = {'b': [1, 2.5, None, True], 'a': u'\xe6\xf8\xe5', 'url': 'http://facebook.com/herc'}
+
+    assert_equal(json_codec.get_backend().name, 'ujson')
+    assert_equal(json_codec.loads(json_codec.dumps(obj)), obj)
+    assert_equal(json_codec.loads(json_codec.dumps(obj, compact=True, sort_keys=True)), obj)
+    assert_equal(json_codec.dumps({'b': 1, 'a': 2}, sort_keys=True), '{"a":2,"b":1}')
+    assert_equal(json_codec.dumps({'url': 'http://facebook.com/herc'}), '{"url":"http://facebook.com/herc"}')
+    assert isinstance(json_codec.dumps(obj), str)
@@ -0,0 +1,128 @@
+"""Tests for the ``objects`` module."""
+
+import copy
+import json
+import threading
+
+from nose.tools import *
+from mock import patch
+
+from facepy import GraphAPI
+from facepy.objects import FieldTracker, GraphObject, template
+
+
+patch = patch('requests.session')
+
+
+def mock():
+    global mock_request
+
+    mock_request = patch.start()().request
+
+
+def unmock():
+    patch.stop()
+
+
+def test_template():
+    assert_equal(template('/499729129/posts?limit=25'), '{id}/posts')
+    assert_equal(template('499729129_1234/comments'), '{id}/comments')
+    assert_equal(template('me'), 'me')
+
+
+def test_graph_object_records_fields():
+    tracker = FieldTracker()
+
+    response = GraphObject({
+        'data': [
+            {'id': '1', 'message': 'Hi.', 'from': {'id': '2', 'name': 'Herc'}}
+        ],
+        'paging': {}
+    }, '{id}/posts', tracker)
+
+    for post in response['data']:
+        post['message']
+        post['from'].name
+        post.get('story')
+
+    assert_equal(tracker.report(), {'{id}/posts': ['from', 'from.name', 'message', 'story']})
+    assert_equal(tracker.fields('{id}/posts'), ['from', 'message', 'story'])
+    assert_equal(response['data'][0]['from'], {'id': '2', 'name': 'Herc'})
+
+
+@with_setup(mock, unmock)
+def test_get_with_automatic_tracker():
+    graph = GraphAPI('<access token>', tracker=FieldTracker(auto=True))
+
+    mock_request.return_value.content = json.dumps({
+        'id': '1',
+        'name': 'Thomas \'Herc\' Hauk',
+        'first_name': 'Thomas',
+        'last_name': 'Hauk'
+    })
+
+    user = graph.get('1')
+
+    assert isinstance(user, GraphObject)
+    assert_equal(user['first_name'], 'Thomas')
+    assert_equal(mock_request.call_args[1]['params'], {'access_token': '<access token>'})
+
+    graph.get('2')
+
+    assert_equal(mock_request.call_args[1]['params'], {'access_token': '<access token>', 'fields': 'id,first_name'})
+
+    graph.get('3', fields=['name'])
+
+    assert_equal(mock_request.call_args[1]['params'], {'access_token': '<access token>', 'fields': 'name'})
+
+
+@with_setup(mock, unmock)
+def test_get_with_automatic_tracker_ignores_attribute_probes():
+    graph = GraphAPI('<access token>', tracker=FieldTracker(auto=True))
+
+    mock_request.return_value.content = json.dumps({'id': '1', 'name': 'Thomas \'Herc\' Hauk'})
+
+    user = graph.get('1')
+
+    assert not hasattr(user, '__html__')
+    assert user.has_key('name')
+    assert_equal(copy.deepcopy(user), user)
+
+    graph.get('2')
+
+    assert_equal(mock_request.call_args[1]['params'], {'access_token': '<access token>'})
+
+    assert_equal(sorted(user.items()), [('id', '1'), ('name', 'Thomas \'Herc\' Hauk')])
+    assert_equal(sorted(user.values()), ['1', 'Thomas \'Herc\' Hauk'])
+    assert_equal(dict(user.iteritems()), user.to_dict())
+
+    graph.get('2')
+
+    assert_equal(mock_request.call_args[1]['params'], {'access_token': '<access token>', 'fields': 'id,name'})
+
+
+def test_tracker_is_thread_safe():
+    tracker = FieldTracker()
+    threads = []
+
+    class Field(str):
+        def split(self, *args):
+            # Record a field in another thread while the tracker's fields are being read.
+            thread = threading.Thread(target=tracker.record, args=('{id}/posts', 'other'))
+            thread.start()
+            thread.join(0.1)
+            threads.append(thread)
+
+            return str.split(self, *args)
+
+    for index in range(300):
+        tracker.record('{id}/posts', 'field%d' % index)
+
+    tracker.record('{id}/posts', Field('trigger'))
+
+    assert_equal(len(tracker.fields('{id}/posts')), 301)
+
+    for thread in threads:
+        thread.join()
+
+    assert 'other' in tracker.fields('{id}/posts')
@@ -0,0 +1,271 @@
+"""Tests for the ``publisher`` module."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import GraphAPI
+from facepy.exceptions import FacepyError, SpoolFullError
+from facepy.publisher import Publisher
+
+
+rename_patch = patch('os.rename')
+
+patch = patch('requests.session')
+
+
+def mock():
+    global mock_request, spool
+
+    mock_request = patch.start()().request
+    mock_request.side_effect = side_effect
+
+    spool = tempfile.mktemp()
+
+
+def unmock():
+    patch.stop()
+
+    if os.path.exists(spool):
+        os.remove(spool)
+
+
+def side_effect(method, url, data, files):
+    requests = json.loads(data['batch'])
+
+    return MagicMock(content=json.dumps([
+        {'code': 200, 'headers': [], 'body': '{"id": "1"}'} for request in requests
+    ]))
+
+
+@with_setup(mock, unmock)
+def test_publish():
+    publisher = Publisher(GraphAPI('<access token>'), spool)
+
+    publisher.publish('me/feed', message='Hi me.')
+    publisher.publish('herc/feed', message='Hi Herc.')
+
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    batches = [json.loads(call[1]['data']['batch']) for call in mock_request.call_args_list]
+    requests = [request for batch in batches for request in batch]
+
+    assert_equal(sorted(request['relative_url'] for request in requests), ['herc/feed', 'me/feed'])
+    assert_equal(open(spool).read(), '')
+
+
+@with_setup(mock, unmock)
+def test_publish_preserves_order_per_path():
+    publisher = Publisher(GraphAPI('<access token>'), spool)
+
+    for message in ['first', 'second', 'third']:
+        publisher.publish('me/feed', message=message)
+
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    batches = [json.loads(call[1]['data']['batch']) for call in mock_request.call_args_list]
+
+    assert_equal([len(batch) for batch in batches], [1, 1, 1])
+    assert_equal([batch[0]['body'] for batch in batches], ['message=first', 'message=second', 'message=third'])
+
+
+@with_setup(mock, unmock)
+def test_publish_recovers_spooled_items():
+    with open(spool, 'w') as file:
+        file.write(json.dumps({'seq': 1, 'path': 'me/feed', 'data': {'message': 'Published'}, 'attempts': 0}) + '\n')
+        file.write(json.dumps({'seq': 2, 'path': 'me/feed', 'data': {'message': 'Unpublished'}, 'attempts': 0}) + '\n')
+        file.write(json.dumps({'ack': 1}) + '\n')
+        file.write('{"seq": 3, "pa')
+
+    publisher = Publisher(GraphAPI('<access token>'), spool)
+
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    batches = [json.loads(call[1]['data']['batch']) for call in mock_request.call_args_list]
+
+    assert_equal(batches, [[{'method': 'POST', 'relative_url': 'me/feed', 'body': 'message=Unpublished'}]])
+
+
+@with_setup(mock, unmock)
+def test_publish_gives_up_on_failing_items():
+    mock_request.side_effect = None
+    mock_request.return_value.content = json.dumps([
+        {'code': 500, 'headers': [], 'body': '{"error_code": 1, "error_msg": "An unknown error occurred"}'}
+    ])
+
+    failures = []
+
+    publisher = Publisher(
+        GraphAPI('<access token>'),
+        spool,
+        interval=0,
+        retry=2,
+        on_failure=lambda path, data, exception: failures.append((path, data))
+    )
+
+    publisher.publish('me/feed', message='Hi me.')
+
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    assert_equal(len(mock_request.call_args_list), 3)
+    assert_equal(failures, [('me/feed', {'message': 'Hi me.'})])
+
+
+@with_setup(mock, unmock)
+def test_publish_with_full_spool():
+    publisher = Publisher(GraphAPI('<access token>'), spool, max_pending=0)
+
+    assert_raises(SpoolFullError, publisher.publish, 'me/feed', block=False, message='Hi me.')
+    assert_raises(SpoolFullError, publisher.publish, 'me/feed', timeout=0.01, message='Hi me.')
+
+    publisher.close()
+
+
+@with_setup(mock, unmock)
+def test_publish_survives_failing_on_failure():
+    mock_request.side_effect = None
+    mock_request.return_value.content = json.dumps([
+        {'code': 500, 'headers': [], 'body': '{"error_code": 1, "error_msg": "An unknown error occurred"}'}
+    ])
+
+    def on_failure(path, data, exception):
+        raise ValueError('Boom')
+
+    publisher = Publisher(GraphAPI('<access token>'), spool, interval=0, retry=0, on_failure=on_failure)
+
+    publisher.publish('me/feed', message='Hi me.')
+    assert publisher.flush(timeout=5)
+
+    mock_request.side_effect = side_effect
+
+    publisher.publish('me/feed', message='Hi again.')
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    assert_equal(publisher.errors, 1)
+    assert isinstance(publisher.error, ValueError)
+
+
+@with_setup(mock, unmock)
+def test_publish_raises_when_publisher_has_stopped():
+    publisher = Publisher(GraphAPI('<access token>'), spool, max_pending=1)
+    publisher._next_batch = MagicMock(side_effect=KeyError('Boom'))
+
+    publisher.publish('me/feed', message='Hi me.')
+
+    assert_raises(FacepyError, publisher.flush)
+    assert_raises(FacepyError, publisher.publish, 'me/feed', message='Hi again.')
+    assert isinstance(publisher.error, KeyError)
+
+
+@with_setup(mock, unmock)
+def test_publish_raises_when_publisher_has_stopped_with_room_in_the_spool():
+    publisher = Publisher(GraphAPI('<access token>'), spool)
+    publisher._next_batch = MagicMock(side_effect=KeyError('Boom'))
+
+    publisher.publish('me/feed', message='Hi me.')
+    publisher._thread.join(5)
+
+    assert_raises(FacepyError, publisher.publish, 'me/feed', message='Hi again.')
+    assert_equal(publisher.pending, 1)
+
+
+@with_setup(mock, unmock)
+def test_publish_survives_failing_compaction():
+    rename = os.rename
+    renames = []
+
+    def failing_rename(source, destination):
+        renames.append(source)
+
+        # Fail the first compaction, after the first item has been published.
+        if len(renames) == 1:
+            raise OSError('Disk is full')
+
+        rename(source, destination)
+
+    publisher = Publisher(GraphAPI('<access token>'), spool, compact=1)
+
+    rename_patch.start().side_effect = failing_rename
+
+    try:
+        publisher.publish('me/feed', message='Hi me.')
+        publisher.publish('me/feed', message='Hi again.')
+
+        assert publisher.flush(timeout=5)
+    finally:
+        rename_patch.stop()
+
+    publisher.close()
+
+    assert_equal(mock_request.call_count, 2)
+    assert_equal(publisher.errors, 1)
+    assert isinstance(publisher.error, OSError)
+    assert not [path for path in renames if os.path.exists(path)]
+
+
+@with_setup(mock, unmock)
+def test_publish_compacts_spool():
+    event = threading.Event()
+    published = []
+
+    def slow_side_effect(method, url, data, files):
+        event.wait(5)
+        published.append(data)
+        return side_effect(method, url, data, files)
+
+    mock_request.side_effect = slow_side_effect
+
+    publisher = Publisher(GraphAPI('<access token>'), spool, compact=3)
+
+    for i in range(10):
+        publisher.publish('%d/feed' % (i % 2), message='Hi %d.' % i)
+
+    event.set()
+
+    lines = []
+
+    # The spool never holds more than the items and the acknowledgements of a few batches, rather than
+    # an acknowledgement for every item.
+    while publisher.pending:
+        lines.append(len(open(spool).readlines()))
+        time.sleep(0.001)
+
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    assert max(lines) <= 10 + 3 + 1
+    assert_equal(open(spool).read(), '')
+
+
+@with_setup(mock, unmock)
+def test_publish_with_spool_over_max_bytes():
+    event = threading.Event()
+
+    def slow_side_effect(method, url, data, files):
+        event.wait(5)
+        return side_effect(method, url, data, files)
+
+    mock_request.side_effect = slow_side_effect
+
+    publisher = Publisher(GraphAPI('<access token>'), spool, max_bytes=100)
+
+    publisher.publish('me/feed', message='x' * 100)
+
+    assert_raises(SpoolFullError, publisher.publish, 'me/feed', block=False, message='Hi me.')
+
+    event.set()
+
+    publisher.publish('me/feed', timeout=5, message='Hi me.')
+
+    assert publisher.flush(timeout=5)
+    publisher.close()
@@ -0,0 +1,157 @@
+"""Tests for the ``realtime`` module."""
+
+import hashlib
+import hmac
+import json
+import threading
+
+from StringIO import StringIO
+
+from nose.tools import *
+
+from facepy.realtime import Receiver
+
+
+TEST_APPLICATION_SECRET_KEY = '214e4cb484c28c35f18a70a3d735999b'
+
+TEST_UPDATE = {
+    'object': 'user',
+    'entry': [
+        {'uid': '1', 'id': '1', 'time': 1306179904, 'changed_fields': ['feed']},
+        {'uid': '2', 'id': '2', 'time': 1306179905, 'changed_fields': ['friends']}
+    ]
+}
+
+
+def request(receiver, method='POST', query='', body='', signature=None):
+    response = {}
+
+    def start_response(status, headers):
+        response['status'], response['headers'] = status, dict(headers)
+
+    environ = {
+        'REQUEST_METHOD': method,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': StringIO(body)
+    }
+
+    if signature is not None:
+        environ['HTTP_X_HUB_SIGNATURE'] = signature
+
+    response['body'] = ''.join(receiver(environ, start_response))
+
+    return response
+
+
+def sign(body, key=TEST_APPLICATION_SECRET_KEY):
+    return 'sha1=%s' % hmac.new(key, body, hashlib.sha1).hexdigest()
+
+
+def test_challenge():
+    receiver = Receiver(TEST_APPLICATION_SECRET_KEY, 'token')
+
+    response = request(receiver, 'GET', 'hub.mode=subscribe&hub.challenge=1234&hub.verify_token=token')
+
+    assert_equal(response['status'], '200 OK')
+    assert_equal(response['body'], '1234')
+
+    response = request(receiver, 'GET', 'hub.mode=subscribe&hub.challenge=1234&hub.verify_token=wrong')
+
+    assert_equal(response['status'], '403 Forbidden')
+    assert_equal(response['body'], '')
+
+
+def test_receive():
+    receiver = Receiver(TEST_APPLICATION_SECRET_KEY, 'token')
+    received = []
+
+    @receiver.handler('user')
+    def on_user(object, entry):
+        received.append((object, entry['uid']))
+
+    receiver.register('page', lambda object, entry: received.append((object, entry['id'])))
+
+    body = json.dumps(TEST_UPDATE)
+
+    response = request(receiver, body=body, signature=sign(body))
+
+    assert_equal(response['status'], '200 OK')
+    assert_equal(received, [('user', '1'), ('user', '2')])
+    assert_equal(receiver.received, 1)
+
+
+def test_receive_with_invalid_signature():
+    receiver = Receiver(TEST_APPLICATION_SECRET_KEY, 'token')
+    received = []
+
+    receiver.register('*', lambda object, entry: received.append(entry))
+
+    body = json.dumps(TEST_UPDATE)
+
+    for signature in [None, 'sha1=', 'sha1=zz', sign(body, 'wrong'), sign(body)[:-2]]:
+        assert_equal(request(receiver, body=body, signature=signature)['status'], '403 Forbidden')
+
+    assert_equal(received, [])
+    assert_equal(receiver.rejected, 5)
+
+
+def test_receive_with_corrupt_body():
+    receiver = Receiver(TEST_APPLICATION_SECRET_KEY, 'token')
+
+    response = request(receiver, body='{"object":', signature=sign('{"object":'))
+
+    assert_equal(response['status'], '400 Bad Request')
+
+
+def test_receive_with_unsupported_method():
+    receiver = Receiver(TEST_APPLICATION_SECRET_KEY, 'token')
+
+    response = request(receiver, 'PUT')
+
+    assert_equal(response['status'], '405 Method Not Allowed')
+    assert_equal(response['headers']['Allow'], 'GET, POST')
+
+
+def test_receive_in_workers():
+    errors = []
+    received = []
+
+    receiver = Receiver(
+        TEST_APPLICATION_SECRET_KEY, 'token', workers=2,
+        on_error=lambda object, entry, exception: errors.append((entry['uid'], exception))
+    )
+
+    @receiver.handler('*')
+    def on_update(object, entry):
+        if entry['uid'] == '2':
+            raise ValueError('Boom')
+
+        received.append(entry['uid'])
+
+    body = json.dumps(TEST_UPDATE)
+
+    for i in range(3):
+        assert_equal(request(receiver, body=body, signature=sign(body))['status'], '200 OK')
+
+    receiver.close(timeout=5)
+
+    assert_equal(received, ['1', '1', '1'])
+    assert_equal(len(errors), 3)
+    assert_equal(receiver.errors, 3)
+
+
+def test_receive_when_workers_are_busy():
+    event = threading.Event()
+
+    receiver = Receiver(TEST_APPLICATION_SECRET_KEY, 'token', workers=1, max_pending=1)
+    receiver.register('user', lambda object, entry: event.wait(5))
+
+    body = json.dumps(TEST_UPDATE)
+
+    statuses = [request(receiver, body=body, signature=sign(body))['status'] for i in range(4)]
+
+    event.set()
+    receiver.close(timeout=5)
+
+    assert_equal(statuses[-1], '503 Service Unavailable')
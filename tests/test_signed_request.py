@@ -1,10 +1,17 @@
 """Tests for the ``signed_request`` module."""
 
+import hashlib
+import hmac
+import pickle
+import time
 
 from datetime import datetime, timedelta
+from multiprocessing.pool import ThreadPool
 from nose.tools import *
 
 from facepy import SignedRequest
+from facepy.signed_request import HMACKey, LazySignedRequest, SignedRequestCache, SignedRequestFactory, SignedRequestVerifier
+from facepy.signed_request import _imap
 
 
 TEST_ACCESS_TOKEN = '181259711925270|1570a553ad6605705d1b7a5f.1-499729129|8XqMRhCWDKtpG-i_zRkHBDSsqqk'
@@ -168,3 +175,220 @@ def test_parse_signed_request_incorrect_signature():
         signed_request=u"%s.%s" % (encoded_signature, encoded_payload),
         application_secret_key=TEST_FACEBOOK_APPLICATION_SECRET_KEY
     )
+
+
+def test_verifier_parse():
+    verifier = SignedRequestVerifier(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    assert_equal(verifier.parse(TEST_SIGNED_REQUEST), SignedRequest.parse(TEST_SIGNED_REQUEST, TEST_FACEBOOK_APPLICATION_SECRET_KEY))
+    assert_raises(SignedRequest.Error, verifier.parse, '<invalid signed request>')
+    assert_raises(SignedRequest.Error, verifier.parse, TEST_SIGNED_REQUEST__UNKNOWN_ALGORITHM)
+
+    verifier = SignedRequestVerifier('<wrong application secret key>')
+
+    assert_raises(SignedRequest.Error, verifier.parse, TEST_SIGNED_REQUEST)
+
+
+def test_verifier_parse_many():
+    signed_requests = [TEST_SIGNED_REQUEST, '<invalid signed request>'] * 5
+
+    for processes in [None, 2]:
+        verifier = SignedRequestVerifier(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+        results = list(verifier.parse_many(signed_requests, processes=processes, chunksize=2))
+
+        assert_equal(len(results), 10)
+        assert_equal(results[0]['user_id'], '499729129')
+        assert isinstance(results[1], SignedRequest.Error)
+        assert_equal(verifier.verified, 10)
+        assert verifier.rate > 0
+
+
+def test_verifier_parse_many_reads_signed_requests_as_they_are_needed():
+    verifier = SignedRequestVerifier(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+    read = []
+
+    def signed_requests():
+        while True:
+            read.append(1)
+            yield TEST_SIGNED_REQUEST
+
+    results = verifier.parse_many(signed_requests(), processes=2, chunksize=10)
+
+    try:
+        assert_equal(next(results)['user_id'], '499729129')
+
+        # No more than a window of four chunks is read ahead.
+        assert len(read) <= 10 * 4
+    finally:
+        results.close()
+
+
+def test_hmac_key():
+    key = HMACKey('<key>', hashlib.sha1)
+
+    assert_equal(key.hexdigest('<message>'), hmac.new('<key>', '<message>', hashlib.sha1).hexdigest())
+    assert key.verify('<message>', hmac.new('<key>', '<message>', hashlib.sha1).digest())
+    assert not key.verify('<message>', '<signature>')
+
+
+def test_verifier_with_cache():
+    cache = SignedRequestCache(size=2)
+    verifier = SignedRequestVerifier(TEST_FACEBOOK_APPLICATION_SECRET_KEY, cache=cache)
+
+    first = verifier.parse(TEST_SIGNED_REQUEST)
+    second = verifier.parse(TEST_SIGNED_REQUEST)
+
+    assert second is first
+    assert_equal((cache.hits, cache.misses), (1, 1))
+
+    assert_raises(SignedRequest.Error, verifier.parse, '<invalid signed request>')
+    assert_raises(SignedRequest.Error, verifier.parse, '<invalid signed request>')
+
+    assert_equal(len(cache), 1)
+
+
+def test_signed_request_cache_evicts_least_recently_used():
+    cache = SignedRequestCache(size=2)
+
+    cache.set('a', {'user_id': 'a'})
+    cache.set('b', {'user_id': 'b'})
+    cache.get('a')
+    cache.set('c', {'user_id': 'c'})
+
+    assert_equal(cache.get('a'), {'user_id': 'a'})
+    assert_equal(cache.get('b'), None)
+    assert_equal(cache.get('c'), {'user_id': 'c'})
+
+
+def test_signed_request_cache_expires_signed_requests():
+    now = int(time.time())
+    cache = SignedRequestCache(max_age=60)
+
+    cache.set('expired', {'issued_at': now - 120})
+    cache.set('expiring', {'issued_at': now, 'expires': now - 1})
+    cache.set('fresh', {'issued_at': now, 'expires': 0})
+
+    assert_equal(cache.get('expired'), None)
+    assert_equal(cache.get('expiring'), None)
+    assert_equal(cache.get('fresh'), {'issued_at': now, 'expires': 0})
+
+
+def test_lazy_signed_request():
+    eager = SignedRequest(TEST_SIGNED_REQUEST, TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+    signed_request = LazySignedRequest(TEST_SIGNED_REQUEST, TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    assert 'user' not in signed_request.__dict__
+
+    assert_equal(signed_request.user.id, '499729129')
+    assert signed_request.user is signed_request.user
+    assert_equal(signed_request.user.locale, 'en_US')
+    assert_equal(list(signed_request.user.age), eager.user.age)
+    assert_equal(signed_request.user.oauth_token.token, TEST_ACCESS_TOKEN)
+    assert_equal(signed_request.user.oauth_token.issued_at, eager.user.oauth_token.issued_at)
+    assert_equal(signed_request.user.oauth_token.expires_at, None)
+    assert_equal(signed_request.user.oauth_token.has_expired, False)
+    assert_equal(signed_request.page, None)
+    assert_equal(signed_request.data, None)
+
+    assert_equal(
+        SignedRequest.parse(signed_request.generate(), TEST_FACEBOOK_APPLICATION_SECRET_KEY),
+        SignedRequest.parse(eager.generate(), TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+    )
+
+
+def test_lazy_signed_request_with_verifier():
+    verifier = SignedRequestVerifier(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    signed_request = LazySignedRequest(TEST_SIGNED_REQUEST, verifier=verifier)
+
+    assert_equal(signed_request.application_secret_key, TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+    assert_equal(signed_request.user.id, '499729129')
+
+
+def test_signed_request_objects_can_be_pickled():
+    signed_request = LazySignedRequest(TEST_SIGNED_REQUEST, TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    for protocol in [0, 2]:
+        user = pickle.loads(pickle.dumps(signed_request.user, protocol))
+
+        assert_equal(user.id, '499729129')
+        assert_equal(user.oauth_token.issued_at, signed_request.user.oauth_token.issued_at)
+
+        page = pickle.loads(pickle.dumps(SignedRequest.Page(id=1, is_liked=True), protocol))
+
+        assert_equal((page.id, page.is_liked, page.is_admin), (1, True, False))
+
+
+def test_signed_request_factory_generate():
+    factory = SignedRequestFactory(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    signed_request = factory.generate({'user_id': '499729129', 'user': {'locale': 'en_US'}})
+
+    assert '=' not in signed_request
+
+    assert_equal(
+        SignedRequest.parse(signed_request, TEST_FACEBOOK_APPLICATION_SECRET_KEY),
+        {'algorithm': 'HMAC-SHA256', 'user_id': '499729129', 'user': {'locale': 'en_US'}}
+    )
+
+    assert_equal(
+        SignedRequest(signed_request, TEST_FACEBOOK_APPLICATION_SECRET_KEY).user.locale,
+        'en_US'
+    )
+
+
+def test_signed_request_factory_payloads():
+    factory = SignedRequestFactory(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    template = {'user': {'country': 'no'}, 'expires': 0}
+
+    payloads = list(factory.payloads(4, template, {
+        'user_id': xrange(100, 200),
+        'user.locale': ['en_US', 'nb_NO'],
+        'issued_at': lambda n: 1306179904 + n
+    }))
+
+    assert_equal(len(payloads), 4)
+    assert_equal([payload['user_id'] for payload in payloads], [100, 101, 102, 103])
+    assert_equal([payload['user']['locale'] for payload in payloads], ['en_US', 'nb_NO', 'en_US', 'nb_NO'])
+    assert_equal(payloads[3]['issued_at'], 1306179907)
+    assert_equal(payloads[3]['user']['country'], 'no')
+    assert_equal(template, {'user': {'country': 'no'}, 'expires': 0})
+
+
+def test_signed_request_factory_generate_many():
+    factory = SignedRequestFactory(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+    verifier = SignedRequestVerifier(TEST_FACEBOOK_APPLICATION_SECRET_KEY)
+
+    parameters = {'user_id': xrange(0, 1000)}
+
+    signed_requests = list(factory.generate_many(25, parameters=parameters, chunksize=10))
+
+    assert_equal(factory.generated, 25)
+    assert_equal([verifier.parse(signed_request)['user_id'] for signed_request in signed_requests], range(25))
+
+    assert_equal(
+        list(factory.generate_many(25, parameters=parameters, processes=2, chunksize=10)),
+        signed_requests
+    )
+
+
+def test_imap_keeps_a_bounded_number_of_calls_in_flight():
+    pool = ThreadPool(2)
+    submitted = []
+
+    def arguments():
+        for argument in xrange(1000):
+            submitted.append(argument)
+            yield argument
+
+    try:
+        results = _imap(pool, lambda argument: argument * 2, arguments(), 4)
+
+        assert_equal([next(results) for i in range(3)], [0, 2, 4])
+        assert len(submitted) <= 4 + 3
+
+        assert_equal(list(results), [argument * 2 for argument in range(3, 1000)])
+    finally:
+        pool.terminate()
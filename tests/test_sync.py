@@ -0,0 +1,132 @@
+"""Tests for the ``sync`` module."""
+
+import json
+import os
+import tempfile
+
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import GraphAPI
+from facepy.stores import FileStore
+from facepy.sync import Sync, parse_timestamp
+
+
+patch = patch('requests.session')
+
+
+def mock():
+    global mock_request
+
+    mock_request = patch.start()().request
+
+
+def unmock():
+    patch.stop()
+
+
+def post(id, time):
+    return {'id': str(id), 'created_time': '2012-05-12T10:%02d:00+0000' % time}
+
+
+@with_setup(mock, unmock)
+def test_sync():
+    graph = GraphAPI('<access token>')
+    sync = Sync(graph, limit=2)
+
+    posts = [post(3, 30), post(2, 20), post(1, 10)]
+    requests = []
+
+    def side_effect(method, url, params, allow_redirects):
+        requests.append(dict(params))
+
+        since = params.get('since')
+        data = [item for item in posts if since is None or parse_timestamp(item['created_time']) >= since]
+
+        return MagicMock(content=json.dumps({'data': data}))
+
+    mock_request.side_effect = side_effect
+
+    items = []
+
+    assert_equal(sync.sync('herc', 'feed', items.append), 3)
+    assert_equal([item['id'] for item in items], ['3', '2', '1'])
+    assert_equal(sync.watermark('herc', 'feed'), parse_timestamp(posts[0]['created_time']))
+
+    posts.insert(0, post(4, 40))
+    items = []
+
+    assert_equal(sync.sync('herc', 'feed', items.append), 1)
+    assert_equal([item['id'] for item in items], ['4'])
+    assert_equal(requests[-1]['since'], parse_timestamp(posts[1]['created_time']))
+
+    assert_equal(sync.sync('herc', 'feed', items.append), 0)
+
+
+@with_setup(mock, unmock)
+def test_sync_does_not_advance_watermark_on_failure():
+    graph = GraphAPI('<access token>')
+    sync = Sync(graph)
+
+    mock_request.return_value.content = json.dumps({'data': [post(2, 20), post(1, 10)]})
+
+    def handler(item):
+        if item['id'] == '1':
+            raise ValueError
+
+    assert_raises(ValueError, sync.sync, 'herc', 'feed', handler)
+    assert_equal(sync.watermark('herc', 'feed'), None)
+
+
+def test_file_store():
+    path = tempfile.mktemp()
+
+    try:
+        store = FileStore(path)
+
+        assert_equal(store.get('key'), None)
+
+        store.set('key', 1)
+        store.set('other', 2)
+        store.delete('other')
+
+        assert_equal(FileStore(path).get('key'), 1)
+        assert_equal(FileStore(path).get('other'), None)
+    finally:
+        os.remove(path)
+
+
+def test_parse_timestamp():
+    assert_equal(parse_timestamp('1970-01-01T00:00:10+0000'), 10)
+    assert_equal(parse_timestamp('1970-01-01T01:00:10+0100'), 10)
+    assert_equal(parse_timestamp(10), 10)
+    assert_equal(parse_timestamp('<invalid>'), None)
+    assert_equal(parse_timestamp(None), None)
+
+
+@with_setup(mock, unmock)
+def test_sync_handles_items_created_in_the_same_second_as_the_watermark():
+    graph = GraphAPI('<access token>')
+    sync = Sync(graph)
+
+    posts = [post(2, 20), post(1, 10)]
+
+    def side_effect(method, url, params, allow_redirects):
+        since = params.get('since')
+        data = [item for item in posts if since is None or parse_timestamp(item['created_time']) >= since]
+
+        return MagicMock(content=json.dumps({'data': data}))
+
+    mock_request.side_effect = side_effect
+
+    items = []
+
+    assert_equal(sync.sync('herc', 'feed', items.append), 2)
+
+    # Another post is created in the same second as the newest post, after the sync.
+    posts.insert(0, post(3, 20))
+
+    assert_equal(sync.sync('herc', 'feed', items.append), 1)
+    assert_equal(sync.sync('herc', 'feed', items.append), 0)
+    assert_equal([item['id'] for item in items], ['2', '1', '3'])
+    assert_equal(sync.watermark('herc', 'feed'), parse_timestamp(posts[0]['created_time']))
@@ -1,7 +1,12 @@
 """Tests for the ``test`` module."""
 
+import itertools
+import json
+
+from urlparse import parse_qs
+
 from nose.tools import *
-from mock import patch, DEFAULT
+from mock import patch, DEFAULT, MagicMock
 
 from facepy.test import *
 
@@ -78,3 +83,158 @@ def test_delete_user(delete):
     user.delete()
 
     delete.assert_called_with('<id>')
+
+
+def test_user_pool():
+    """Test creating, lending and deleting test users in batches."""
+    created = []
+    deleted = []
+    ids = itertools.count(2)
+
+    def side_effect(method, url, **kwargs):
+        if method == 'GET':
+            return MagicMock(content=json.dumps({
+                'data': [{'id': '1', 'access_token': '<access token 1>', 'login_url': '<login url 1>'}]
+            }))
+
+        responses = []
+
+        for request in json.loads(kwargs['data']['batch']):
+            if request['method'] == 'POST':
+                id = str(next(ids))
+                created.append(parse_qs(request['body']))
+
+                body = {
+                    'id': id,
+                    'access_token': '<access token %s>' % id,
+                    'login_url': '<login url %s>' % id,
+                    'email': '<email %s>' % id,
+                    'password': '<password %s>' % id
+                }
+            else:
+                deleted.append(request['relative_url'])
+                body = True
+
+            responses.append({'code': 200, 'headers': [], 'body': json.dumps(body)})
+
+        return MagicMock(content=json.dumps(responses))
+
+    with patch('requests.session') as session:
+        request = session.return_value.request
+        request.side_effect = side_effect
+
+        reset = MagicMock()
+
+        pool = TestUserPool('<application id>', '<access token>', reset=reset, batch_size=2, permissions=['read_stream', 'email'])
+        pool.fill(5)
+
+        assert_equal(len(pool.available), 5)
+        assert_equal(len(created), 4)
+        assert_equal(created[0]['permissions'], ['read_stream,email'])
+
+        # One request to list existing users and two batch requests to create the rest.
+        assert_equal(request.call_count, 3)
+
+        with pool.leased() as user:
+            assert user.graph.session is pool.graph.session
+            assert_equal(len(pool.available), 4)
+
+        reset.assert_called_with(user)
+        assert_equal(len(pool.available), 5)
+
+        users = [pool.lease() for i in range(6)]
+
+        assert_equal(len(set(user.id for user in users)), 6)
+        assert_equal(len(created), 5)
+
+        for user in users:
+            pool.release(user)
+
+        report = pool.delete()
+
+        assert_equal(sorted(deleted), ['1', '2', '3', '4', '5', '6'])
+        assert_equal(len(report.succeeded), 6)
+        assert_equal(pool.users, [])
+
+
+def test_make_friends():
+    """Test making test users friends in batches."""
+    requests = []
+
+    def side_effect(method, url, data, files):
+        responses = []
+
+        for request in json.loads(data['batch']):
+            requests.append((request['relative_url'], parse_qs(request['body'])['access_token'][0]))
+
+            if request['relative_url'] == '4/friends/1':
+                body = {'error': {'type': 'OAuthException', 'message': 'No'}}
+            else:
+                body = True
+
+            responses.append({'code': 200, 'headers': [], 'body': json.dumps(body)})
+
+        return MagicMock(content=json.dumps(responses))
+
+    with patch('requests.session') as session:
+        session.return_value.request.side_effect = side_effect
+
+        users = [
+            User(str(id), '<access token %s>' % id, '<login url %s>' % id) for id in range(1, 5)
+        ]
+
+        progress = []
+
+        report = make_friends(users, batch_size=4, retry=0, progress=lambda done, total: progress.append((done, total)))
+
+        assert_equal(len(requests), 12)
+        assert ('1/friends/2', '<access token 1>') in requests
+        assert ('2/friends/1', '<access token 2>') in requests
+        assert_equal(len(report.succeeded), 5)
+        assert_equal(report.failed[0][0], (users[0], users[3]))
+        assert_equal(progress[-1], (12, 12))
+
+        # Requests are only confirmed once they have all been sent.
+        assert all('/friends/' in url and int(url.split('/')[0]) < int(url.split('/')[2]) for url, token in requests[:6])
+
+        del requests[:]
+
+        report = make_friends(users, edges=star_graph, retry=0)
+
+        assert_equal(sorted(url for url, token in requests[:3]), ['1/friends/2', '1/friends/3', '1/friends/4'])
+
+        del requests[:]
+
+        make_friends(users, edges=[(0, 1)], retry=0)
+
+        assert_equal(requests, [('1/friends/2', '<access token 1>'), ('2/friends/1', '<access token 2>')])
+
+        del requests[:]
+
+        # An empty list of edges makes no friends, rather than every user friends with every other.
+        report = make_friends(users, edges=[], retry=0)
+
+        assert_equal(requests, [])
+        assert_equal(report.succeeded, [])
+
+        # Friend requests that fail aren't confirmed, and progress still reaches the total.
+        del progress[:]
+
+        report = make_friends(
+            users, edges=[(3, 0), (1, 2)], retry=0, progress=lambda done, total: progress.append((done, total))
+        )
+
+        assert_equal(len(requests), 3)
+        assert_equal(len(report.failed), 1)
+        assert_equal(progress[-1], (3, 3))
+
+
+def test_random_graph():
+    """Test generating random friend graphs."""
+    users = range(20)
+
+    edges = random_graph(0.5, seed=1)(users)
+
+    assert 0 < len(edges) < 190
+    assert_equal(edges, random_graph(0.5, seed=1)(users))
+    assert_equal(len(random_graph(1)(users)), len(complete_graph(users)))
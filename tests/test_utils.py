@@ -1,10 +1,17 @@
 """Tests for the ``utils`` module."""
 
+import json
+import threading
+import time
+
 from datetime import datetime
+from urlparse import parse_qs
 from nose.tools import *
-from mock import patch
+from mock import patch, MagicMock
 
 from facepy import *
+from facepy.stores import MemoryStore
+from facepy.utils import AccessTokenDebugger, AccessTokenManager
 
 
 patch = patch('requests.session')
@@ -76,3 +83,202 @@ def test_get_application_access_token_raises_error():
         '<application id>',
         '<application secret key>'
     )
+
+
+@with_setup(mock, unmock)
+def test_access_token_manager_caches_application_access_token():
+    mock_request.return_value.content = 'access_token=<application access token>'
+
+    manager = AccessTokenManager('<application id>', '<application secret key>')
+
+    assert_equal(manager.get_application_access_token(), '<application access token>')
+    assert_equal(manager.get_application_access_token(), '<application access token>')
+    assert_equal(mock_request.call_count, 1)
+
+    manager.invalidate()
+
+    manager.get_application_access_token()
+    assert_equal(mock_request.call_count, 2)
+
+
+@with_setup(mock, unmock)
+def test_access_token_manager_caches_extended_access_token_until_it_expires():
+    store = MemoryStore()
+    manager = AccessTokenManager('<application id>', '<application secret key>', store=store, margin=600)
+
+    mock_request.return_value.content = 'access_token=<extended access token>&expires=5183994'
+
+    access_token, expires_at = manager.get_extended_access_token('<access token>')
+
+    assert_equal(access_token, '<extended access token>')
+    assert isinstance(expires_at, datetime)
+    assert_equal(manager.get_extended_access_token('<access token>')[0], '<extended access token>')
+    assert_equal(mock_request.call_count, 1)
+
+    # Access tokens aren't used as keys as they are.
+    assert '<access token>' not in str(store.values.keys())
+
+    # Tokens are exchanged again when they are about to expire, extending the extended access token.
+    mock_request.return_value.content = 'access_token=<new extended access token>&expires=5183994'
+
+    for key, value in store.values.items():
+        value['expires_at'] = time.time() + 300
+
+    assert_equal(manager.get_extended_access_token('<access token>')[0], '<new extended access token>')
+    assert_equal(mock_request.call_args[1]['params']['fb_exchange_token'], '<extended access token>')
+    assert_equal(manager.exchanges, 2)
+
+
+@with_setup(mock, unmock)
+def test_access_token_manager_exchanges_once_for_concurrent_callers():
+    def side_effect(*args, **kwargs):
+        time.sleep(0.1)
+        return MagicMock(content='access_token=<extended access token>&expires=5183994')
+
+    mock_request.side_effect = side_effect
+
+    manager = AccessTokenManager('<application id>', '<application secret key>')
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.get_extended_access_token('<access token>')[0]))
+        for i in range(8)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert_equal(results, ['<extended access token>'] * 8)
+    assert_equal(mock_request.call_count, 1)
+
+
+@with_setup(mock, unmock)
+def test_access_token_manager_refreshes_in_the_background():
+    mock_request.return_value.content = 'access_token=<extended access token>&expires=60'
+
+    store = MemoryStore()
+    manager = AccessTokenManager('<application id>', '<application secret key>', store=store, margin=10)
+    manager.get_extended_access_token('<access token>')
+
+    assert_equal(manager.refresh(), 0)
+    assert_equal(manager.refresh(margin=120), 1)
+
+    manager.start(interval=0.01)
+
+    try:
+        time.sleep(0.1)
+        assert_equal(manager.exchanges, 2)
+
+        # The token is refreshed once it is about to expire.
+        for key, value in store.values.items():
+            value['expires_at'] = time.time() + 5
+
+        deadline = time.time() + 5
+
+        while manager.exchanges < 3 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop()
+
+    assert_equal(manager.exchanges, 3)
+
+
+@with_setup(mock, unmock)
+def test_access_token_manager_forgets_invalidated_and_idle_tokens():
+    mock_request.return_value.content = 'access_token=<extended access token>&expires=60'
+
+    manager = AccessTokenManager('<application id>', '<application secret key>', margin=10, idle=3600)
+    manager.get_extended_access_token('<access token>')
+    manager.invalidate('<access token>')
+
+    assert_equal(manager.refresh(margin=120), 0)
+
+    manager.get_extended_access_token('<access token>')
+    manager.idle = 0
+    time.sleep(0.01)
+
+    assert_equal(manager.refresh(margin=120), 0)
+    assert_equal(manager._exchanges, {})
+    assert_equal(manager.exchanges, 2)
+
+
+@with_setup(mock, unmock)
+def test_access_token_debugger():
+    expires_at = int(time.time()) + 3600
+    inspected = []
+
+    def side_effect(method, url, data, files):
+        responses = []
+
+        for request in json.loads(data['batch']):
+            access_token = parse_qs(request['relative_url'].split('?', 1)[1])['input_token'][0]
+            inspected.append(access_token)
+
+            if access_token == '<revoked access token>':
+                body = {'data': {'app_id': '1', 'is_valid': False, 'error': {'code': 190, 'message': 'Revoked'}}}
+            else:
+                body = {'data': {
+                    'app_id': '1',
+                    'user_id': access_token.strip('<>'),
+                    'is_valid': True,
+                    'expires_at': expires_at,
+                    'scopes': ['email', 'read_stream']
+                }}
+
+            responses.append({'code': 200, 'headers': [], 'body': json.dumps(body)})
+
+        return MagicMock(content=json.dumps(responses))
+
+    mock_request.side_effect = side_effect
+
+    debugger = AccessTokenDebugger(GraphAPI('<application access token>'))
+
+    access_tokens = ['<%d>' % i for i in range(120)] + ['<revoked access token>', '<1>']
+
+    results = debugger.debug(access_tokens, batch_size=50, workers=2)
+
+    assert_equal(len(results), 121)
+    assert_equal(len(inspected), 121)
+    assert_equal(mock_request.call_count, 3)
+
+    assert results['<7>'].is_valid
+    assert_equal(results['<7>'].user_id, '7')
+    assert_equal(results['<7>'].scopes, ['email', 'read_stream'])
+    assert_equal(results['<7>'].expires_at, datetime.fromtimestamp(expires_at))
+    assert not results['<7>'].has_expired
+
+    assert not results['<revoked access token>'].is_valid
+    assert_equal(results['<revoked access token>'].error['code'], 190)
+    assert_equal(results['<revoked access token>'].expires_at, None)
+
+    # Inspections are remembered until access tokens expire.
+    results = debugger.debug(['<7>', '<200>'])
+
+    assert_equal(inspected[121:], ['<200>'])
+    assert_equal(results['<7>'].user_id, '7')
+
+
+@with_setup(mock, unmock)
+def test_access_token_debugger_does_not_remember_incomplete_inspections():
+    responses = [[None, {'code': 200, 'headers': [], 'body': '{"data": {}}'}]]
+
+    mock_request.side_effect = lambda method, url, data, files: MagicMock(content=json.dumps(responses[-1]))
+
+    debugger = AccessTokenDebugger(GraphAPI('<application access token>'))
+
+    results = debugger.debug(['<1>', '<2>'], retry=0)
+
+    assert isinstance(results['<1>'], GraphAPI.FacebookError)
+    assert isinstance(results['<2>'], GraphAPI.FacebookError)
+
+    responses.append([
+        {'code': 200, 'headers': [], 'body': '{"data": {"app_id": "1", "is_valid": true}}'} for i in range(2)
+    ])
+
+    results = debugger.debug(['<1>', '<2>'], retry=0)
+
+    assert results['<1>'].is_valid
+    assert results['<2>'].is_valid
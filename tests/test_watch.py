@@ -0,0 +1,112 @@
+"""Tests for the ``watch`` module."""
+
+import json
+
+from nose.tools import *
+from mock import patch, MagicMock
+
+from facepy import GraphAPI
+from facepy.watch import Watcher
+
+
+sleep_patch = patch('time.sleep')
+patch = patch('requests.session')
+
+
+def mock():
+    global mock_request
+
+    mock_request = patch.start()().request
+
+
+def unmock():
+    patch.stop()
+
+
+def respond(responses):
+    """Respond with the given responses in order, like a server that supports ETags."""
+    responses = iter(responses)
+
+    def side_effect(method, url, params, headers, allow_redirects):
+        response = next(responses)
+
+        if response is None:
+            return MagicMock(status_code=304, headers={}, content='')
+
+        return MagicMock(
+            status_code=200,
+            headers={'etag': '"%d"' % len(response)},
+            content=json.dumps(response)
+        )
+
+    mock_request.side_effect = side_effect
+
+
+@with_setup(mock, unmock)
+def test_poll():
+    graph = GraphAPI('<access token>')
+    watcher = Watcher(graph, ['me/feed'], fields='id,message')
+
+    respond([
+        {'data': [{'id': '1', 'message': 'foo'}, {'id': '2', 'message': 'bar'}], 'paging': {'next': 'a'}},
+        None,
+        {'data': [{'id': '1', 'message': 'foo'}, {'id': '2', 'message': 'bar'}], 'paging': {'next': 'b'}},
+        {'data': [{'id': '3', 'message': 'baz'}, {'id': '1', 'message': 'FOO'}], 'paging': {'next': 'c'}}
+    ])
+
+    changes = watcher.poll('me/feed')
+
+    assert_equal(len(changes.added), 2)
+    assert_equal(mock_request.call_args[1]['headers'], {})
+    assert_equal(mock_request.call_args[1]['params'], {'fields': 'id,message', 'access_token': '<access token>'})
+
+    changes = watcher.poll('me/feed')
+
+    assert not changes
+    assert_equal(mock_request.call_args[1]['headers'], {'If-None-Match': '"2"'})
+    assert_equal(watcher.unmodified, 1)
+
+    # Responses that only differ in their pagination cursors are unchanged.
+    assert not watcher.poll('me/feed')
+    assert_equal(watcher.unchanged, 1)
+
+    changes = watcher.poll('me/feed')
+
+    assert_equal(changes.added, [{'id': '3', 'message': 'baz'}])
+    assert_equal(changes.removed, [{'id': '2', 'message': 'bar'}])
+    assert_equal(changes.changed, [({'id': '1', 'message': 'foo'}, {'id': '1', 'message': 'FOO'})])
+    assert_equal(watcher.polls, 4)
+
+
+@with_setup(mock, unmock)
+def test_poll_object():
+    graph = GraphAPI('<access token>')
+    watcher = Watcher(graph, ['me'])
+
+    respond([{'id': '1', 'name': 'Herc'}, {'id': '1', 'name': 'Hercules'}])
+
+    assert_equal(watcher.poll('me').added, [{'id': '1', 'name': 'Herc'}])
+    assert_equal(watcher.poll('me').changed, [({'id': '1', 'name': 'Herc'}, {'id': '1', 'name': 'Hercules'})])
+
+
+@with_setup(mock, unmock)
+def test_watch():
+    graph = GraphAPI('<access token>')
+
+    respond([
+        {'data': [{'id': '1'}]},
+        {'data': [{'id': '2'}]},
+        None,
+        {'data': [{'id': '2'}, {'id': '3'}]}
+    ])
+
+    with sleep_patch as sleep:
+        changes = list(graph.watch(['1/feed', '2/feed'], interval=10, rounds=2))
+
+    assert_equal([(change.path, len(change.added)) for change in changes], [
+        ('1/feed', 1), ('2/feed', 1), ('2/feed', 1)
+    ])
+
+    # Polls are spread over the interval.
+    assert_equal(len(sleep.call_args_list), 3)
+    assert 4 < sleep.call_args_list[0][0][0] <= 5